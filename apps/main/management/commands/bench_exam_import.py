@@ -0,0 +1,79 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.main.services.exam_import import import_exam_plan, validate_exam_package
+
+
+class _Rollback(Exception):
+    pass
+
+
+# build_package
+# Төрт секцияға бөлінген синтетикалық пакет: listening/reading MCQ, speaking рубрикамен, writing expected output.
+def build_package(questions: int) -> dict:
+    per_section = max(questions // 4, 1)
+    sections = []
+    for order, section_type in enumerate(("listening", "reading", "speaking", "writing"), start=1):
+        items = []
+        for i in range(per_section):
+            if section_type in ("listening", "reading"):
+                items.append({
+                    "question_type": "mcq_single" if i % 2 else "mcq_multi",
+                    "prompt": f"<p>{section_type} сұрағы #{i + 1}</p>",
+                    "options": [{"text": f"Нұсқа {k}", "is_correct": k == 0} for k in range(4)],
+                })
+            elif section_type == "speaking":
+                items.append({
+                    "question_type": "speaking_keywords",
+                    "prompt": f"<p>Айтылым #{i + 1}</p>",
+                    "rubric": {"keywords": [f"сөз{k}" for k in range(6)], "point_per_keyword": 3, "max_points": 18},
+                })
+            else:
+                items.append({
+                    "question_type": "writing",
+                    "prompt": f"<p>Жазбаша #{i + 1}</p>",
+                    "writing": {"expected_output": f"{i}\n{i * 2}\n", "ignore_whitespace": True},
+                })
+        sections.append({
+            "section_type": section_type, "order": order, "max_score": 25, "time_limit": 30,
+            "material": {"text": "<p>Материал</p>"} if section_type in ("listening", "reading") else None,
+            "questions": items,
+        })
+    return {"title": f"Import benchmark ({questions} сұрақ)", "is_published": False, "sections": sections}
+
+
+class Command(BaseCommand):
+    help = "Емтихан импортының жылдамдығын және SQL сұраныс санын синтетикалық пакетпен өлшейді."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=1000)
+        parser.add_argument("--keep", action="store_true", help="Импортталған емтиханды өшірмеу")
+
+    def handle(self, *args, **options):
+        data = build_package(options["questions"])
+
+        started = time.perf_counter()
+        plan = validate_exam_package(data)
+        self.stdout.write(f"Тексеру: {plan.question_count} сұрақ, {time.perf_counter() - started:.3f} сек")
+
+        started = time.perf_counter()
+        try:
+            with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                exam = import_exam_plan(plan)
+                elapsed = time.perf_counter() - started
+                if not options["keep"]:
+                    raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(
+            f"Импорт: {elapsed:.3f} сек, {len(queries)} SQL сұраныс, "
+            f"{plan.question_count / elapsed:.0f} сұрақ/сек"
+        )
+        if options["keep"]:
+            self.stdout.write(self.style.SUCCESS(f"Exam #{exam.pk} сақталды"))
+        else:
+            self.stdout.write("Транзакция кері қайтарылды (--keep арқылы сақтауға болады)")
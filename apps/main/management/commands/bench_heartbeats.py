@@ -0,0 +1,69 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from apps.main.services.heartbeat import add_time_spent, flush_heartbeats, heartbeat_stats, reset_heartbeat_state
+from core.models import AttemptStatus, SectionAttempt
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Heartbeat буферінің жазу үнемін өлшейді: бір flush аралығындағы heartbeat-тер буфер арқылы және "
+        "әрқайсысы бөлек UPDATE болып жазылады. Транзакция кері қайтарылады."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--candidates", type=int, default=500)
+        parser.add_argument("--windows", type=int, default=4, help="Flush аралықтарының саны")
+
+    def handle(self, *args, **options):
+        ids = list(
+            SectionAttempt.objects
+            .filter(status=AttemptStatus.IN_PROGRESS)
+            .order_by("id")
+            .values_list("id", flat=True)[:options["candidates"]]
+        )
+        if not ids:
+            raise CommandError("Жүріп жатқан секция жоқ")
+
+        interval = settings.ATTEMPT_HEARTBEAT_SECONDS
+        per_window = max(settings.ATTEMPT_HEARTBEAT_FLUSH_SECONDS // interval, 1)
+        reset_heartbeat_state()
+        try:
+            with transaction.atomic():
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as buffered:
+                    for _window in range(options["windows"]):
+                        for _tick in range(per_window):
+                            for sa_id in ids:
+                                add_time_spent(sa_id, interval, background=False)
+                        flush_heartbeats()
+                buffered_seconds = time.perf_counter() - started
+
+                started = time.perf_counter()
+                with CaptureQueriesContext(connection) as direct:
+                    for _tick in range(per_window):
+                        for sa_id in ids:
+                            SectionAttempt.objects.filter(pk=sa_id).update(
+                                time_spent_seconds=F("time_spent_seconds") + interval
+                            )
+                direct_seconds = (time.perf_counter() - started) * options["windows"]
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        stats = heartbeat_stats()
+        reset_heartbeat_state()
+        direct_statements = len(direct) * options["windows"]
+        self.stdout.write(f"Секция: {len(ids)}, heartbeat: {stats['heartbeats']} (әр {interval} сек)")
+        self.stdout.write(f"Буфер: {len(buffered)} UPDATE, {stats['flushes']} flush, {buffered_seconds:.3f} сек")
+        self.stdout.write(f"Тікелей (бағалау): {direct_statements} UPDATE, {direct_seconds:.3f} сек")
+        self.stdout.write(self.style.SUCCESS(f"Жазу саны {stats['write_reduction']} есе азайды"))
@@ -0,0 +1,73 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from apps.main.services.attempt import grade_attempt_mcq, start_attempt
+from apps.main.services.blueprint import get_answer_key
+from apps.main.services.exam_import import import_exam_plan, validate_exam_package
+from core.models import MCQSelection, QuestionAttempt, User
+
+
+class _Rollback(Exception):
+    pass
+
+
+# build_mcq_package
+# Listening/reading секцияларына тең бөлінген MCQ сұрақтары; жартысы бір жауапты, жартысы көп жауапты.
+def build_mcq_package(questions: int) -> dict:
+    sections = []
+    per_section = max(questions // 2, 1)
+    for order, section_type in enumerate(("listening", "reading"), start=1):
+        items = [
+            {
+                "question_type": "mcq_single" if i % 2 else "mcq_multi",
+                "prompt": f"<p>{section_type} #{i + 1}</p>",
+                "options": [{"text": f"Нұсқа {k}", "is_correct": k == 0} for k in range(4)],
+            }
+            for i in range(per_section)
+        ]
+        sections.append({"section_type": section_type, "order": order, "max_score": 50, "questions": items})
+    return {"title": f"MCQ grading benchmark ({questions} сұрақ)", "sections": sections}
+
+
+class Command(BaseCommand):
+    help = (
+        "MCQ бағалауының (grade_attempt_mcq + recalc_attempt_scores) SQL сұраныс санын әртүрлі сұрақ санымен "
+        "өлшейді: сан сұрақ санына тәуелсіз болуы керек. Транзакция кері қайтарылады."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, nargs="+", default=[30, 120, 480])
+
+    def handle(self, *args, **options):
+        for questions in options["questions"]:
+            try:
+                with transaction.atomic():
+                    count, elapsed = self._measure(questions)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            self.stdout.write(f"{questions:>5} сұрақ: {count} SQL сұраныс, {elapsed * 1000:.1f} мс")
+
+    def _measure(self, questions: int) -> tuple[int, float]:
+        exam = import_exam_plan(validate_exam_package(build_mcq_package(questions)))
+        token = uuid.uuid4().hex[:12]
+        user = User.objects.create(username=f"bench-{token}", iin=f"bench-{token}")
+        attempt = start_attempt(user, exam)
+
+        # Әр сұраққа дұрыс нұсқалардың біреуі таңдалады
+        answer_key = get_answer_key(exam)
+        first_option = {q_id: min(entry.correct_option_ids) for q_id, entry in answer_key.items() if entry.is_mcq}
+        qas = list(QuestionAttempt.objects.filter(section_attempt__attempt=attempt).only("id", "question_id"))
+        MCQSelection.objects.bulk_create(
+            [MCQSelection(question_attempt=qa, option_id=first_option[qa.question_id]) for qa in qas]
+        )
+        QuestionAttempt.objects.filter(pk__in=[qa.pk for qa in qas]).update(is_answered=True)
+
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            grade_attempt_mcq(attempt)
+        return len(queries), time.perf_counter() - started
@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.main.services.sandbox import get_sandbox_pool, run_many, sandbox_limits, run_code
+
+PROGRAMS = {
+    "python": "n = int(input())\nprint(sum(range(n)))\n",
+    "cpp": "#include <iostream>\nint main(){long long n,s=0;std::cin>>n;for(long long i=0;i<n;i++)s+=i;std::cout<<s<<std::endl;}\n",
+    "java": "import java.util.*;\npublic class Main{public static void main(String[] a){long n=new Scanner(System.in).nextLong(),s=0;"
+            "for(long i=0;i<n;i++)s+=i;System.out.println(s);}}\n",
+    "js": "const n=Number(require('fs').readFileSync(0,'utf8'));let s=0;for(let i=0;i<n;i++)s+=i;console.log(s);\n",
+}
+
+
+class Command(BaseCommand):
+    help = "Sandbox pool өткізу қабілетін (submission/сек) және бір іске қосудың overhead-ін өлшейді."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--language", default="python", choices=sorted(PROGRAMS))
+        parser.add_argument("--runs", type=int, default=200)
+        parser.add_argument("--n", type=int, default=1000, help="Бағдарламаға берілетін кіріс")
+
+    def handle(self, *args, **options):
+        language, runs = options["language"], options["runs"]
+        code, stdin = PROGRAMS[language], str(options["n"])
+        limits = sandbox_limits()
+
+        started = time.perf_counter()
+        get_sandbox_pool()
+        self.stdout.write(f"Pool дайындалды: {time.perf_counter() - started:.3f} сек")
+
+        # Overhead: бір submission-ды бірінен соң бірі (pool-сыз) іске қосу уақыты
+        serial = min(runs, 20)
+        started = time.perf_counter()
+        results = [run_code(language, code, stdin, limits) for _ in range(serial)]
+        per_run = (time.perf_counter() - started) / serial
+        self.stdout.write(f"Статус: {results[0].status}, stdout: {results[0].stdout.strip()!r}")
+        self.stdout.write(f"Бір іске қосу overhead-і: {per_run * 1000:.1f} мс")
+
+        started = time.perf_counter()
+        results = run_many([(language, code, stdin)] * runs, limits)
+        elapsed = time.perf_counter() - started
+        ok = sum(1 for r in results if r.status == "ok")
+        self.stdout.write(f"Pool: {runs} submission, {ok} ok, {elapsed:.2f} сек, {runs / elapsed:.1f} submission/сек")
@@ -0,0 +1,65 @@
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from apps.main.services.transcripts import transcribe_with_cache
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Бір attempt-тің айтылым клиптерін sleep-ке негізделген fake транскрибермен бағалау уақытын өлшейді: "
+        "параллель режимде уақыт ең ұзын клипке, тізбекті режимде барлық клиптің қосындысына тең болуы керек. "
+        "Кэш жазбалары кері қайтарылады."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--clips", type=int, default=settings.GRADER_TRANSCRIBE_CONCURRENCY)
+        parser.add_argument("--min-seconds", type=float, default=0.2)
+        parser.add_argument("--max-seconds", type=float, default=1.0)
+        parser.add_argument(
+            "--concurrency", type=int, default=settings.GRADER_TRANSCRIBE_CONCURRENCY,
+            help="Параллель режимдегі thread саны (әдепкі GRADER_TRANSCRIBE_CONCURRENCY)",
+        )
+
+    def handle(self, *args, **options):
+        clips = max(options["clips"], 1)
+        step = (options["max_seconds"] - options["min_seconds"]) / max(clips - 1, 1)
+        durations = [options["min_seconds"] + i * step for i in range(clips)]
+        self.stdout.write(f"Клиптер: {clips}, қосынды {sum(durations):.2f} сек, ең ұзыны {max(durations):.2f} сек")
+
+        for concurrency in dict.fromkeys((1, options["concurrency"])):
+            elapsed = self._measure(durations, concurrency)
+            self.stdout.write(f"concurrency={concurrency}: {elapsed:.2f} сек")
+
+    def _measure(self, durations: list[float], concurrency: int) -> float:
+        with tempfile.TemporaryDirectory(prefix="bench-transcribe-") as tmp:
+            sleep_by_path = {}
+            for i, seconds in enumerate(durations):
+                # Әр жолы кездейсоқ байттар: хэш кэште болмайды, әр клип транскриберге барады
+                path = os.path.join(tmp, f"clip-{i}.webm")
+                with open(path, "wb") as f:
+                    f.write(os.urandom(4096))
+                sleep_by_path[path] = seconds
+
+            def fake_transcribe(path: str) -> str:
+                time.sleep(sleep_by_path[path])
+                return "fake transcript"
+
+            started = time.perf_counter()
+            try:
+                with transaction.atomic(), override_settings(GRADER_TRANSCRIBE_CONCURRENCY=concurrency):
+                    transcribe_with_cache(list(sleep_by_path), transcribe=fake_transcribe)
+                    elapsed = time.perf_counter() - started
+                    raise _Rollback
+            except _Rollback:
+                pass
+        return elapsed
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Exam
+from core.signals import exam_counter_expressions, refresh_exam_counters
+
+COUNTER_FIELDS = ("section_count", "question_count", "time_limit", "max_total_score")
+
+
+class Command(BaseCommand):
+    help = "Exam есептегіштерін (секция/сұрақ саны, уақыт, макс балл) нақты деректермен салыстырады."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Сәйкессіз есептегіштерді түзету")
+
+    def handle(self, *args, **options):
+        expected = {f"expected_{name}": expr for name, expr in exam_counter_expressions().items()}
+        rows = (
+            Exam.objects
+            .annotate(**expected)
+            .values_list("id", *COUNTER_FIELDS, *expected)
+            .iterator(chunk_size=2000)
+        )
+
+        broken = []
+        for row in rows:
+            exam_id, stored, actual = row[0], row[1:5], row[5:]
+            if tuple(stored) != tuple(actual):
+                broken.append(exam_id)
+                diff = ", ".join(
+                    f"{name}: {s} != {a}" for name, s, a in zip(COUNTER_FIELDS, stored, actual) if s != a
+                )
+                self.stdout.write(f"Exam #{exam_id}: {diff}")
+
+        if not broken:
+            self.stdout.write(self.style.SUCCESS("Барлық есептегіштер дұрыс"))
+            return
+
+        if options["fix"]:
+            refresh_exam_counters(*broken)
+            self.stdout.write(self.style.SUCCESS(f"Түзетілді: {len(broken)} емтихан"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Сәйкессіз: {len(broken)} емтихан (--fix арқылы түзетіңіз)"))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.main.services.exam_export import clone_exam
+from core.models import Exam
+
+
+class Command(BaseCommand):
+    help = "Емтиханды барлық секция, материал, сұрақ, нұсқа, рубрика және жазбаша есептерімен көшіреді."
+
+    def add_arguments(self, parser):
+        parser.add_argument("exam_id", type=int)
+        parser.add_argument("--title", help="Көшірменің атауы (әдепкі: «<атауы> (көшірме)»)")
+
+    def handle(self, *args, **options):
+        exam = Exam.objects.filter(pk=options["exam_id"]).first()
+        if exam is None:
+            raise CommandError(f"Exam #{options['exam_id']} табылмады")
+
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            copy = clone_exam(exam, title=options["title"])
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exam #{copy.pk} «{copy.title}»: {copy.question_count} сұрақ, "
+            f"{elapsed:.3f} сек, {len(queries)} SQL сұраныс"
+        ))
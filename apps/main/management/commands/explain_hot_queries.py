@@ -0,0 +1,98 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.models import AttemptStatus, ExamAttempt, MCQSelection, Question, QuestionAttempt, Section
+
+ATTEMPT_TABLES = {
+    "core_examattempt", "core_sectionattempt", "core_questionattempt", "core_mcqselection",
+    "core_section", "core_question",
+}
+SEQ_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Seed қылынған базадағы кез келген бар id-лер (база бос болса 0) — жоспар үшін мәннің өзі маңызды емес
+def _sample_ids() -> dict:
+    qa = (
+        QuestionAttempt.objects
+        .select_related("section_attempt__attempt")
+        .order_by("-id")
+        .first()
+    )
+    if qa is None:
+        return {"attempt": 0, "user": 0, "exam": 0, "section": 0, "question": 0, "question_attempt": 0}
+    attempt = qa.section_attempt.attempt
+    return {
+        "attempt": attempt.pk,
+        "user": attempt.user_id,
+        "exam": attempt.exam_id,
+        "section": qa.section_attempt.section_id,
+        "question": qa.question_id,
+        "question_attempt": qa.pk,
+    }
+
+
+def hot_queries(ids: dict) -> dict:
+    return {
+        "question_attempt_by_attempt_question": QuestionAttempt.objects.filter(
+            section_attempt__attempt_id=ids["attempt"], question_id=ids["question"],
+        ),
+        "exam_attempt_by_user_status": ExamAttempt.objects.filter(
+            user_id=ids["user"], status=AttemptStatus.IN_PROGRESS,
+        ),
+        "exam_attempt_by_user_exam": ExamAttempt.objects.filter(user_id=ids["user"], exam_id=ids["exam"]),
+        "exam_attempt_recent": ExamAttempt.objects.filter(user_id=ids["user"]).order_by("-finished_at", "-id")[:10],
+        "exam_attempt_by_exam_status": ExamAttempt.objects.filter(
+            exam_id=ids["exam"], status=AttemptStatus.FINISHED,
+        ),
+        "section_by_exam_order": Section.objects.filter(exam_id=ids["exam"]).order_by("order"),
+        "question_by_section_order": Question.objects.filter(section_id=ids["section"]).order_by("order"),
+        "mcq_selection_by_question_attempt": MCQSelection.objects.filter(question_attempt_id=ids["question_attempt"]),
+        "mcq_selection_by_attempt": MCQSelection.objects.filter(
+            question_attempt__section_attempt__attempt_id=ids["attempt"],
+        ),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Ыстық сұраныстардың EXPLAIN жоспарын тексереді. enable_seqscan=off кезінде де attempt кестелерінде "
+        "Seq Scan қалса, сәйкес индекс жоқ деген сөз — команда қатемен аяқталады (CI үшін)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Әр жоспарды толық шығару")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN тексерісі тек PostgreSQL-де жұмыс істейді.")
+
+        failures = []
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    # Кішкентай seed базада планировщик индекс болса да Seq Scan таңдайды; seqscan-ды
+                    # "қымбат" етсек, Seq Scan тек индекс мүлде жоқ кезде қалады
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+                for name, qs in hot_queries(_sample_ids()).items():
+                    plan = qs.explain()
+                    scanned = sorted(set(SEQ_SCAN_RE.findall(plan)) & ATTEMPT_TABLES)
+                    if scanned:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(f"{name}: Seq Scan on {', '.join(scanned)}"))
+                    else:
+                        self.stdout.write(self.style.SUCCESS(f"{name}: OK"))
+                    if options["verbose_plans"] or scanned:
+                        self.stdout.write(plan)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Индекссіз сұраныстар: {', '.join(failures)}")
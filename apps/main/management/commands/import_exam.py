@@ -0,0 +1,35 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.main.services.exam_import import import_exam_plan, open_exam_package, validate_exam_package
+
+
+class Command(BaseCommand):
+    help = "YAML/JSON емтихан пакетін (файл, каталог немесе .zip) бір транзакцияда импорттайды."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="exam.yaml / exam.json, оны қамтитын каталог немесе .zip")
+        parser.add_argument("--publish", action="store_true", help="Пакеттегі is_published-ке қарамай жариялау")
+        parser.add_argument("--dry-run", action="store_true", help="Тек тексеру, базаға жазбау")
+
+    def handle(self, *args, **options):
+        try:
+            data, read_media = open_exam_package(options["path"])
+            plan = validate_exam_package(data, read_media, is_published=True if options["publish"] else None)
+        except OSError as exc:
+            raise CommandError(str(exc))
+        except ValidationError as exc:
+            for message in exc.messages:
+                self.stderr.write(message)
+            raise CommandError(f"Пакет қабылданбады: {len(exc.messages)} қате")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Пакет дұрыс: {len(plan.sections)} секция, {plan.question_count} сұрақ"
+            ))
+            return
+
+        exam = import_exam_plan(plan)
+        self.stdout.write(self.style.SUCCESS(
+            f"Exam #{exam.pk} «{exam.title}»: {exam.section_count} секция, {exam.question_count} сұрақ"
+        ))
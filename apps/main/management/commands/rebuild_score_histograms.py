@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.services.stats import SCORE_HISTOGRAM_BUCKETS, rebuild_score_histograms
+
+
+class Command(BaseCommand):
+    help = "Емтихандардың балл гистограммаларын аяқталған attempt-терден бір өтіммен қайта құрады."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--exam", type=int, action="append", dest="exam_ids", help="Тек осы емтихан(дар)")
+        parser.add_argument("--buckets", type=int, default=SCORE_HISTOGRAM_BUCKETS)
+
+    def handle(self, *args, **options):
+        written = rebuild_score_histograms(options["exam_ids"], buckets=options["buckets"])
+        self.stdout.write(self.style.SUCCESS(f"Дайын: {written} емтихан гистограммасы"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.services.stats import rebuild_user_stats
+from core.models import User
+
+
+class Command(BaseCommand):
+    help = "Қолданушылардың dashboard статистикасын (UserProgressStats) аяқталған attempt-тер бойынша қайта құрады."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Тек осы қолданушы(лар)")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        qs = User.objects.order_by("id")
+        if options["user_ids"]:
+            qs = qs.filter(id__in=options["user_ids"])
+
+        users = attempts = 0
+        last_id = 0
+        while True:
+            ids = list(qs.filter(id__gt=last_id).values_list("id", flat=True)[:batch_size])
+            if not ids:
+                break
+            attempts += rebuild_user_stats(ids)
+            users += len(ids)
+            last_id = ids[-1]
+            self.stdout.write(f"Қолданушылар: {users}, attempt-тер: {attempts}")
+
+        self.stdout.write(self.style.SUCCESS(f"Дайын: {users} қолданушы, {attempts} attempt"))
@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.main.services.grading import process_grading_jobs
+from apps.main.services.sandbox import get_sandbox_pool
+from apps.main.services.transcripts import TranscriptCacheCounter, evict_transcript_cache
+
+
+class Command(BaseCommand):
+    help = "Айтылым/жазбаша жауаптарды кезектен алып бағалайды (бірнеше процесс қатар жұмыс істей алады)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10)
+        parser.add_argument("--sleep", type=float, default=2.0, help="Кезек бос болғанда күту (сек)")
+        parser.add_argument("--once", action="store_true", help="Бір рет өңдеп, шығу")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if settings.SANDBOX_ENABLED:
+            # Оқшаулау жұмыс істемесе, SandboxIsolationError осында, бірінші тапсырмаға дейін көтеріледі
+            get_sandbox_pool()
+        evicted_at = None
+        while True:
+            # Кэш тазалау бағалау жолынан тыс, мерзімді түрде орындалады
+            if evicted_at is None or time.monotonic() - evicted_at >= settings.TRANSCRIPT_CACHE_EVICT_SECONDS:
+                evict_transcript_cache()
+                evicted_at = time.monotonic()
+
+            counter = TranscriptCacheCounter()
+            processed = process_grading_jobs(limit=batch_size, counter=counter)
+            if processed:
+                self.stdout.write(
+                    f"{processed} тапсырма өңделді "
+                    f"(кэш: {counter.hits} hit / {counter.misses} miss, "
+                    f"үнем {counter.saved_seconds:.1f} сек)"
+                )
+            if options["once"]:
+                break
+            if not processed:
+                time.sleep(options["sleep"])
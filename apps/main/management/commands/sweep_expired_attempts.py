@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.main.services.expiry import close_expired_sections, sweep_expired_attempts
+
+
+class Command(BaseCommand):
+    help = "Мерзімі өткен секцияларды жабады және жүріп жатқан attempt-терді deadline индексі арқылы аяқтайды."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=settings.ATTEMPT_SWEEP_BATCH_SIZE)
+        parser.add_argument(
+            "--sleep", type=float, default=settings.ATTEMPT_SWEEP_INTERVAL_SECONDS, help="Айналымдар арасындағы күту (сек)",
+        )
+        parser.add_argument("--once", action="store_true", help="Бір рет өңдеп, шығу")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            sections = close_expired_sections(batch_size)
+            attempts = sweep_expired_attempts(batch_size)
+            if sections or attempts:
+                self.stdout.write(f"Жабылды: {sections} секция, {attempts} attempt")
+            if options["once"]:
+                break
+            # Толық батч болса, артта қалған жұмыс бар: күтпей жалғастырамыз
+            if sections < batch_size and attempts < batch_size:
+                time.sleep(options["sleep"])
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.services.transcripts import evict_transcript_cache, transcript_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Транскрипт кэшінің статистикасы: жазбалар, hit саны, үнемделген API уақыты."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--evict", action="store_true", help="Шектен асқан ескі жазбаларды өшіру")
+
+    def handle(self, *args, **options):
+        if options["evict"]:
+            self.stdout.write(f"Өшірілді: {evict_transcript_cache()}")
+
+        total = transcript_cache_stats()
+        self.stdout.write(f"Жазбалар: {total['entries']}")
+        self.stdout.write(f"Кэштен алынды (hit): {total['hits']}")
+        self.stdout.write(f"Үнемделген API уақыты: {total['saved_seconds']:.1f} сек")
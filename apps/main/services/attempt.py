@@ -1,15 +1,19 @@
+from datetime import timedelta
 from decimal import Decimal
-from django.db import transaction
-from django.db.models import Sum, Prefetch
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Case, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, Least
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
 
-from apps.main.services.speaking import score_speaking, match_keywords, transcribe_audio
-from apps.main.services.writing import grade_writing_submission
-from core.models import Question, SpeakingRubric
+from apps.main.services.blueprint import get_exam_blueprint, get_answer_key
+from apps.main.services.heartbeat import flush_heartbeats
+from apps.main.services.stats import record_attempt_stats
+from core.models import Exam, User
 from core.models.attempts import (
     ExamAttempt, SectionAttempt, QuestionAttempt,
-    AttemptStatus, MCQSelection, WritingSubmission, SpeakingAnswer,
+    AttemptStatus, MCQSelection, WritingSubmission,
 )
 
 
@@ -26,80 +30,213 @@ def is_hx(request):
 
 
 # ensure_attempt_initialized
-@transaction.atomic
+# Attempt ағашы емтиханның ағымдағы content_version-ы үшін құрылып қойса, ешқандай сұраныс жасамаймыз.
 def ensure_attempt_initialized(attempt: ExamAttempt) -> None:
-    exam = attempt.exam
+    if attempt.initialized_version == attempt.exam.content_version:
+        return
+    initialize_attempt(attempt)
+
 
+# initialize_attempt
+@transaction.atomic
+def initialize_attempt(attempt: ExamAttempt) -> None:
+    bp = get_exam_blueprint(attempt.exam)
+
+    # Параллель сұраныстар бір attempt-ті қатар құрмауы үшін қатарды құлыптаймыз
+    locked = (
+        ExamAttempt.objects
+        .select_for_update()
+        .only("status", "started_at", "initialized_version")
+        .get(pk=attempt.pk)
+    )
+    attempt.status = locked.status
+    attempt.started_at = locked.started_at
+    if locked.initialized_version == bp.version:
+        attempt.initialized_version = bp.version
+        return
+
+    update_fields = ["initialized_version", "max_total_score"]
     if attempt.status == AttemptStatus.NO_STARTED:
         attempt.status = AttemptStatus.IN_PROGRESS
         if not attempt.started_at:
             attempt.started_at = timezone.now()
-        attempt.save(update_fields=["status", "started_at"])
+        attempt.deadline_at = attempt_deadline(bp, attempt.started_at)
+        update_fields += ["status", "started_at", "deadline_at"]
+
+    materialize_attempt(attempt, bp)
+
+    attempt.max_total_score = bp.max_total_score
+    attempt.initialized_version = bp.version
+    attempt.save(update_fields=update_fields)
+
+
+# materialize_attempt
+# SectionAttempt/QuestionAttempt қатарларын емтихан көлеміне тәуелсіз 3 statement-пен құрады.
+# Бар қатарлар unique constraint арқылы ON CONFLICT DO NOTHING-пен өткізіледі.
+def materialize_attempt(attempt: ExamAttempt, bp) -> None:
+    SectionAttempt.objects.bulk_create(
+        [
+            SectionAttempt(
+                attempt=attempt,
+                section_id=sec.id,
+                status=AttemptStatus.NO_STARTED,
+                max_score=Decimal(str(sec.max_score)),
+            )
+            for sec in bp.sections
+        ],
+        ignore_conflicts=True,
+    )
+    if not bp.questions:
+        return
 
-    sections = list(
-        exam.sections.all().order_by("order").prefetch_related("questions")
+    sa_ids = dict(
+        SectionAttempt.objects.filter(attempt=attempt).values_list("section_id", "id")
     )
-    existing_sa = {
-        sa.section_id: sa
-        for sa in attempt.section_attempts.select_related("section").all()
-    }
-    section_attempts_to_create = []
-    for sec in sections:
-        if sec.id not in existing_sa:
-            section_attempts_to_create.append(
-                SectionAttempt(
-                    attempt=attempt,
-                    section=sec,
-                    status=AttemptStatus.NO_STARTED,
-                    max_score=Decimal(str(sec.max_score or 0)),
-                )
+    QuestionAttempt.objects.bulk_create(
+        [
+            QuestionAttempt(
+                section_attempt_id=sa_ids[q.section_id],
+                question_id=q.id,
+                max_score=Decimal(str(q.points)),
             )
+            for q in bp.questions
+        ],
+        ignore_conflicts=True,
+    )
 
-    if section_attempts_to_create:
-        SectionAttempt.objects.bulk_create(section_attempts_to_create)
 
-    existing_sa = {
-        sa.section_id: sa
-        for sa in attempt.section_attempts.select_related("section").all()
-    }
-    existing_qa = set(
-        QuestionAttempt.objects.filter(section_attempt__attempt=attempt)
-        .values_list("question_id", flat=True)
+# start_attempt
+@transaction.atomic
+def start_attempt(user, exam: Exam) -> ExamAttempt:
+    bp = get_exam_blueprint(exam)
+
+    # Бір қолданушының қатар "бастау" басулары кезекпен орындалады: екінші сұраныс бар attempt-ті табады
+    User.objects.select_for_update().only("id").get(pk=user.pk)
+
+    attempt = ExamAttempt.objects.filter(user=user, exam=exam).first()
+    if attempt:
+        return attempt
+
+    now = timezone.now()
+    attempt = ExamAttempt.objects.create(
+        user=user,
+        exam=exam,
+        status=AttemptStatus.IN_PROGRESS,
+        started_at=now,
+        deadline_at=attempt_deadline(bp, now),
+        max_total_score=bp.max_total_score,
+        initialized_version=bp.version,
+        progress_at=now,
     )
-    qa_to_create = []
-    for sec in sections:
-        sa = existing_sa[sec.id]
-        for q in sec.questions.all().order_by("order"):
-            if q.id in existing_qa:
-                continue
-            qa_to_create.append(
-                QuestionAttempt(
-                    section_attempt=sa,
-                    question=q,
-                    max_score=Decimal(str(q.points or 0)),
-                )
-            )
+    materialize_attempt(attempt, bp)
+    return attempt
+
+
+# ======================================================================================================================
+# Timers
+# ======================================================================================================================
+# Мерзімдер бастау сәтінде серверде есептеліп, ExamAttempt/SectionAttempt.deadline_at-қа жазылады. Жауаптар
+# мерзім өткен соң (ATTEMPT_DEADLINE_GRACE_SECONDS желі кідірісіне рұқсатымен) қабылданбайды.
+def attempt_deadline(bp, started_at):
+    return started_at + timedelta(seconds=bp.duration_seconds) if bp.duration_seconds else None
 
-    if qa_to_create:
-        QuestionAttempt.objects.bulk_create(qa_to_create)
 
-    max_total = sum((sec.max_score or 0) for sec in sections)
-    attempt.max_total_score = Decimal(str(max_total))
-    attempt.save(update_fields=["max_total_score"])
+def remaining_seconds(deadline, now=None) -> int | None:
+    if deadline is None:
+        return None
+    return max(int((deadline - (now or timezone.now())).total_seconds()), 0)
+
+
+def _past(deadline, now) -> bool:
+    return deadline is not None and now >= deadline + timedelta(seconds=settings.ATTEMPT_DEADLINE_GRACE_SECONDS)
+
+
+def attempt_is_expired(attempt: ExamAttempt, now=None) -> bool:
+    return attempt.status == AttemptStatus.IN_PROGRESS and _past(attempt.deadline_at, now or timezone.now())
+
+
+def section_is_open(sa: SectionAttempt, attempt: ExamAttempt, now=None) -> bool:
+    now = now or timezone.now()
+    if sa.status == AttemptStatus.FINISHED:
+        return False
+    return not _past(sa.deadline_at, now) and not _past(attempt.deadline_at, now)
+
+
+# start_section_attempt
+# Секция алғаш ашылғанда басталады; оның мерзімі емтихан мерзімінен аспайды.
+def start_section_attempt(attempt: ExamAttempt, sa: SectionAttempt, section_bp) -> None:
+    if sa.status != AttemptStatus.NO_STARTED:
+        return
+    sa.status = AttemptStatus.IN_PROGRESS
+    if not sa.started_at:
+        sa.started_at = timezone.now()
+    deadline = attempt_deadline(section_bp, sa.started_at)
+    if attempt.deadline_at and (deadline is None or attempt.deadline_at < deadline):
+        deadline = attempt.deadline_at
+    sa.deadline_at = deadline
+    sa.save(update_fields=["status", "started_at", "deadline_at"])
+
+
+# close_section_attempts
+# Секцияларды аяқтап, жұмсалған уақытты жазады. Мерзімі өткен секция мерзім сәтінде аяқталған деп саналады.
+# Жұмсалған уақыт SQL өрнегімен жазылады: басқа worker-лердің heartbeat flush-тары үстінен жазылмайды.
+def close_section_attempts(section_attempts, finished_at) -> None:
+    # Осы процестің буферіндегі heartbeat-тер секция жабылмай тұрып жазылады
+    flush_heartbeats()
+    for sa in section_attempts:
+        sa.status = AttemptStatus.FINISHED
+        if not sa.finished_at:
+            end = finished_at
+            if sa.deadline_at and sa.deadline_at < end:
+                end = sa.deadline_at
+            sa.finished_at = end
+        if sa.started_at:
+            # Heartbeat жинаған белсенді уақыт болса, ол сақталады (секция ұзақтығынан аспайды)
+            wall = max(int((sa.finished_at - sa.started_at).total_seconds()), 0)
+            sa.time_spent_seconds = Case(
+                When(time_spent_seconds__gt=0, then=Least(F("time_spent_seconds"), Value(wall))),
+                default=Value(wall),
+            )
+        else:
+            sa.time_spent_seconds = F("time_spent_seconds")
+    SectionAttempt.objects.bulk_update(section_attempts, ["status", "finished_at", "time_spent_seconds"])
 
 
 # recalc_attempt_scores
+# Секция және жалпы баллдар UPDATE ... SET score = (SELECT SUM ...) арқылы есептеледі.
 def recalc_attempt_scores(attempt: ExamAttempt) -> None:
-    for sa in attempt.section_attempts.all():
-        s = sa.question_attempts.aggregate(total=Sum("score"))["total"] or Decimal("0")
-        if sa.score != s:
-            sa.score = s
-            sa.save(update_fields=["score"])
+    qa_total_sq = (
+        QuestionAttempt.objects
+        .filter(section_attempt=OuterRef("pk"))
+        .values("section_attempt")
+        .annotate(total=Sum("score"))
+        .values("total")
+    )
+    SectionAttempt.objects.filter(attempt=attempt).update(
+        score=Coalesce(Subquery(qa_total_sq), Value(Decimal("0")), output_field=models.DecimalField(max_digits=7, decimal_places=2))
+    )
+
+    # Бірнеше grader бір attempt-ті қатар жаңартуы мүмкін, сондықтан жалпы балл да SQL ішінде есептеледі
+    sa_total_sq = (
+        SectionAttempt.objects
+        .filter(attempt=OuterRef("pk"))
+        .values("attempt")
+        .annotate(total=Sum("score"))
+        .values("total")
+    )
+    ExamAttempt.objects.filter(pk=attempt.pk).update(
+        total_score=Coalesce(Subquery(sa_total_sq), Value(Decimal("0")), output_field=models.DecimalField(max_digits=7, decimal_places=2))
+    )
+    attempt.refresh_from_db(fields=["total_score"])
+
 
-    total = attempt.section_attempts.aggregate(total=Sum("score"))["total"] or Decimal("0")
-    if attempt.total_score != total:
-        attempt.total_score = total
-        attempt.save(update_fields=["total_score"])
+# bump_answered_count
+# QuestionAttempt.is_answered өзгергенде attempt-тің прогресс есептегішін бір UPDATE-пен жаңартады.
+def bump_answered_count(attempt: ExamAttempt, delta: int) -> None:
+    ExamAttempt.objects.filter(pk=attempt.pk).update(
+        answered_count=Greatest(F("answered_count") + delta, Value(0)),
+        progress_at=timezone.now(),
+    )
 
 
 # save_mcq_answer_only
@@ -110,15 +247,17 @@ def save_mcq_answer_only(attempt, question_id: int, option_ids: list[int]) -> No
 
     qa = (
         QuestionAttempt.objects
-        .select_related("question", "section_attempt")
-        .prefetch_related("question__options")
+        .select_for_update(of=("self", ))
+        .select_related("section_attempt")
         .get(section_attempt__attempt=attempt, question_id=question_id)
     )
+    if not section_is_open(qa.section_attempt, attempt):
+        return
+    q = get_exam_blueprint(attempt.exam).question_by_id[question_id]
+    was_answered = qa.is_answered
 
-    q = qa.question
-
-    valid_option_ids = set(q.options.values_list("id", flat=True))
-    chosen = [oid for oid in option_ids if oid in valid_option_ids]
+    valid_option_ids = {o.id for o in q.options}
+    chosen = list(dict.fromkeys(oid for oid in option_ids if oid in valid_option_ids))
 
     MCQSelection.objects.filter(question_attempt=qa).delete()
     MCQSelection.objects.bulk_create(
@@ -129,40 +268,50 @@ def save_mcq_answer_only(attempt, question_id: int, option_ids: list[int]) -> No
     qa.is_answered = len(chosen) > 0
 
     qa.save(update_fields=["answer_json", "is_answered"])
+    if qa.is_answered != was_answered:
+        bump_answered_count(attempt, 1 if qa.is_answered else -1)
+
+
+# grade_mcq_score
+def grade_mcq_score(question_type: str, points, chosen_set: set, correct_ids) -> Decimal:
+    if question_type == "mcq_single":
+        if len(chosen_set) == 1 and chosen_set == correct_ids:
+            return Decimal(str(points or 0))
+    elif question_type == "mcq_multi":
+        if chosen_set == correct_ids and len(correct_ids) > 0:
+            return Decimal(str(points or 0))
+    return Decimal("0")
 
 
 # grade_attempt_mcq
+# Сұрақ санына тәуелсіз: 2 оқу (QuestionAttempt, MCQSelection) + 1 bulk_update + баллдарды жинау.
 @transaction.atomic
 def grade_attempt_mcq(attempt) -> None:
-    qas = (
+    answer_key = get_answer_key(attempt.exam)
+    mcq_q_ids = [q_id for q_id, entry in answer_key.items() if entry.is_mcq]
+
+    qas = list(
         QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt, question__question_type__in=["mcq_single", "mcq_multi"])
-        .select_related("question")
-        .prefetch_related("question__options")
+        .filter(section_attempt__attempt=attempt, question_id__in=mcq_q_ids)
+        .only("id", "question_id", "score", "is_graded")
     )
 
     selected = {}
-    for qa_id, opt_id in MCQSelection.objects.filter(question_attempt__in=qas).values_list("question_attempt_id", "option_id"):
+    selections = (
+        MCQSelection.objects
+        .filter(question_attempt__section_attempt__attempt=attempt)
+        .values_list("question_attempt_id", "option_id")
+    )
+    for qa_id, opt_id in selections:
         selected.setdefault(qa_id, set()).add(opt_id)
 
     for qa in qas:
-        q = qa.question
-        chosen_set = selected.get(qa.pk, set())
-        correct_ids = set(q.options.filter(is_correct=True).values_list("id", flat=True))
-
-        score = Decimal("0")
-        points = Decimal(str(q.points or 0))
-
-        if q.question_type == "mcq_single":
-            if len(chosen_set) == 1 and chosen_set == correct_ids:
-                score = points
-        elif q.question_type == "mcq_multi":
-            if chosen_set == correct_ids and len(correct_ids) > 0:
-                score = points
-
-        qa.score = score
+        entry = answer_key[qa.question_id]
+        qa.score = grade_mcq_score(entry.question_type, entry.points, selected.get(qa.pk, set()), entry.correct_option_ids)
         qa.is_graded = True
-        qa.save(update_fields=["score", "is_graded"])
+
+    if qas:
+        QuestionAttempt.objects.bulk_update(qas, ["score", "is_graded"])
 
     recalc_attempt_scores(attempt)
 
@@ -178,65 +327,49 @@ def finish_attempt_auto(attempt: ExamAttempt) -> None:
     attempt.status = AttemptStatus.FINISHED
     if not attempt.finished_at:
         attempt.finished_at = timezone.now()
-    attempt.save(update_fields=["status", "finished_at"])
-
-    now = attempt.finished_at or timezone.now()
-    for sa in attempt.section_attempts.all():
-        if not sa.started_at and attempt.started_at:
-            sa.started_at = attempt.started_at
-        if sa.status != AttemptStatus.FINISHED:
-            sa.status = AttemptStatus.FINISHED
-        if not sa.finished_at:
-            sa.finished_at = now
-        sa.save(update_fields=["status", "started_at", "finished_at"])
+    attempt.progress_at = timezone.now()
+    attempt.save(update_fields=["status", "finished_at", "progress_at"])
+
+    # Ашылмаған секциялар үшін жұмсалған уақыт 0 болып қалады
+    section_attempts = list(
+        attempt.section_attempts
+        .exclude(status=AttemptStatus.FINISHED)
+        .only("status", "started_at", "finished_at", "deadline_at")
+    )
+    close_section_attempts(section_attempts, attempt.finished_at)
+
+    record_attempt_stats(attempt)
 
 
 # build_attempt_question_context
 def build_attempt_question_context(attempt, current_qid: int):
-    sections = (
-        attempt.exam.sections
-        .all()
-        .order_by("order")
-        .select_related("material")
-        .prefetch_related(
-            Prefetch(
-                "questions",
-                queryset=Question.objects.order_by("order").prefetch_related("options"),
-            )
-        )
-    )
-
-    flat_questions = [qq for sec in sections for qq in sec.questions.all()]
-    q_ids = [qq.id for qq in flat_questions]
+    bp = get_exam_blueprint(attempt.exam)
+    q_ids = bp.question_ids
     if not q_ids:
         return None
 
-    if current_qid not in q_ids:
+    if current_qid not in bp.question_by_id:
         current_qid = q_ids[0]
 
-    qa_qs = (
-        QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt)
-        .select_related("question", "section_attempt")
-    )
-    qa_by_q_id = {qa.question_id: qa for qa in qa_qs}
+    qa_by_q_id = {
+        qa.question_id: qa
+        for qa in QuestionAttempt.objects.filter(section_attempt__attempt=attempt).select_related("section_attempt")
+    }
     qa = qa_by_q_id.get(current_qid)
     if not qa:
-        qa = QuestionAttempt.objects.get(section_attempt__attempt=attempt, question_id=current_qid)
-
-    q = qa.question
+        qa = QuestionAttempt.objects.select_related("section_attempt").get(
+            section_attempt__attempt=attempt, question_id=current_qid
+        )
 
-    current_section = None
-    for sec in sections:
-        if sec.id == q.section_id:
-            current_section = sec
-            break
+    q = bp.question_by_id[current_qid]
 
-    selected_set = set(
-        MCQSelection.objects
-        .filter(question_attempt=qa)
-        .values_list("option_id", flat=True)
-    )
+    selected_set = set()
+    if q.is_mcq:
+        selected_set = set(
+            MCQSelection.objects
+            .filter(question_attempt=qa)
+            .values_list("option_id", flat=True)
+        )
 
     answered_q_ids = {x.question_id for x in qa_by_q_id.values() if x.is_answered}
 
@@ -246,9 +379,9 @@ def build_attempt_question_context(attempt, current_qid: int):
 
     return {
         "attempt": attempt,
-        "flat_questions": flat_questions,
+        "flat_questions": bp.questions,
         "answered_q_ids": answered_q_ids,
-        "current_section": current_section,
+        "current_section": bp.section_of(q),
 
         "q": q,
         "qa": qa,
@@ -259,58 +392,5 @@ def build_attempt_question_context(attempt, current_qid: int):
         "q_index": idx + 1,
         "q_total": len(q_ids),
         "is_last": next_q_id is None,
+        "writing_languages": WritingSubmission.Language.choices,
     }
-
-
-# grade_pending_open_questions
-def grade_pending_open_questions(attempt):
-    qa_qs = (
-        QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt, is_answered=True, is_graded=False)
-        .select_related("question", "section_attempt")
-    )
-
-    for qa in qa_qs:
-        q = qa.question
-
-        if q.question_type == "speaking_keywords":
-            sa = SpeakingAnswer.objects.filter(question_attempt=qa).first()
-            if not sa or not sa.audio:
-                continue
-
-            rubric = SpeakingRubric.objects.filter(question=q).first()
-            if not rubric:
-                continue
-
-            transcript = transcribe_audio(sa.audio.path)
-            matched = match_keywords(transcript, rubric.keywords)
-            points = score_speaking(matched, rubric.point_per_keyword, rubric.max_points)
-
-            sa.transcript = transcript
-            sa.matched_keywords = matched
-            sa.matched_count = len(matched)
-            sa.save(update_fields=["transcript", "matched_keywords", "matched_count"])
-
-            qa.max_score = rubric.max_points
-            qa.score = points
-            qa.is_graded = True
-            qa.answer_json = {
-                "type": "speaking_keywords",
-                "transcript": transcript,
-                "matched_keywords": matched,
-            }
-            qa.save(update_fields=["max_score", "score", "is_graded", "answer_json"])
-
-        # --- WRITING ---
-        elif q.question_type == "writing":
-            sub = WritingSubmission.objects.filter(question_attempt=qa).first()
-            if not sub:
-                continue
-
-            is_correct = grade_writing_submission(sub)
-
-            # max_score сенде already бар деп қабылдаймын; жоқ болса 1 қылып қоюға болады
-            qa.score = qa.max_score if is_correct else 0
-            qa.is_graded = True
-            qa.answer_json = {"type": "writing", "correct": bool(is_correct)}
-            qa.save(update_fields=["score", "is_graded", "answer_json"])
\ No newline at end of file
@@ -0,0 +1,248 @@
+import threading
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.db.models import Prefetch
+
+from core.models import Exam, Section, Question
+
+
+# ======================================================================================================================
+# Exam blueprint
+# ======================================================================================================================
+# Емтихан мазмұнының өзгермейтін көшірмесі: секциялар, материал, сұрақтар, нұсқалар, рубрика/жазбаша метадерегі.
+# Әр worker өз кэшін ұстайды, ал кэштің жарамдылығын Exam.content_version анықтайды (core/signals.py).
+@dataclass(frozen=True)
+class OptionBlueprint:
+    id: int
+    text: str
+    is_correct: bool
+
+
+@dataclass(frozen=True)
+class SpeakingRubricBlueprint:
+    keywords: tuple
+    point_per_keyword: int
+    max_points: int
+
+
+@dataclass(frozen=True)
+class WritingBlueprint:
+    expected_output: str
+    ignore_whitespace: bool
+
+
+@dataclass(frozen=True)
+class MaterialBlueprint:
+    text: str | None
+    audio_url: str | None
+    time_limit_seconds: int
+
+
+@dataclass(frozen=True)
+class QuestionBlueprint:
+    id: int
+    section_id: int
+    question_type: str
+    prompt: str
+    points: int
+    order: int
+    options: tuple
+    correct_option_ids: frozenset
+    speaking_rubric: SpeakingRubricBlueprint | None
+    writing: WritingBlueprint | None
+
+    @property
+    def is_mcq(self) -> bool:
+        return self.question_type in (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI)
+
+    def get_question_type_display(self):
+        return Question.QuestionType(self.question_type).label
+
+
+@dataclass(frozen=True)
+class AnswerKeyEntry:
+    question_type: str
+    points: int
+    correct_option_ids: frozenset
+
+    @property
+    def is_mcq(self) -> bool:
+        return self.question_type in (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI)
+
+
+@dataclass(frozen=True)
+class SectionBlueprint:
+    id: int
+    section_type: str
+    order: int
+    max_score: int
+    time_limit: int
+    material: MaterialBlueprint | None
+    questions: tuple
+
+    def get_section_type_display(self):
+        return Section.SectionType(self.section_type).label
+
+    # duration_seconds
+    # Секция уақыты Section.time_limit (мин); ол берілмесе материалдың time_limit_seconds-ы. 0 — шектеусіз.
+    @property
+    def duration_seconds(self) -> int:
+        if self.time_limit:
+            return self.time_limit * 60
+        return self.material.time_limit_seconds if self.material else 0
+
+
+@dataclass(frozen=True)
+class ExamBlueprint:
+    exam_id: int
+    version: int
+    sections: tuple
+    questions: tuple
+    question_ids: tuple
+    question_by_id: dict
+    section_by_id: dict
+    answer_key: dict
+    max_total_score: Decimal
+
+    def section_of(self, question: QuestionBlueprint) -> SectionBlueprint:
+        return self.section_by_id[question.section_id]
+
+    @property
+    def duration_seconds(self) -> int:
+        return sum(sec.duration_seconds for sec in self.sections)
+
+
+# build_exam_blueprint
+def build_exam_blueprint(exam: Exam) -> ExamBlueprint:
+    sections = (
+        exam.sections
+        .all()
+        .order_by("order")
+        .select_related("material")
+        .prefetch_related(
+            Prefetch(
+                "questions",
+                queryset=(
+                    Question.objects
+                    .order_by("order")
+                    .select_related("speaking_rubric", "writing")
+                    .prefetch_related("options")
+                ),
+            )
+        )
+    )
+
+    section_bps = []
+    for sec in sections:
+        material = getattr(sec, "material", None)
+        material_bp = None
+        if material is not None:
+            material_bp = MaterialBlueprint(
+                text=material.text,
+                audio_url=material.audio.url if material.audio else None,
+                time_limit_seconds=material.time_limit_seconds or 0,
+            )
+
+        question_bps = []
+        for q in sec.questions.all():
+            options = tuple(
+                OptionBlueprint(id=o.id, text=o.text, is_correct=o.is_correct)
+                for o in sorted(q.options.all(), key=lambda o: o.id)
+            )
+
+            rubric = getattr(q, "speaking_rubric", None)
+            rubric_bp = None
+            if rubric is not None:
+                rubric_bp = SpeakingRubricBlueprint(
+                    keywords=tuple(rubric.keywords or ()),
+                    point_per_keyword=rubric.point_per_keyword,
+                    max_points=rubric.max_points,
+                )
+
+            writing = getattr(q, "writing", None)
+            writing_bp = None
+            if writing is not None:
+                writing_bp = WritingBlueprint(
+                    expected_output=writing.expected_output or "",
+                    ignore_whitespace=writing.ignore_whitespace,
+                )
+
+            question_bps.append(
+                QuestionBlueprint(
+                    id=q.id,
+                    section_id=sec.id,
+                    question_type=q.question_type,
+                    prompt=q.prompt,
+                    points=q.points or 0,
+                    order=q.order,
+                    options=options,
+                    correct_option_ids=frozenset(o.id for o in options if o.is_correct),
+                    speaking_rubric=rubric_bp,
+                    writing=writing_bp,
+                )
+            )
+
+        section_bps.append(
+            SectionBlueprint(
+                id=sec.id,
+                section_type=sec.section_type,
+                order=sec.order,
+                max_score=sec.max_score or 0,
+                time_limit=sec.time_limit or 0,
+                material=material_bp,
+                questions=tuple(question_bps),
+            )
+        )
+
+    flat_questions = tuple(q for sec in section_bps for q in sec.questions)
+    return ExamBlueprint(
+        exam_id=exam.pk,
+        version=exam.content_version,
+        sections=tuple(section_bps),
+        questions=flat_questions,
+        question_ids=tuple(q.id for q in flat_questions),
+        question_by_id={q.id: q for q in flat_questions},
+        section_by_id={sec.id: sec for sec in section_bps},
+        answer_key={
+            q.id: AnswerKeyEntry(
+                question_type=q.question_type,
+                points=q.points,
+                correct_option_ids=q.correct_option_ids,
+            )
+            for q in flat_questions
+        },
+        max_total_score=Decimal(str(sum(sec.max_score for sec in section_bps))),
+    )
+
+
+# per-worker cache
+# ----------------------------------------------------------------------------------------------------------------------
+_blueprints: dict[int, ExamBlueprint] = {}
+_blueprints_lock = threading.Lock()
+
+
+# exam.content_version attempt-пен бірге select_related("exam") арқылы келеді,
+# сондықтан кэш тексеру қосымша сұраныс жасамайды.
+def get_exam_blueprint(exam: Exam) -> ExamBlueprint:
+    bp = _blueprints.get(exam.pk)
+    if bp is not None and bp.version == exam.content_version:
+        return bp
+
+    bp = build_exam_blueprint(exam)
+    with _blueprints_lock:
+        cached = _blueprints.get(exam.pk)
+        if cached is None or cached.version <= bp.version:
+            _blueprints[exam.pk] = bp
+    return bp
+
+
+# get_answer_key
+# question_id -> AnswerKeyEntry. Blueprint-пен бірге кэштеледі, Option өзгерсе content_version арқылы жаңарады.
+def get_answer_key(exam: Exam) -> dict:
+    return get_exam_blueprint(exam).answer_key
+
+
+def clear_exam_blueprints() -> None:
+    with _blueprints_lock:
+        _blueprints.clear()
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+MAX_SEARCH_TERMS = 5
+
+
+# ======================================================================================================================
+# Exam catalog
+# ======================================================================================================================
+# search_exams
+# Әр сөз title немесе description ішінде болуы керек. Postgres-те UPPER(...) LIKE '%...%' сұранысына
+# pg_trgm GIN индексі қолданылады (0022 миграция), SQLite-та сол icontains кәдімгі сканмен орындалады.
+def search_exams(qs: QuerySet, query: str) -> QuerySet:
+    terms = (query or "").split()[:MAX_SEARCH_TERMS]
+    for term in terms:
+        qs = qs.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return qs
+
+
+# keyset_page
+# OFFSET орнына id < cursor: бет нөмірі өскен сайын баяуламайды. Келесі бет бар-жоғын білу үшін бір артық жол алынады.
+def keyset_page(qs: QuerySet, after: int | None, page_size: int | None = None) -> tuple[list, int | None]:
+    page_size = page_size or settings.CATALOG_PAGE_SIZE
+    if after:
+        qs = qs.filter(id__lt=after)
+    rows = list(qs.order_by("-id")[:page_size + 1])
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = rows[-1].id if has_more and rows else None
+    return rows, next_cursor
@@ -0,0 +1,171 @@
+import json
+import posixpath
+import zipfile
+
+import yaml
+from django.core.files.storage import default_storage
+from django.db.models import Prefetch
+
+from apps.main.services.exam_import import ExamPlan, QuestionPlan, SectionPlan, import_exam_plan
+from core.models import Exam, Option, Question, Section, SectionMaterial, SpeakingRubric, Writing
+from core.utils.output import normalize_output_text
+
+PACKAGE_MEDIA_DIR = "media"
+
+
+# ======================================================================================================================
+# Exam tree loading
+# ======================================================================================================================
+# Емтихан ағашы модель саны бойынша тұрақты сұраныспен жүктеледі (секция+материал, сұрақ+рубрика+writing, нұсқалар).
+def load_exam_sections(exam: Exam) -> list:
+    return list(
+        exam.sections
+        .all()
+        .order_by("order", "id")
+        .select_related("material")
+        .prefetch_related(
+            Prefetch(
+                "questions",
+                queryset=(
+                    Question.objects
+                    .order_by("order", "id")
+                    .select_related("speaking_rubric", "writing")
+                    .prefetch_related(Prefetch("options", queryset=Option.objects.order_by("id")))
+                ),
+            )
+        )
+    )
+
+
+# ======================================================================================================================
+# Exam package export
+# ======================================================================================================================
+# Пакет пішімі import_exam-пен бірдей, сондықтан экспортталған пакетті сол күйінде қайта импорттауға болады.
+# Zip-те аудио пакет ішіндегі media/ файлына, жалғыз YAML/JSON-да MEDIA ішіндегі storage файлына сілтейді.
+def _media_name(section: Section, audio_name: str) -> str:
+    return posixpath.join(PACKAGE_MEDIA_DIR, f"{section.order}-{section.pk}-{posixpath.basename(audio_name)}")
+
+
+def exam_to_package(exam: Exam, sections: list | None = None, bundle_media: bool = False) -> dict:
+    sections = load_exam_sections(exam) if sections is None else sections
+    section_rows = []
+    for sec in sections:
+        row = {
+            "section_type": sec.section_type,
+            "order": sec.order,
+            "max_score": sec.max_score,
+            "time_limit": sec.time_limit,
+        }
+        material = getattr(sec, "material", None)
+        if material is not None:
+            audio = material.audio.name or None
+            if audio and bundle_media:
+                audio = _media_name(sec, audio) if default_storage.exists(audio) else None
+            row["material"] = {
+                "text": material.text,
+                "audio": audio,
+                "time_limit_seconds": material.time_limit_seconds,
+            }
+
+        questions = []
+        for q in sec.questions.all():
+            item = {"question_type": q.question_type, "prompt": q.prompt, "points": q.points, "order": q.order}
+            if q.question_type in (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI):
+                item["options"] = [{"text": o.text, "is_correct": o.is_correct} for o in q.options.all()]
+            rubric = getattr(q, "speaking_rubric", None)
+            if rubric is not None:
+                item["rubric"] = {
+                    "keywords": list(rubric.keywords or []),
+                    "point_per_keyword": rubric.point_per_keyword,
+                    "max_points": rubric.max_points,
+                }
+            writing = getattr(q, "writing", None)
+            if writing is not None:
+                item["writing"] = {
+                    "expected_output": writing.expected_output,
+                    "ignore_whitespace": writing.ignore_whitespace,
+                }
+            questions.append(item)
+
+        row["questions"] = questions
+        section_rows.append(row)
+
+    return {
+        "title": exam.title,
+        "description": exam.description,
+        "is_published": exam.is_published,
+        "sections": section_rows,
+    }
+
+
+def dump_package(data: dict, fmt: str) -> str:
+    if fmt == "json":
+        return json.dumps(data, ensure_ascii=False, indent=2)
+    return yaml.safe_dump(data, allow_unicode=True, sort_keys=False)
+
+
+# write_exam_zip
+# exam.yaml және материалдардың аудио файлдары бір zip-ке жазылады; файлдар storage-тан ағынмен көшіріледі.
+def write_exam_zip(exam: Exam, fileobj) -> None:
+    sections = load_exam_sections(exam)
+    data = exam_to_package(exam, sections, bundle_media=True)
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("exam.yaml", dump_package(data, "yaml"))
+        for sec in sections:
+            material = getattr(sec, "material", None)
+            if material is None or not material.audio or not default_storage.exists(material.audio.name):
+                continue
+            with default_storage.open(material.audio.name, "rb") as src, \
+                    zf.open(_media_name(sec, material.audio.name), "w") as dst:
+                for chunk in iter(lambda: src.read(1024 * 1024), b""):
+                    dst.write(chunk)
+
+
+# ======================================================================================================================
+# Exam clone
+# ======================================================================================================================
+# Көшірме жадта сақталмаған объектілер ретінде құрылып, import_exam_plan арқылы әр модельге бір bulk_create-пен
+# жазылады: сыртқы кілттер (section/question) bulk_create қайтарған pk-лар бойынша жадта қайта байланады.
+# Аудио файлдар көшірілмейді, жаңа материал сол storage файлына сілтейді.
+def clone_exam_plan(exam: Exam, title: str | None = None) -> ExamPlan:
+    plan = ExamPlan(Exam(
+        title=title or f"{exam.title} (көшірме)"[:Exam._meta.get_field("title").max_length],
+        description=exam.description,
+        is_published=False,
+    ))
+    for sec in load_exam_sections(exam):
+        sp = SectionPlan(Section(
+            section_type=sec.section_type, max_score=sec.max_score, time_limit=sec.time_limit, order=sec.order,
+        ))
+        material = getattr(sec, "material", None)
+        if material is not None:
+            sp.material = SectionMaterial(text=material.text, time_limit_seconds=material.time_limit_seconds)
+            sp.audio_ref = material.audio.name or None
+
+        for q in sec.questions.all():
+            qp = QuestionPlan(Question(
+                question_type=q.question_type, prompt=q.prompt, prompt_preview=Question.make_preview(q.prompt),
+                points=q.points, order=q.order,
+            ))
+            qp.options = [Option(text=o.text, is_correct=o.is_correct) for o in q.options.all()]
+            rubric = getattr(q, "speaking_rubric", None)
+            if rubric is not None:
+                qp.rubric = SpeakingRubric(
+                    keywords=list(rubric.keywords or []),
+                    point_per_keyword=rubric.point_per_keyword,
+                    max_points=rubric.max_points,
+                )
+            writing = getattr(q, "writing", None)
+            if writing is not None:
+                qp.writing = Writing(
+                    expected_output=writing.expected_output,
+                    ignore_whitespace=writing.ignore_whitespace,
+                    expected_normalized=normalize_output_text(writing.expected_output, writing.ignore_whitespace),
+                )
+            sp.questions.append(qp)
+        plan.sections.append(sp)
+    return plan
+
+
+def clone_exam(exam: Exam, title: str | None = None) -> Exam:
+    return import_exam_plan(clone_exam_plan(exam, title))
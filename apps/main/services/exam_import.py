@@ -0,0 +1,414 @@
+import json
+import os
+import posixpath
+import zipfile
+from dataclasses import dataclass, field
+
+import yaml
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from core.models import Exam, Option, Question, Section, SectionMaterial, SpeakingRubric, Writing
+from core.signals import refresh_exam_counters
+from core.utils.output import normalize_output_text
+
+PACKAGE_FILE_NAMES = ("exam.yaml", "exam.yml", "exam.json")
+IMPORT_BATCH_SIZE = 500
+SMALL_INT_MAX = 32767
+
+MCQ_TYPES = (Question.QuestionType.MCQ_SINGLE, Question.QuestionType.MCQ_MULTI)
+
+
+# ======================================================================================================================
+# Exam package reading
+# ======================================================================================================================
+# Пакет: exam.yaml/exam.json файлы (жанындағы медиа файлдарымен бірге каталогта немесе zip ішінде) не жалғыз
+# YAML/JSON файл. Жалғыз файлда медиа сілтемелері MEDIA_ROOT ішіндегі бар файлдарға нұсқауы керек.
+def parse_package_text(text, name: str = "") -> dict:
+    try:
+        if name.lower().endswith(".json"):
+            data = json.loads(text)
+        else:
+            data = yaml.safe_load(text)
+    except (ValueError, yaml.YAMLError) as exc:
+        raise ValidationError(f"Пакетті оқу мүмкін емес: {exc}")
+    if not isinstance(data, dict):
+        raise ValidationError("Пакеттің түбірі объект (mapping) болуы керек.")
+    return data
+
+
+def _safe_media_path(ref: str) -> str | None:
+    path = posixpath.normpath(str(ref).replace("\\", "/"))
+    if path.startswith(("/", "../")) or path in (".", ".."):
+        return None
+    return path
+
+
+def _zip_reader(zf: zipfile.ZipFile, root: str):
+    max_bytes = settings.EXAM_IMPORT_MAX_UPLOAD_MB * 1024 * 1024
+
+    def read(ref):
+        path = _safe_media_path(ref)
+        if path is None:
+            return None
+        try:
+            info = zf.getinfo(posixpath.join(root, path) if root else path)
+        except KeyError:
+            return None
+        if info.file_size > max_bytes:
+            raise ValidationError(f"{ref}: файл тым үлкен.")
+        return zf.read(info)
+    return read
+
+
+def _dir_reader(base_dir: str):
+    base_dir = os.path.realpath(base_dir)
+
+    def read(ref):
+        path = _safe_media_path(ref)
+        if path is None:
+            return None
+        full = os.path.realpath(os.path.join(base_dir, path))
+        if not full.startswith(base_dir + os.sep) or not os.path.isfile(full):
+            return None
+        with open(full, "rb") as f:
+            return f.read()
+    return read
+
+
+def _read_zip_package(zf: zipfile.ZipFile) -> tuple:
+    names = [n for n in zf.namelist() if posixpath.basename(n) in PACKAGE_FILE_NAMES]
+    if not names:
+        raise ValidationError(f"Zip ішінде {' / '.join(PACKAGE_FILE_NAMES)} файлы жоқ.")
+    # Ең таяз деңгейдегі пакет файлы (мысалы, "exam/exam.yaml")
+    name = min(names, key=lambda n: n.count("/"))
+    data = parse_package_text(zf.read(name).decode("utf-8-sig"), name)
+    return data, _zip_reader(zf, posixpath.dirname(name))
+
+
+# open_exam_package
+# Файл жүйесіндегі пакет (команда үшін): .zip, каталог немесе YAML/JSON файл.
+def open_exam_package(path: str) -> tuple:
+    if os.path.isdir(path):
+        for name in PACKAGE_FILE_NAMES:
+            candidate = os.path.join(path, name)
+            if os.path.isfile(candidate):
+                return open_exam_package(candidate)
+        raise ValidationError(f"Каталогта {' / '.join(PACKAGE_FILE_NAMES)} файлы жоқ.")
+
+    if zipfile.is_zipfile(path):
+        return _read_zip_package(zipfile.ZipFile(path))
+
+    with open(path, encoding="utf-8-sig") as f:
+        data = parse_package_text(f.read(), path)
+    return data, _dir_reader(os.path.dirname(os.path.abspath(path)))
+
+
+# read_uploaded_package
+# Менеджер жүктеген файл: zip болса медиасымен бірге, әйтпесе жалғыз YAML/JSON.
+def read_uploaded_package(uploaded) -> tuple:
+    if zipfile.is_zipfile(uploaded):
+        uploaded.seek(0)
+        return _read_zip_package(zipfile.ZipFile(uploaded))
+    uploaded.seek(0)
+    try:
+        text = uploaded.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValidationError("Файл UTF-8 кодировкасында болуы керек.")
+    return parse_package_text(text, uploaded.name), None
+
+
+# ======================================================================================================================
+# Exam package validation
+# ======================================================================================================================
+# Бүкіл пакет базаға жазбас бұрын тексеріледі және барлық қателер бір тізіммен қайтарылады.
+# Ережелер модельдермен ортақ: Question.allowed_types және SpeakingRubric.clean.
+@dataclass
+class QuestionPlan:
+    question: Question
+    options: list = field(default_factory=list)
+    rubric: SpeakingRubric | None = None
+    writing: Writing | None = None
+
+
+@dataclass
+class SectionPlan:
+    section: Section
+    material: SectionMaterial | None = None
+    audio_ref: str | None = None
+    audio_content: bytes | None = None
+    questions: list = field(default_factory=list)
+
+
+@dataclass
+class ExamPlan:
+    exam: Exam
+    sections: list = field(default_factory=list)
+
+    @property
+    def question_count(self) -> int:
+        return sum(len(s.questions) for s in self.sections)
+
+
+class _Collector:
+    def __init__(self):
+        self.errors = []
+
+    def add(self, path: str, message) -> None:
+        self.errors.append(f"{path}: {message}")
+
+    def int(self, data: dict, key: str, path: str, default: int, maximum: int = SMALL_INT_MAX) -> int:
+        value = data.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value <= maximum:
+            self.add(f"{path}.{key}", f"0..{maximum} аралығындағы бүтін сан болуы керек.")
+            return default
+        return value
+
+    def flag(self, data: dict, key: str, path: str, default: bool) -> bool:
+        # YAML/JSON-дағы "false" сияқты жолдар ақиқат мән деп қабылданбайды
+        value = data.get(key, default)
+        if not isinstance(value, bool):
+            self.add(f"{path}.{key}", "true немесе false болуы керек.")
+            return default
+        return value
+
+    def text(self, data: dict, key: str, path: str, required: bool = False) -> str | None:
+        value = data.get(key)
+        if value is None or value == "":
+            if required:
+                self.add(f"{path}.{key}", "Міндетті өріс.")
+            return None
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            self.add(f"{path}.{key}", "Мәтін болуы керек.")
+            return None
+        return str(value)
+
+    def items(self, data: dict, key: str, path: str) -> list:
+        value = data.get(key) or []
+        if not isinstance(value, list) or not all(isinstance(v, dict) for v in value):
+            self.add(f"{path}.{key}", "Объектілер тізімі болуы керек.")
+            return []
+        return value
+
+    def choice(self, data: dict, key: str, path: str, choices) -> str | None:
+        value = data.get(key)
+        if value not in choices.values:
+            self.add(f"{path}.{key}", f"Рұқсат етілген мәндер: {', '.join(choices.values)}.")
+            return None
+        return value
+
+
+def _plan_options(c: _Collector, q: dict, path: str, question_type: str) -> list:
+    options = []
+    for i, o in enumerate(c.items(q, "options", path)):
+        text = c.text(o, "text", f"{path}.options[{i}]", required=True)
+        key = "is_correct" if "is_correct" in o or "correct" not in o else "correct"
+        options.append(Option(text=text or "", is_correct=c.flag(o, key, f"{path}.options[{i}]", False)))
+
+    correct = sum(1 for o in options if o.is_correct)
+    if len(options) < 2:
+        c.add(f"{path}.options", "Кемінде екі нұсқа болуы керек.")
+    if question_type == Question.QuestionType.MCQ_SINGLE and correct != 1:
+        c.add(f"{path}.options", "Бір жауапты сұрақта дәл бір дұрыс нұсқа болуы керек.")
+    elif question_type == Question.QuestionType.MCQ_MULTI and correct < 1:
+        c.add(f"{path}.options", "Кемінде бір дұрыс нұсқа болуы керек.")
+    return options
+
+
+def _plan_rubric(c: _Collector, q: dict, path: str) -> SpeakingRubric | None:
+    data = q.get("rubric") or q.get("speaking_rubric")
+    if not isinstance(data, dict):
+        c.add(f"{path}.rubric", "Айтылым сұрағына рубрика міндетті.")
+        return None
+    rubric = SpeakingRubric(
+        keywords=data.get("keywords", []),
+        point_per_keyword=c.int(data, "point_per_keyword", f"{path}.rubric", 3),
+        max_points=c.int(data, "max_points", f"{path}.rubric", 25),
+    )
+    try:
+        rubric.clean()
+    except ValidationError as exc:
+        for message in exc.messages:
+            c.add(f"{path}.rubric", message)
+    return rubric
+
+
+def _plan_writing(c: _Collector, q: dict, path: str) -> Writing | None:
+    data = q.get("writing")
+    if not isinstance(data, dict):
+        c.add(f"{path}.writing", "Жазбаша сұраққа expected_output міндетті.")
+        return None
+    expected = data.get("expected_output")
+    if not isinstance(expected, str) or not expected:
+        c.add(f"{path}.writing.expected_output", "Міндетті өріс.")
+        return None
+    ignore_whitespace = c.flag(data, "ignore_whitespace", f"{path}.writing", True)
+    return Writing(
+        expected_output=expected,
+        ignore_whitespace=ignore_whitespace,
+        # bulk_create Writing.save()-ті шақырмайды, сондықтан қалыпқа келтіруді осында жасаймыз
+        expected_normalized=normalize_output_text(expected, ignore_whitespace),
+    )
+
+
+def _plan_question(c: _Collector, q: dict, path: str, section_type: str, index: int) -> QuestionPlan:
+    question_type = c.choice(q, "question_type", path, Question.QuestionType)
+    if question_type and section_type and question_type not in Question.allowed_types(section_type):
+        c.add(f"{path}.question_type", "Бұл секцияға бұл сұрақ типін қоюға болмайды.")
+
+    prompt = c.text(q, "prompt", path, required=True) or ""
+    plan = QuestionPlan(Question(
+        question_type=question_type or "",
+        prompt=prompt,
+        prompt_preview=Question.make_preview(prompt),
+        points=c.int(q, "points", path, 1),
+        order=c.int(q, "order", path, index + 1),
+    ))
+    if question_type in MCQ_TYPES:
+        plan.options = _plan_options(c, q, path, question_type)
+    elif question_type == Question.QuestionType.SPEAKING_KEYWORDS:
+        plan.rubric = _plan_rubric(c, q, path)
+    elif question_type == Question.QuestionType.WRITING:
+        plan.writing = _plan_writing(c, q, path)
+    return plan
+
+
+def _plan_section(c: _Collector, s: dict, path: str, index: int, read_media) -> SectionPlan:
+    section_type = c.choice(s, "section_type", path, Section.SectionType)
+    plan = SectionPlan(Section(
+        section_type=section_type or "",
+        max_score=c.int(s, "max_score", path, 0),
+        time_limit=c.int(s, "time_limit", path, 0),
+        order=c.int(s, "order", path, index + 1),
+    ))
+
+    material = s.get("material")
+    if material is not None:
+        if not isinstance(material, dict):
+            c.add(f"{path}.material", "Объект болуы керек.")
+        else:
+            plan.material = SectionMaterial(
+                text=c.text(material, "text", f"{path}.material"),
+                time_limit_seconds=c.int(material, "time_limit_seconds", f"{path}.material", 0),
+            )
+            audio = c.text(material, "audio", f"{path}.material")
+            if audio:
+                plan.audio_ref = audio
+                if read_media is None:
+                    try:
+                        exists = default_storage.exists(audio)
+                    except SuspiciousFileOperation:
+                        c.add(f"{path}.material.audio", f"'{audio}' жолы MEDIA каталогынан тыс.")
+                    else:
+                        if not exists:
+                            c.add(f"{path}.material.audio", f"MEDIA ішінде '{audio}' файлы жоқ.")
+                else:
+                    plan.audio_content = read_media(audio)
+                    if plan.audio_content is None:
+                        c.add(f"{path}.material.audio", f"Пакет ішінде '{audio}' файлы жоқ.")
+
+    for i, q in enumerate(c.items(s, "questions", path)):
+        plan.questions.append(_plan_question(c, q, f"{path}.questions[{i}]", section_type, i))
+    return plan
+
+
+# validate_exam_package
+# Пакетті тексеріп, сақталмаған модель объектілерінен тұратын жоспар қайтарады. Қате болса ValidationError.
+def validate_exam_package(data: dict, read_media=None, is_published: bool | None = None) -> ExamPlan:
+    c = _Collector()
+    exam = Exam(
+        title=c.text(data, "title", "exam", required=True) or "",
+        description=c.text(data, "description", "exam"),
+        is_published=c.flag(data, "is_published", "exam", False) if is_published is None else is_published,
+    )
+    if len(exam.title) > Exam._meta.get_field("title").max_length:
+        c.add("exam.title", "Тым ұзын.")
+
+    plan = ExamPlan(exam)
+    sections = c.items(data, "sections", "exam")
+    if not sections:
+        c.add("exam.sections", "Кемінде бір секция болуы керек.")
+    for i, s in enumerate(sections):
+        plan.sections.append(_plan_section(c, s, f"sections[{i}]", i, read_media))
+
+    if c.errors:
+        raise ValidationError(c.errors)
+    return plan
+
+
+# ======================================================================================================================
+# Exam package import
+# ======================================================================================================================
+# Бәрі бір транзакцияда, әр модельге бір bulk_create (IMPORT_BATCH_SIZE бойынша) арқылы жазылады: сұрақ саны
+# қанша болса да сұраныс саны тұрақты. bulk_create сигналдарды шақырмайды, сондықтан есептегіштер соңында
+# бір UPDATE-пен жаңартылады.
+def _store_media(plan: ExamPlan, saved: list) -> None:
+    audio_field = SectionMaterial._meta.get_field("audio")
+    for sp in plan.sections:
+        if sp.material is None or not sp.audio_ref:
+            continue
+        if sp.audio_content is None:
+            # Жалғыз YAML/JSON: сілтеме MEDIA ішіндегі бар файлға
+            sp.material.audio = sp.audio_ref
+            continue
+        name = default_storage.save(
+            audio_field.generate_filename(None, posixpath.basename(sp.audio_ref)), ContentFile(sp.audio_content),
+        )
+        saved.append(name)
+        sp.material.audio = name
+
+
+def import_exam_plan(plan: ExamPlan) -> Exam:
+    saved_files = []
+    try:
+        with transaction.atomic():
+            _store_media(plan, saved_files)
+            exam = plan.exam
+            exam.save()
+
+            for sp in plan.sections:
+                sp.section.exam = exam
+            Section.objects.bulk_create([sp.section for sp in plan.sections], batch_size=IMPORT_BATCH_SIZE)
+
+            materials = []
+            questions = []
+            for sp in plan.sections:
+                if sp.material is not None:
+                    sp.material.section = sp.section
+                    materials.append(sp.material)
+                for qp in sp.questions:
+                    qp.question.section = sp.section
+                    questions.append(qp)
+            SectionMaterial.objects.bulk_create(materials, batch_size=IMPORT_BATCH_SIZE)
+            Question.objects.bulk_create([qp.question for qp in questions], batch_size=IMPORT_BATCH_SIZE)
+
+            options, rubrics, writings = [], [], []
+            for qp in questions:
+                for option in qp.options:
+                    option.question = qp.question
+                    options.append(option)
+                if qp.rubric is not None:
+                    qp.rubric.question = qp.question
+                    rubrics.append(qp.rubric)
+                if qp.writing is not None:
+                    qp.writing.question = qp.question
+                    writings.append(qp.writing)
+            Option.objects.bulk_create(options, batch_size=IMPORT_BATCH_SIZE)
+            SpeakingRubric.objects.bulk_create(rubrics, batch_size=IMPORT_BATCH_SIZE)
+            Writing.objects.bulk_create(writings, batch_size=IMPORT_BATCH_SIZE)
+
+            refresh_exam_counters(exam.pk)
+            exam.refresh_from_db()
+    except BaseException:
+        for name in saved_files:
+            default_storage.delete(name)
+        raise
+    return exam
+
+
+# import_exam_package
+def import_exam_package(data: dict, read_media=None, is_published: bool | None = None) -> Exam:
+    return import_exam_plan(validate_exam_package(data, read_media, is_published))
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.main.services.attempt import attempt_is_expired, close_section_attempts, finish_attempt_auto, \
+    recalc_attempt_scores
+from apps.main.services.grading import enqueue_open_questions, grade_pending_open_questions
+from apps.main.services.stats import record_attempt_stats
+from core.models import AttemptStatus, ExamAttempt, SectionAttempt
+
+
+# ======================================================================================================================
+# Attempt submit / expiry
+# ======================================================================================================================
+# Қолмен тапсыру, сұраныс кезінде мерзімнің өтуі және sweeper бір жолмен аяқталады. Attempt қатары lock астында
+# тек DB жұмысымен (статус, MCQ бағалау, кезекке қою) аяқталады; GRADER_ASYNC=False болса, желіге баратын
+# транскрипция/sandbox бағалауы commit-тен кейін, lock босағаннан соң орындалады.
+def _grade_open_answers(attempt_id: int) -> None:
+    attempt = ExamAttempt.objects.select_related("exam").get(pk=attempt_id)
+    try:
+        grade_pending_open_questions(attempt)
+    except Exception:
+        # Бағаланбай қалған жауаптар кезекке түседі: run_grader оларды қайталап көреді
+        enqueue_open_questions(attempt)
+        raise
+    finally:
+        recalc_attempt_scores(attempt)
+        record_attempt_stats(attempt)
+
+
+def _lock_in_progress(attempt_id: int, skip_locked: bool = False) -> ExamAttempt | None:
+    return (
+        ExamAttempt.objects
+        .select_for_update(skip_locked=skip_locked, of=("self", ))
+        .select_related("exam")
+        .filter(pk=attempt_id, status=AttemptStatus.IN_PROGRESS)
+        .first()
+    )
+
+
+# finish_attempt_locked
+# at_deadline=True: аяқталу уақыты — мерзім сәті, сұраныс келген сәт емес. Қайтарады: (аяқталды ма, кезекке қойылды ма).
+def finish_attempt_locked(attempt_id: int, at_deadline: bool = False, skip_locked: bool = False) -> tuple[bool, bool]:
+    with transaction.atomic():
+        attempt = _lock_in_progress(attempt_id, skip_locked=skip_locked)
+        if attempt is None:
+            return False, False
+        if at_deadline:
+            attempt.finished_at = attempt.deadline_at
+
+        queued = False
+        if settings.GRADER_ASYNC:
+            queued = bool(enqueue_open_questions(attempt))
+        else:
+            # robust=True: бағалау қатесі логқа жазылады, sweeper циклін тоқтатпайды
+            transaction.on_commit(partial(_grade_open_answers, attempt.pk), robust=True)
+        finish_attempt_auto(attempt)
+    return True, queued
+
+
+# submit_attempt
+def submit_attempt(attempt: ExamAttempt) -> bool:
+    finished, queued = finish_attempt_locked(attempt.pk)
+    if finished:
+        attempt.status = AttemptStatus.FINISHED
+    return queued
+
+
+# expire_attempt_if_due
+# Мерзімі өткен attempt-ті сұраныс ішінде аяқтайды.
+def expire_attempt_if_due(attempt: ExamAttempt) -> bool:
+    if not attempt_is_expired(attempt):
+        return False
+    finish_attempt_locked(attempt.pk, at_deadline=True)
+    attempt.status = AttemptStatus.FINISHED
+    return True
+
+
+# ======================================================================================================================
+# Sweeper
+# ======================================================================================================================
+# Тек deadline партиалды индекстері (status=in_progress, deadline_at IS NOT NULL) бойынша іздейді: жұмыс көлемі
+# барлық attempt санына емес, мерзімі өткендер санына тәуелді. SKIP LOCKED бірнеше sweeper-ге қатар жұмыс
+# істеуге және сұраныс ішінде аяқталып жатқан attempt-ті күтпеуге мүмкіндік береді.
+def _cutoff(now=None):
+    return (now or timezone.now()) - timedelta(seconds=settings.ATTEMPT_DEADLINE_GRACE_SECONDS)
+
+
+def close_expired_sections(batch_size: int, now=None) -> int:
+    section_attempts = list(
+        SectionAttempt.objects
+        .filter(status=AttemptStatus.IN_PROGRESS, deadline_at__isnull=False, deadline_at__lte=_cutoff(now))
+        .order_by("deadline_at")
+        .only("status", "started_at", "finished_at", "deadline_at")[:batch_size]
+    )
+    if section_attempts:
+        close_section_attempts(section_attempts, now or timezone.now())
+    return len(section_attempts)
+
+
+def sweep_expired_attempts(batch_size: int, now=None) -> int:
+    attempt_ids = list(
+        ExamAttempt.objects
+        .filter(status=AttemptStatus.IN_PROGRESS, deadline_at__isnull=False, deadline_at__lte=_cutoff(now))
+        .order_by("deadline_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    finished = 0
+    for attempt_id in attempt_ids:
+        done, _queued = finish_attempt_locked(attempt_id, at_deadline=True, skip_locked=True)
+        finished += done
+    return finished
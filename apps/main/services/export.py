@@ -0,0 +1,152 @@
+import csv
+import json
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import ExamAttempt, QuestionAttempt, Section, SectionAttempt
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_LINES_PER_WRITE = 500
+
+SECTION_TYPES = [value for value, _label in Section.SectionType.choices]
+
+ATTEMPT_COLUMNS = [
+    "attempt_id", "username", "first_name", "last_name", "iin", "exam_id", "exam", "status",
+    "started_at", "finished_at", "total_score", "max_total_score",
+    *[f"{t}_{part}" for t in SECTION_TYPES for part in ("score", "max")],
+]
+QUESTION_COLUMNS = [
+    "attempt_id", "username", "iin", "exam_id", "exam", "section_type", "question_id", "question_order",
+    "question_type", "score", "max_score", "is_answered", "is_graded", "answer",
+]
+
+
+# ======================================================================================================================
+# Results export
+# ======================================================================================================================
+# Барлық сұраныстар values_list + iterator(chunk_size) арқылы server-side cursor-мен оқылады: ORM объектілері
+# құрылмайды, жад көлемі экспорт өлшеміне тәуелді емес.
+def attempt_filter(prefix: str = "", exam=None, status=None, date_from=None, date_to=None) -> Q:
+    q = Q()
+    if exam:
+        q &= Q(**{f"{prefix}exam": exam})
+    if status:
+        q &= Q(**{f"{prefix}status": status})
+    tz = timezone.get_current_timezone()
+    if date_from:
+        q &= Q(**{f"{prefix}started_at__gte": datetime.combine(date_from, time.min, tzinfo=tz)})
+    if date_to:
+        q &= Q(**{f"{prefix}started_at__lt": datetime.combine(date_to + timedelta(days=1), time.min, tzinfo=tz)})
+    return q
+
+
+def iter_attempt_rows(**filters):
+    attempts = (
+        ExamAttempt.objects
+        .filter(attempt_filter(**filters))
+        .order_by("id")
+        .values_list(
+            "id", "user__username", "user__first_name", "user__last_name", "user__iin", "exam_id", "exam__title",
+            "status", "started_at", "finished_at", "total_score", "max_total_score",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    sections = (
+        SectionAttempt.objects
+        .filter(attempt_filter("attempt__", **filters))
+        .order_by("attempt_id")
+        .values_list("attempt_id", "section__section_type", "score", "max_score")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    # Екі ағын да attempt_id бойынша реттелген: merge join, әр attempt-тің секциялары бір топ болып келеді
+    section_groups = groupby(sections, key=itemgetter(0))
+    pending = next(section_groups, None)
+    for row in attempts:
+        totals = {}
+        while pending is not None and pending[0] <= row[0]:
+            if pending[0] == row[0]:
+                for _attempt_id, section_type, score, max_score in pending[1]:
+                    score_sum, max_sum = totals.get(section_type, (0, 0))
+                    totals[section_type] = (score_sum + score, max_sum + max_score)
+            pending = next(section_groups, None)
+
+        section_cells = []
+        for t in SECTION_TYPES:
+            section_cells.extend(totals.get(t, (None, None)))
+        yield (*row, *section_cells)
+
+
+def iter_question_rows(**filters):
+    return (
+        QuestionAttempt.objects
+        .filter(attempt_filter("section_attempt__attempt__", **filters))
+        .order_by("section_attempt__attempt_id", "id")
+        .values_list(
+            "section_attempt__attempt_id", "section_attempt__attempt__user__username",
+            "section_attempt__attempt__user__iin", "section_attempt__attempt__exam_id",
+            "section_attempt__attempt__exam__title", "section_attempt__section__section_type",
+            "question_id", "question__order", "question__question_type",
+            "score", "max_score", "is_answered", "is_graded", "answer_json",
+        )
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+def _json_value(value):
+    if isinstance(value, datetime):
+        return timezone.localtime(value).isoformat()
+    return value
+
+
+# Электрондық кестелер = + - @ (және таб/CR) белгісінен басталған ұяшықты формула ретінде орындайды:
+# пайдаланушы енгізген мәтінге ' префиксі қосылады (CSV injection)
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    value = _json_value(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+# stream_csv / stream_jsonl
+# Жолдар EXPORT_LINES_PER_WRITE-тен топталып жіберіледі: әр жол үшін бөлек chunk жібермейміз.
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    # Excel кириллицаны дұрыс ашуы үшін UTF-8 BOM
+    yield "\ufeff" + writer.writerow(columns)
+    buffer = []
+    for row in rows:
+        buffer.append(writer.writerow([_csv_cell(v) for v in row]))
+        if len(buffer) >= EXPORT_LINES_PER_WRITE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_jsonl(columns, rows):
+    buffer = []
+    for row in rows:
+        record = {key: _json_value(value) for key, value in zip(columns, row)}
+        buffer.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        if len(buffer) >= EXPORT_LINES_PER_WRITE:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
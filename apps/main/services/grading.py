@@ -0,0 +1,296 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.main.services.attempt import recalc_attempt_scores
+from apps.main.services.blueprint import get_exam_blueprint
+from apps.main.services.speaking import score_speaking, match_keywords, transcribe_audio
+from apps.main.services.stats import record_attempt_stats
+from apps.main.services.transcripts import TranscriptCacheCounter, transcribe_many, transcribe_with_cache
+from apps.main.services.writing import grade_writing_submission, grade_writing_submissions
+from core.models import ExamAttempt, GradingJob, QuestionAttempt, SpeakingAnswer, WritingSubmission
+
+OPEN_QUESTION_TYPES = ("speaking_keywords", "writing")
+
+
+class GradingError(Exception):
+    pass
+
+
+# apply_speaking_result
+# Транскрипт бойынша SpeakingAnswer және QuestionAttempt өрістерін толтырады (сақтамайды).
+def apply_speaking_result(qa: QuestionAttempt, sa: SpeakingAnswer, rubric, transcript: str) -> None:
+    matched = match_keywords(transcript, rubric.keywords)
+    points = score_speaking(matched, rubric.point_per_keyword, rubric.max_points)
+
+    sa.transcript = transcript
+    sa.matched_keywords = matched
+    sa.matched_count = len(matched)
+
+    qa.max_score = rubric.max_points
+    qa.score = points
+    qa.is_graded = True
+    qa.answer_json = {
+        "type": "speaking_keywords",
+        "transcript": transcript,
+        "matched_keywords": matched,
+    }
+
+
+SPEAKING_ANSWER_FIELDS = ["transcript", "matched_keywords", "matched_count"]
+SPEAKING_QA_FIELDS = ["max_score", "score", "is_graded", "answer_json"]
+
+
+# grade_open_question
+# Бір speaking/writing жауабын бағалайды. transcribe параметрі тесттерде желісіз fake функция беруге арналған.
+def grade_open_question(
+    qa: QuestionAttempt, question, transcribe=transcribe_audio, counter: TranscriptCacheCounter | None = None
+) -> bool:
+    if question.question_type == "speaking_keywords":
+        sa = SpeakingAnswer.objects.filter(question_attempt=qa).first()
+        if not sa or not sa.audio:
+            return False
+
+        rubric = question.speaking_rubric
+        if not rubric:
+            return False
+
+        transcript = transcribe_with_cache([sa.audio.path], transcribe=transcribe, counter=counter)[0]
+        apply_speaking_result(qa, sa, rubric, transcript)
+        sa.save(update_fields=SPEAKING_ANSWER_FIELDS)
+        qa.save(update_fields=SPEAKING_QA_FIELDS)
+        return True
+
+    # --- WRITING ---
+    if question.question_type == "writing":
+        sub = WritingSubmission.objects.filter(question_attempt=qa).first()
+        if not sub:
+            return False
+
+        is_correct = grade_writing_submission(sub)
+
+        qa.score = qa.max_score if is_correct else 0
+        qa.is_graded = True
+        qa.answer_json = {"type": "writing", "correct": bool(is_correct)}
+        qa.save(update_fields=["score", "is_graded", "answer_json"])
+        return True
+
+    return False
+
+
+# grade_speaking_answers
+# Транскрипция I/O-ға байланған HTTP сұраныс: кэште жоқ клиптер шектеулі thread pool-да қатар жіберіледі
+# (transcribe_many), сондықтан уақыт ең баяу клипке тең болады. Нәтижелер екі bulk_update-пен жазылады.
+# Транскрипциясы сәтсіз жауаптар бағаланбай қалады: қалғандары сақталған соң GradingError көтеріледі.
+def grade_speaking_answers(
+    qas: list[QuestionAttempt], bp, transcribe=transcribe_audio, counter: TranscriptCacheCounter | None = None
+) -> int:
+    answers = {
+        sa.question_attempt_id: sa
+        for sa in SpeakingAnswer.objects.filter(question_attempt__in=qas)
+    }
+    items = []
+    for qa in qas:
+        sa = answers.get(qa.pk)
+        rubric = bp.question_by_id[qa.question_id].speaking_rubric
+        if sa and sa.audio and rubric:
+            items.append((qa, sa, rubric, sa.audio.path))
+    if not items:
+        return 0
+
+    transcripts, errors = transcribe_many([path for *_, path in items], transcribe=transcribe, counter=counter)
+
+    graded = []
+    for item, transcript in zip(items, transcripts):
+        if transcript is not None:
+            qa, sa, rubric, _path = item
+            apply_speaking_result(qa, sa, rubric, transcript)
+            graded.append(item)
+
+    if graded:
+        with transaction.atomic():
+            SpeakingAnswer.objects.bulk_update([sa for _qa, sa, *_ in graded], SPEAKING_ANSWER_FIELDS)
+            QuestionAttempt.objects.bulk_update([qa for qa, *_ in graded], SPEAKING_QA_FIELDS)
+    if errors:
+        raise GradingError(f"{len(errors)} speaking answer(s) could not be transcribed") from next(
+            iter(errors.values())
+        )
+    return len(graded)
+
+
+# grade_writing_answers
+# Жазбаша жауаптар sandbox pool-да бірге тексеріледі, QuestionAttempt нәтижелері бір bulk_update-пен жазылады.
+def grade_writing_answers(qas: list[QuestionAttempt]) -> int:
+    qa_by_id = {qa.pk: qa for qa in qas}
+    subs = list(
+        WritingSubmission.objects
+        .filter(question_attempt__in=qas)
+        .select_related("question_attempt__question__writing")
+    )
+    if not subs:
+        return 0
+
+    graded = []
+    for sub, is_correct in zip(subs, grade_writing_submissions(subs)):
+        qa = qa_by_id[sub.question_attempt_id]
+        qa.score = qa.max_score if is_correct else 0
+        qa.is_graded = True
+        qa.answer_json = {"type": "writing", "correct": bool(is_correct)}
+        graded.append(qa)
+
+    QuestionAttempt.objects.bulk_update(graded, ["score", "is_graded", "answer_json"])
+    return len(graded)
+
+
+# grade_pending_open_questions
+# Қайтарады: осы attempt бағалауының транскрипт кэші санағыштары.
+def grade_pending_open_questions(
+    attempt, transcribe=transcribe_audio, counter: TranscriptCacheCounter | None = None
+) -> TranscriptCacheCounter:
+    counter = counter if counter is not None else TranscriptCacheCounter()
+    bp = get_exam_blueprint(attempt.exam)
+    qas = list(
+        QuestionAttempt.objects.filter(
+            section_attempt__attempt=attempt,
+            question__question_type__in=OPEN_QUESTION_TYPES,
+            is_answered=True,
+            is_graded=False,
+        )
+    )
+
+    speaking_qas = [qa for qa in qas if bp.question_by_id[qa.question_id].question_type == "speaking_keywords"]
+    writing_qas = [qa for qa in qas if bp.question_by_id[qa.question_id].question_type == "writing"]
+
+    grade_writing_answers(writing_qas)
+    grade_speaking_answers(speaking_qas, bp, transcribe=transcribe, counter=counter)
+    return counter
+
+
+# ======================================================================================================================
+# Grading queue
+# ======================================================================================================================
+# enqueue_open_questions
+# Бағаланбаған speaking/writing жауаптарына бір INSERT ... ON CONFLICT арқылы тапсырма құрады.
+def enqueue_open_questions(attempt: ExamAttempt) -> int:
+    qa_ids = list(
+        QuestionAttempt.objects
+        .filter(
+            section_attempt__attempt=attempt,
+            question__question_type__in=OPEN_QUESTION_TYPES,
+            is_answered=True,
+            is_graded=False,
+        )
+        .values_list("id", flat=True)
+    )
+    if not qa_ids:
+        return 0
+
+    now = timezone.now()
+    GradingJob.objects.bulk_create(
+        [
+            GradingJob(question_attempt_id=qa_id, status=GradingJob.Status.PENDING, run_after=now)
+            for qa_id in qa_ids
+        ],
+        update_conflicts=True,
+        unique_fields=["question_attempt"],
+        update_fields=["status", "tries", "run_after", "locked_at", "last_error"],
+    )
+    return len(qa_ids)
+
+
+# mark_grading_failed
+# Түпкілікті сәтсіз бағалау жауапта белгіленеді: is_graded=False қалады (менеджер қайта кезекке қоя алады),
+# ал review беті "бағалануда" орнына қате туралы хабар көрсетеді.
+def mark_grading_failed(qa_ids) -> None:
+    qas = list(QuestionAttempt.objects.filter(pk__in=qa_ids).only("answer_json"))
+    for qa in qas:
+        qa.answer_json = {**(qa.answer_json or {}), "grading_failed": True}
+    QuestionAttempt.objects.bulk_update(qas, ["answer_json"])
+
+
+# claim_grading_jobs
+# SKIP LOCKED арқылы бірнеше worker бір-біріне кедергі жасамай әртүрлі тапсырмаларды алады.
+# RUNNING күйінде ұзақ қалған тапсырмалар (worker құлаған) қайта алынады; әрекет саны GRADER_MAX_TRIES-ке
+# жеткен болса, қайта алынбай FAILED болады — worker-ді құлататын тапсырма шексіз қайталанбайды.
+@transaction.atomic
+def claim_grading_jobs(limit: int = 10) -> list[GradingJob]:
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.GRADER_LOCK_TIMEOUT_SECONDS)
+    jobs = list(
+        GradingJob.objects
+        .select_for_update(skip_locked=True)
+        .filter(
+            Q(status=GradingJob.Status.PENDING, run_after__lte=now)
+            | Q(status=GradingJob.Status.RUNNING, locked_at__lt=stale_before)
+        )
+        .order_by("run_after", "id")[:limit]
+    )
+    exhausted = [j for j in jobs if j.status == GradingJob.Status.RUNNING and j.tries >= settings.GRADER_MAX_TRIES]
+    if exhausted:
+        for job in exhausted:
+            job.status = GradingJob.Status.FAILED
+            job.locked_at = None
+            job.last_error = "Worker did not finish the job (lock timeout)"
+        GradingJob.objects.bulk_update(exhausted, ["status", "locked_at", "last_error"])
+        mark_grading_failed([j.question_attempt_id for j in exhausted])
+        jobs = [j for j in jobs if j.status != GradingJob.Status.FAILED]
+
+    for job in jobs:
+        job.status = GradingJob.Status.RUNNING
+        job.locked_at = now
+        job.tries += 1
+    if jobs:
+        GradingJob.objects.bulk_update(jobs, ["status", "locked_at", "tries"])
+    return jobs
+
+
+# run_grading_job
+def run_grading_job(
+    job: GradingJob, transcribe=transcribe_audio, counter: TranscriptCacheCounter | None = None
+) -> None:
+    qa = (
+        QuestionAttempt.objects
+        .select_related("section_attempt__attempt__exam")
+        .get(pk=job.question_attempt_id)
+    )
+    attempt = qa.section_attempt.attempt
+
+    try:
+        if not qa.is_graded:
+            question = get_exam_blueprint(attempt.exam).question_by_id[qa.question_id]
+            # Транскрипция желі арқылы жүреді, сондықтан оны транзакцияға орамаймыз
+            if not grade_open_question(qa, question, transcribe=transcribe, counter=counter):
+                raise GradingError("Answer could not be graded (missing audio, rubric or submission)")
+            recalc_attempt_scores(attempt)
+            record_attempt_stats(attempt)
+    except Exception as exc:
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        if job.tries >= settings.GRADER_MAX_TRIES:
+            job.status = GradingJob.Status.FAILED
+            mark_grading_failed([qa.pk])
+        else:
+            job.status = GradingJob.Status.PENDING
+            delay = settings.GRADER_RETRY_BASE_SECONDS * (2 ** (job.tries - 1))
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        job.locked_at = None
+        job.save(update_fields=["status", "run_after", "locked_at", "last_error", "updated_at"])
+        return
+
+    job.status = GradingJob.Status.DONE
+    job.locked_at = None
+    job.last_error = None
+    job.save(update_fields=["status", "locked_at", "last_error", "updated_at"])
+
+
+# process_grading_jobs
+# counter берілсе, батчтағы барлық тапсырманың транскрипт кэші санағыштары соған жиналады.
+def process_grading_jobs(
+    limit: int = 10, transcribe=transcribe_audio, counter: TranscriptCacheCounter | None = None
+) -> int:
+    jobs = claim_grading_jobs(limit)
+    for job in jobs:
+        run_grading_job(job, transcribe=transcribe, counter=counter)
+    return len(jobs)
@@ -0,0 +1,192 @@
+import atexit
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from core.models import AttemptStatus, SectionAttempt
+
+HEARTBEAT_ROWS_PER_STATEMENT = 1000
+
+
+# ======================================================================================================================
+# Section heartbeats
+# ======================================================================================================================
+# Клиент секция ашық тұрғанда әр ATTEMPT_HEARTBEAT_SECONDS сайын heartbeat жібереді. Өсімдер worker жадында
+# section_attempt_id бойынша жинақталып, ATTEMPT_HEARTBEAT_FLUSH_SECONDS сайын бір UPDATE ... FROM (VALUES ...)
+# сұранысымен жазылады. Flush-ты трафикке тәуелсіз фондық thread жасайды (әр worker-де біреу). Worker құласа,
+# ең көбі соңғы flush аралығындағы уақыт жоғалады.
+_pending: dict[int, int] = {}
+# (user_id, attempt_id, section_id) -> [section_attempt_id, deadline_at, соңғы heartbeat (monotonic)]
+_seen: dict[tuple, list] = {}
+_last_flush = time.monotonic()
+_lock = threading.Lock()
+_stats = {"heartbeats": 0, "flushes": 0, "statements": 0, "rows": 0}
+_flusher: threading.Thread | None = None
+
+
+def _resolve(user_id: int, attempt_id: int, section_id: int):
+    row = (
+        SectionAttempt.objects
+        .filter(
+            attempt_id=attempt_id,
+            attempt__user_id=user_id,
+            attempt__status=AttemptStatus.IN_PROGRESS,
+            section_id=section_id,
+            status=AttemptStatus.IN_PROGRESS,
+        )
+        .values_list("id", "deadline_at")
+        .first()
+    )
+    return list(row) + [None] if row else None
+
+
+# record_heartbeat
+# Бір worker-ге келген heartbeat-тер арасындағы уақыттан артық есептелмейді (ең көбі бір интервал). Worker-лер
+# күйді бөліспейді, сондықтан жиі heartbeat-тер бірнеше worker-ге таралса, өсімдер қосылып кетуі мүмкін — жалпы
+# уақытты секцияның нақты ұзақтығымен write_time_spent шектейді. Секция worker кэшінде болса, сұраныс DB-ға бармайды.
+def record_heartbeat(user_id: int, attempt_id: int, section_id: int) -> bool:
+    key = (user_id, attempt_id, section_id)
+    with _lock:
+        entry = _seen.get(key)
+    if entry is None:
+        entry = _resolve(user_id, attempt_id, section_id)
+        if entry is None:
+            return False
+
+    section_attempt_id, deadline_at, last_seen = entry
+    if deadline_at and timezone.now() > deadline_at:
+        return False
+
+    interval = settings.ATTEMPT_HEARTBEAT_SECONDS
+    now = time.monotonic()
+    credit = interval if last_seen is None else int(min(now - last_seen, interval))
+    with _lock:
+        entry[2] = now
+        _seen[key] = entry
+    add_time_spent(section_attempt_id, credit)
+    return True
+
+
+# add_time_spent
+# Өсімді буферге қосады; flush аралығы өтсе немесе буфер толса, осы сұраныс ішінде flush жасалады.
+# background=False фондық thread-ті іске қоспайды (bench транзакция ішінде жұмыс істейді).
+def add_time_spent(section_attempt_id: int, seconds: int, background: bool = True) -> None:
+    if background:
+        _ensure_flusher()
+    with _lock:
+        _stats["heartbeats"] += 1
+        if seconds > 0:
+            _pending[section_attempt_id] = _pending.get(section_attempt_id, 0) + seconds
+        due = (
+            time.monotonic() - _last_flush >= settings.ATTEMPT_HEARTBEAT_FLUSH_SECONDS
+            or len(_pending) >= settings.ATTEMPT_HEARTBEAT_MAX_PENDING
+        )
+    if due:
+        flush_heartbeats()
+
+
+# write_time_spent
+# Жалпы уақыт секцияның ұзақтығынан аспайды: жабылған секцияда finished_at - started_at, ашық секцияда
+# NOW() - started_at. Секция flush-қа дейін жабылған болса да өсім осы шекпен жазылады.
+def write_time_spent(rows: list[tuple[int, int]]) -> int:
+    table = connection.ops.quote_name(SectionAttempt._meta.db_table)
+    statements = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), HEARTBEAT_ROWS_PER_STATEMENT):
+            chunk = rows[start:start + HEARTBEAT_ROWS_PER_STATEMENT]
+            values = ", ".join(["(%s::bigint, %s::integer)"] * len(chunk))
+            cursor.execute(
+                f"UPDATE {table} AS sa "
+                f"SET time_spent_seconds = CASE "
+                f"WHEN sa.started_at IS NOT NULL THEN LEAST("
+                f"sa.time_spent_seconds + v.delta, "
+                f"GREATEST(FLOOR(EXTRACT(EPOCH FROM COALESCE(sa.finished_at, NOW()) - sa.started_at))::integer, 0)) "
+                f"ELSE sa.time_spent_seconds + v.delta END "
+                f"FROM (VALUES {values}) AS v (id, delta) "
+                f"WHERE sa.id = v.id",
+                [x for row in chunk for x in row],
+            )
+            statements += 1
+    return statements
+
+
+# flush_heartbeats
+# Буфер lock астында ауыстырылады, UPDATE lock-сыз орындалады. Қате болса, өсімдер буферге қайтарылады.
+def flush_heartbeats() -> int:
+    global _pending, _last_flush
+    with _lock:
+        rows, _pending = sorted(_pending.items()), {}
+        now = _last_flush = time.monotonic()
+        stale = now - 4 * settings.ATTEMPT_HEARTBEAT_SECONDS
+        for key in [k for k, e in _seen.items() if e[2] is not None and e[2] < stale]:
+            del _seen[key]
+    if not rows:
+        return 0
+
+    try:
+        statements = write_time_spent(rows)
+    except Exception:
+        with _lock:
+            for section_attempt_id, delta in rows:
+                _pending[section_attempt_id] = _pending.get(section_attempt_id, 0) + delta
+        raise
+
+    with _lock:
+        _stats["flushes"] += 1
+        _stats["statements"] += statements
+        _stats["rows"] += len(rows)
+    return len(rows)
+
+
+# heartbeat_stats
+# Осы процесс бойынша: write_reduction = heartbeat саны / UPDATE сұраныс саны.
+def heartbeat_stats() -> dict:
+    with _lock:
+        stats = dict(_stats, pending=len(_pending))
+    stats["write_reduction"] = round(stats["heartbeats"] / stats["statements"], 1) if stats["statements"] else None
+    return stats
+
+
+# _ensure_flusher
+# Фондық thread әр ATTEMPT_HEARTBEAT_FLUSH_SECONDS сайын буферді жазады: соңғы heartbeat-тен кейін сұраныс
+# келмесе де өсімдер кешікпейді. Өз DB қосылымын пайдаланады.
+def _flush_loop() -> None:
+    while True:
+        time.sleep(settings.ATTEMPT_HEARTBEAT_FLUSH_SECONDS)
+        try:
+            flush_heartbeats()
+        except Exception:
+            pass
+        finally:
+            close_old_connections()
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="heartbeat-flusher", daemon=True)
+            _flusher.start()
+
+
+def reset_heartbeat_state() -> None:
+    global _pending, _last_flush
+    with _lock:
+        _pending = {}
+        _seen.clear()
+        _last_flush = time.monotonic()
+        for key in _stats:
+            _stats[key] = 0
+
+
+@atexit.register
+def _flush_on_exit() -> None:
+    try:
+        flush_heartbeats()
+    except Exception:
+        pass
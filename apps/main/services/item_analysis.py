@@ -0,0 +1,193 @@
+import time
+
+import numpy as np
+from django.db.models import Count, FloatField
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+from apps.main.services.blueprint import get_exam_blueprint
+from core.models import AttemptStatus, Exam, ExamAttempt, ExamItemAnalysis, MCQSelection, QuestionAttempt
+
+ANALYSIS_CHUNK_ATTEMPTS = 5000
+
+_ROW_DTYPE = np.dtype([("attempt_id", np.int64), ("question_id", np.int64), ("score", np.float64)])
+
+
+# ======================================================================================================================
+# Item analysis
+# ======================================================================================================================
+# Аяқталған attempt-тер × сұрақтар балл матрицасы ORM объектілерінсіз, values_list ағынынан алдын ала бөлінген
+# NumPy массивіне толтырылады. Жауап жоқ ұяшық 0 балл деп есептеледі.
+def _question_max(q) -> float:
+    if q.question_type == "speaking_keywords" and q.speaking_rubric:
+        return float(q.speaking_rubric.max_points)
+    return float(q.points)
+
+
+def load_score_matrix(exam: Exam, question_ids, chunk_attempts: int = ANALYSIS_CHUNK_ATTEMPTS):
+    attempt_ids = np.fromiter(
+        ExamAttempt.objects
+        .filter(exam=exam, status=AttemptStatus.FINISHED)
+        .order_by("id")
+        .values_list("id", flat=True)
+        .iterator(chunk_size=20000),
+        dtype=np.int64,
+    )
+    question_ids = np.asarray(question_ids, dtype=np.int64)
+    if not len(question_ids):
+        return attempt_ids, np.zeros((len(attempt_ids), 0), dtype=np.float32)
+    col_order = np.argsort(question_ids)
+    sorted_qids = question_ids[col_order]
+
+    matrix = np.zeros((len(attempt_ids), len(question_ids)), dtype=np.float32)
+    for start in range(0, len(attempt_ids), chunk_attempts):
+        lo, hi = attempt_ids[start], attempt_ids[min(start + chunk_attempts, len(attempt_ids)) - 1]
+        rows = (
+            QuestionAttempt.objects
+            .filter(
+                section_attempt__attempt__exam=exam,
+                section_attempt__attempt__status=AttemptStatus.FINISHED,
+                section_attempt__attempt_id__range=(int(lo), int(hi)),
+            )
+            .values_list("section_attempt__attempt_id", "question_id", Cast("score", FloatField()))
+            .iterator(chunk_size=20000)
+        )
+        chunk = np.fromiter(rows, dtype=_ROW_DTYPE)
+        if not len(chunk):
+            continue
+
+        # Тек дәл сәйкес келгендер: attempt тізімі алынғаннан кейін аяқталған attempt (немесе белгісіз сұрақ)
+        # көрші жолға/бағанға жазылмай, тасталады
+        pos = np.minimum(np.searchsorted(sorted_qids, chunk["question_id"]), len(sorted_qids) - 1)
+        row_idx = np.minimum(np.searchsorted(attempt_ids, chunk["attempt_id"]), len(attempt_ids) - 1)
+        known = (sorted_qids[pos] == chunk["question_id"]) & (attempt_ids[row_idx] == chunk["attempt_id"])
+        matrix[row_idx[known], col_order[pos[known]]] = chunk["score"][known]
+
+    return attempt_ids, matrix
+
+
+def _item_rest_correlation(matrix: np.ndarray) -> np.ndarray:
+    # Dichotomous сұрақ үшін бұл point-biserial корреляция, ал балл сұрақтан алынып тасталады (corrected)
+    x = matrix.astype(np.float64)
+    rest = x.sum(axis=1, keepdims=True) - x
+    xc = x - x.mean(axis=0)
+    rc = rest - rest.mean(axis=0)
+    denom = np.sqrt((xc ** 2).sum(axis=0) * (rc ** 2).sum(axis=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = (xc * rc).sum(axis=0) / denom
+    return np.where(denom > 0, r, np.nan)
+
+
+def _cronbach_alpha(matrix: np.ndarray) -> float | None:
+    n, k = matrix.shape
+    if k < 2 or n < 2:
+        return None
+    x = matrix.astype(np.float64)
+    total_var = x.sum(axis=1).var(ddof=1)
+    if total_var <= 0:
+        return None
+    return float(k / (k - 1) * (1 - x.var(axis=0, ddof=1).sum() / total_var))
+
+
+def _none_if_nan(value) -> float | None:
+    value = float(value)
+    return None if np.isnan(value) else round(value, 4)
+
+
+def _option_counts(exam: Exam) -> dict:
+    rows = (
+        MCQSelection.objects
+        .filter(
+            question_attempt__section_attempt__attempt__exam=exam,
+            question_attempt__section_attempt__attempt__status=AttemptStatus.FINISHED,
+        )
+        .values_list("option_id")
+        .annotate(n=Count("id"))
+        .order_by()
+    )
+    return dict(rows)
+
+
+# compute_item_analysis
+def compute_item_analysis(exam: Exam, chunk_attempts: int = ANALYSIS_CHUNK_ATTEMPTS) -> dict:
+    bp = get_exam_blueprint(exam)
+    questions = bp.questions
+    attempt_ids, matrix = load_score_matrix(exam, bp.question_ids, chunk_attempts)
+    n = len(attempt_ids)
+
+    maxima = np.array([_question_max(q) for q in questions], dtype=np.float64)
+    if n:
+        means = matrix.mean(axis=0, dtype=np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            difficulty = np.where(maxima > 0, means / maxima, np.nan)
+        discrimination = _item_rest_correlation(matrix)
+    else:
+        means = difficulty = discrimination = np.full(len(questions), np.nan)
+
+    option_counts = _option_counts(exam)
+    question_rows = []
+    for i, q in enumerate(questions):
+        options = []
+        if q.is_mcq:
+            for o in q.options:
+                count = option_counts.get(o.id, 0)
+                options.append({
+                    "id": o.id,
+                    "text": strip_tags(o.text or "")[:120],
+                    "is_correct": o.is_correct,
+                    "count": count,
+                    "share": round(count / n, 4) if n else None,
+                })
+        question_rows.append({
+            "id": q.id,
+            "section_id": q.section_id,
+            "order": q.order,
+            "question_type": q.question_type,
+            "prompt": strip_tags(q.prompt or "")[:200],
+            "max_score": float(maxima[i]),
+            "mean": _none_if_nan(means[i]),
+            "difficulty": _none_if_nan(difficulty[i]),
+            "discrimination": _none_if_nan(discrimination[i]),
+            "options": options,
+        })
+
+    col_by_qid = {qid: i for i, qid in enumerate(bp.question_ids)}
+    section_rows = []
+    for sec in bp.sections:
+        cols = [col_by_qid[q.id] for q in sec.questions]
+        alpha = _cronbach_alpha(matrix[:, cols]) if cols else None
+        section_rows.append({
+            "id": sec.id,
+            "section_type": sec.section_type,
+            "label": str(sec.get_section_type_display()),
+            "item_count": len(cols),
+            "alpha": None if alpha is None else round(alpha, 4),
+        })
+
+    return {"attempt_count": n, "questions": question_rows, "sections": section_rows}
+
+
+# refresh_item_analysis / get_item_analysis
+# Нәтиже ExamItemAnalysis қатарында сақталады; GET сақталғанын қайтарады, қайта есептеуді менеджер өзі сұрайды.
+def refresh_item_analysis(exam: Exam) -> ExamItemAnalysis:
+    started = time.perf_counter()
+    data = compute_item_analysis(exam)
+    analysis, _ = ExamItemAnalysis.objects.update_or_create(
+        exam=exam,
+        defaults={
+            "content_version": exam.content_version,
+            "attempt_count": data["attempt_count"],
+            "data": data,
+            "compute_seconds": time.perf_counter() - started,
+            "computed_at": timezone.now(),
+        },
+    )
+    return analysis
+
+
+def get_item_analysis(exam: Exam) -> ExamItemAnalysis:
+    analysis = ExamItemAnalysis.objects.filter(exam=exam).first()
+    if analysis is None:
+        analysis = refresh_item_analysis(exam)
+    return analysis
@@ -0,0 +1,47 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from core.models import AttemptStatus, ExamAttempt
+
+MONITOR_STATUSES = (AttemptStatus.IN_PROGRESS, AttemptStatus.FINISHED)
+
+
+# ======================================================================================================================
+# Live exam monitor
+# ======================================================================================================================
+# Барлық мәліметтер ExamAttempt қатарынан (answered_count есептегіші) алынады: сұраныс құны QuestionAttempt
+# санына тәуелді емес. Терезе: барлық in_progress + соңғы MONITOR_WINDOW_HOURS ішінде аяқталған finished.
+# "-status" ретінде in_progress алдымен шығады.
+def monitor_queryset(exam_id: int):
+    since = timezone.now() - timedelta(hours=settings.MONITOR_WINDOW_HOURS)
+    return ExamAttempt.objects.filter(
+        Q(status=AttemptStatus.IN_PROGRESS) | Q(status=AttemptStatus.FINISHED, finished_at__gte=since),
+        exam_id=exam_id,
+    )
+
+
+# monitor_etag
+# Бір агрегат сұраныс: жаңа attempt, жауап немесе тапсыру болса progress_at/санақтар өзгереді.
+def monitor_etag(exam_id: int) -> str:
+    agg = monitor_queryset(exam_id).aggregate(
+        total=Count("id"),
+        in_progress=Count("id", filter=Q(status=AttemptStatus.IN_PROGRESS)),
+        last_progress=Max("progress_at"),
+    )
+    raw = f"{exam_id}:{agg['total']}:{agg['in_progress']}:{agg['last_progress'] and agg['last_progress'].isoformat()}"
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def monitor_rows(exam_id: int) -> list[dict]:
+    return list(
+        monitor_queryset(exam_id)
+        .order_by("-status", "-progress_at", "id")
+        .values(
+            "id", "status", "started_at", "finished_at", "progress_at", "answered_count",
+            "user__username", "user__first_name", "user__last_name", "user__iin",
+        )
+    )
@@ -0,0 +1,288 @@
+import multiprocessing
+import os
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+from django.conf import settings
+
+
+# ======================================================================================================================
+# Sandbox
+# ======================================================================================================================
+# Жазбаша жауаптың кодын бөлек процесте rlimit шектеулерімен (CPU, жады, файл өлшемі, процесс саны), бос env-пен
+# bubblewrap ішінде орындайды: желі, PID, IPC namespace-тері бөлек, түбір файл жүйесі жеке — жүйелік каталогтар
+# тек оқуға, жазуға тек уақытша каталог ашық. Оқшаулау жұмыс істемесе, код мүлде іске қосылмайды (fail closed).
+# Бұл модульдің runner бөлігі тек stdlib-ке сүйенеді: ол pool worker процестерінде Django-ны баптамай-ақ жұмыс істейді.
+class SandboxIsolationError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    cpu_seconds: int = 2
+    wall_seconds: float = 5
+    memory_mb: int = 256
+    output_bytes: int = 1024 * 1024
+    # RLIMIT_NPROC нақты uid бойынша санайды: grader бөлек жүйелік пайдаланушымен іске қосылуы керек
+    max_processes: int = 128
+    isolate: bool = True
+
+
+@dataclass(frozen=True)
+class RunResult:
+    status: str
+    stdout: str = ""
+    stderr: str = ""
+    exit_code: int | None = None
+    wall_seconds: float = 0.0
+
+    OK = "ok"
+    COMPILE_ERROR = "compile_error"
+    RUNTIME_ERROR = "runtime_error"
+    TIMEOUT = "timeout"
+    UNSUPPORTED = "unsupported"
+    UNAVAILABLE = "unavailable"
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    source: str
+    compile: tuple | None
+    run: tuple
+    # JVM және V8 үлкен виртуалды жады резервтейді, оларға RLIMIT_AS орнына runtime флагтары қолданылады
+    limit_address_space: bool = True
+
+
+LANGUAGES = {
+    "python": LanguageSpec(source="main.py", compile=None, run=(sys.executable, "-I", "-S", "main.py")),
+    "cpp": LanguageSpec(
+        source="main.cpp",
+        compile=("g++", "-O2", "-std=c++17", "-o", "main", "main.cpp"),
+        run=("./main",),
+    ),
+    "java": LanguageSpec(
+        source="Main.java",
+        compile=("javac", "Main.java"),
+        run=("java", "-Xmx{memory_mb}m", "Main"),
+        limit_address_space=False,
+    ),
+    "js": LanguageSpec(
+        source="main.js",
+        compile=None,
+        run=("node", "--max-old-space-size={memory_mb}", "main.js"),
+        limit_address_space=False,
+    ),
+}
+
+COMPILE_LIMITS = SandboxLimits(cpu_seconds=20, wall_seconds=30, memory_mb=1024, output_bytes=64 * 1024 * 1024)
+
+
+@lru_cache(maxsize=None)
+def is_language_available(language: str) -> bool:
+    spec = LANGUAGES.get(language)
+    if spec is None:
+        return False
+    binaries = [spec.run[0]] if not spec.run[0].startswith("./") else []
+    if spec.compile:
+        binaries.append(spec.compile[0])
+    return all(shutil.which(b) for b in binaries)
+
+
+SANDBOX_DIR = "/sandbox"
+# Toolchain-дар үшін тек оқуға ашылатын жолдар; жоқтары (--ro-bind-try) өткізіп жіберіледі
+_READONLY_PATHS = ("/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/etc/alternatives", "/etc/ld.so.cache")
+
+
+def _isolation_prefix(workdir: str) -> tuple:
+    prefix = ["bwrap", "--unshare-all", "--die-with-parent", "--new-session"]
+    for path in dict.fromkeys((*_READONLY_PATHS, sys.prefix, sys.base_prefix)):
+        prefix += ["--ro-bind-try", path, path]
+    prefix += [
+        "--proc", "/proc", "--dev", "/dev", "--tmpfs", "/tmp",
+        "--bind", workdir, SANDBOX_DIR, "--chdir", SANDBOX_DIR, "--",
+    ]
+    return tuple(prefix)
+
+
+# isolation_available
+# bwrap бар әрі осы хостта unprivileged namespace ашуға рұқсат бар-жоғын бір рет нақты іске қосып тексереді.
+@lru_cache(maxsize=None)
+def isolation_available() -> bool:
+    if not shutil.which("bwrap"):
+        return False
+    with tempfile.TemporaryDirectory(prefix="sandbox-check-") as workdir:
+        try:
+            return subprocess.run(
+                _isolation_prefix(workdir) + ("true",), capture_output=True, timeout=5,
+            ).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            return False
+
+
+def _limit_child(limits: SandboxLimits, limit_address_space: bool):
+    def apply():
+        os.setsid()
+        resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1))
+        resource.setrlimit(resource.RLIMIT_FSIZE, (limits.output_bytes, limits.output_bytes))
+        resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        resource.setrlimit(resource.RLIMIT_NOFILE, (256, 256))
+        resource.setrlimit(resource.RLIMIT_NPROC, (limits.max_processes, limits.max_processes))
+        if limit_address_space:
+            memory = limits.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    return apply
+
+
+def _read_capped(path: str, limit: int) -> str:
+    with open(path, "rb") as f:
+        return f.read(limit).decode("utf-8", errors="replace")
+
+
+# _execute
+# root: бір жолғы каталог. Код root/src ішінде жатады (sandbox ішінде /sandbox), stdin/stdout/stderr файлдары
+# root-та — sandbox оларды көрмейді.
+def _execute(cmd: tuple, root: str, limits: SandboxLimits, limit_address_space: bool, stdin: str = "") -> tuple:
+    workdir = os.path.join(root, "src")
+    if limits.isolate:
+        cmd = _isolation_prefix(workdir) + cmd
+        home = SANDBOX_DIR
+    else:
+        home = workdir
+
+    out_path = os.path.join(root, ".stdout")
+    err_path = os.path.join(root, ".stderr")
+    in_path = os.path.join(root, ".stdin")
+    with open(in_path, "w", encoding="utf-8") as f:
+        f.write(stdin or "")
+
+    env = {"PATH": "/usr/local/bin:/usr/bin:/bin", "HOME": home, "LANG": "C.UTF-8"}
+    started = time.perf_counter()
+    timed_out = False
+    # stdout/stderr файлға жазылады: RLIMIT_FSIZE шығыс көлемін шектейді, pipe жадыны толтырмайды
+    with open(in_path, "rb") as fin, open(out_path, "wb") as fout, open(err_path, "wb") as ferr:
+        proc = subprocess.Popen(
+            cmd, cwd=workdir, env=env,
+            stdin=fin, stdout=fout, stderr=ferr,
+            preexec_fn=_limit_child(limits, limit_address_space),
+        )
+        try:
+            proc.wait(timeout=limits.wall_seconds)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+        finally:
+            # Қалыпты шығуда да: фонда қалған ұрпақ процестер топпен бірге жойылады
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            proc.wait()
+
+    wall = time.perf_counter() - started
+    return (
+        proc.returncode,
+        timed_out,
+        _read_capped(out_path, limits.output_bytes),
+        _read_capped(err_path, 64 * 1024),
+        wall,
+    )
+
+
+# run_code
+# Pool worker ішінде орындалатын функция. Бір жолғы уақытша каталогта компиляциялап, іске қосады.
+def run_code(language: str, code: str, stdin: str = "", limits: SandboxLimits = SandboxLimits()) -> RunResult:
+    spec = LANGUAGES.get(language)
+    if spec is None or not is_language_available(language):
+        return RunResult(status=RunResult.UNSUPPORTED)
+    if limits.isolate and not isolation_available():
+        return RunResult(status=RunResult.UNAVAILABLE, stderr="sandbox isolation (bwrap) is not available")
+
+    with tempfile.TemporaryDirectory(prefix="sandbox-") as root:
+        os.mkdir(os.path.join(root, "src"))
+        with open(os.path.join(root, "src", spec.source), "w", encoding="utf-8") as f:
+            f.write(code or "")
+
+        compile_limits = replace(COMPILE_LIMITS, isolate=limits.isolate, max_processes=limits.max_processes)
+        if spec.compile:
+            code_, timed_out, _out, err, wall = _execute(spec.compile, root, compile_limits, False)
+            if timed_out or code_ != 0:
+                return RunResult(status=RunResult.COMPILE_ERROR, stderr=err, exit_code=code_, wall_seconds=wall)
+
+        cmd = tuple(part.format(memory_mb=limits.memory_mb) for part in spec.run)
+        code_, timed_out, out, err, wall = _execute(cmd, root, limits, spec.limit_address_space, stdin)
+
+    if timed_out or code_ in (-signal.SIGXCPU, -signal.SIGKILL):
+        status = RunResult.TIMEOUT
+    elif code_ != 0:
+        status = RunResult.RUNTIME_ERROR
+    else:
+        status = RunResult.OK
+    return RunResult(status=status, stdout=out, stderr=err, exit_code=code_, wall_seconds=wall)
+
+
+def _warm_up(_):
+    return os.getpid()
+
+
+# ======================================================================================================================
+# Sandbox pool
+# ======================================================================================================================
+# Алдын ала ашылған worker процестер. Әр процесс кезектен тапсырма алып, оны жеке шектелген child-та
+# орындайды, сондықтан көп submission барлық ядроларда қатар тексеріледі.
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def sandbox_limits() -> SandboxLimits:
+    return SandboxLimits(
+        cpu_seconds=settings.SANDBOX_CPU_SECONDS,
+        wall_seconds=settings.SANDBOX_WALL_SECONDS,
+        memory_mb=settings.SANDBOX_MEMORY_MB,
+        output_bytes=settings.SANDBOX_OUTPUT_BYTES,
+        max_processes=settings.SANDBOX_MAX_PROCESSES,
+        isolate=settings.SANDBOX_ISOLATE,
+    )
+
+
+# get_sandbox_pool
+# Оқшаулау қосулы, бірақ хостта жұмыс істемесе, pool ашылмайды: grader іске қосылғанда бірден қате береді.
+def get_sandbox_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if settings.SANDBOX_ISOLATE and not isolation_available():
+                raise SandboxIsolationError("SANDBOX_ISOLATE is on, but bwrap cannot create an isolated sandbox here")
+            methods = multiprocessing.get_all_start_methods()
+            ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            workers = settings.SANDBOX_WORKERS or os.cpu_count() or 1
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+            list(_pool.map(_warm_up, range(workers)))
+        return _pool
+
+
+def shutdown_sandbox_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+# run_many
+# items: (language, code, stdin) тізбегі. Нәтижелер сол ретпен қайтарылады.
+def run_many(items, limits: SandboxLimits | None = None) -> list[RunResult]:
+    items = list(items)
+    if not items:
+        return []
+    limits = limits or sandbox_limits()
+    pool = get_sandbox_pool()
+    futures = [pool.submit(run_code, language, code, stdin, limits) for language, code, stdin in items]
+    return [f.result() for f in futures]
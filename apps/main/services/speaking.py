@@ -1,13 +1,15 @@
 from django.conf import settings
+from functools import lru_cache
 from openai import OpenAI
 import re
 
 client = OpenAI(api_key=settings.OPENAI_API_KEY)
+TRANSCRIBE_MODEL = "gpt-4o-mini-transcribe"
 
 def transcribe_audio(file_path: str) -> str:
     with open(file_path, "rb") as f:
         res = client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe",
+            model=TRANSCRIBE_MODEL,
             file=f,
         )
     # docs бойынша json response, негізгі мәтін res.text болуы мүмкін
@@ -15,39 +17,61 @@ def transcribe_audio(file_path: str) -> str:
 
 
 
+_PUNCT_RE = re.compile(r"[^\w\s]+", flags=re.UNICODE)
+_SPACE_RE = re.compile(r"\s+", flags=re.UNICODE)
+
+
 def _normalize(s: str) -> str:
     s = s.lower().strip()
-    s = re.sub(r"[^\w\s]+", " ", s, flags=re.UNICODE)
-    s = re.sub(r"\s+", " ", s, flags=re.UNICODE)
+    s = _PUNCT_RE.sub(" ", s)
+    s = _SPACE_RE.sub(" ", s)
     return s
 
+
+# KeywordMatcher
+# Рубрика кілт сөздерін бір рет нормализациялайды. Нормализацияланған транскриптте тек \w таңбалары мен
+# жалғыз бос орын қалады, сондықтан бір сөзді \b...\b іздеу токендер жиынына тиесілілікпен бірдей,
+# ал фраза бұрынғыдай substring ретінде ізделеді.
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self.entries = []
+        for kw in (keywords or []):
+            if not isinstance(kw, str):
+                continue
+            k = _normalize(kw)
+            if not k:
+                continue
+            self.entries.append((kw.strip(), kw.strip().lower(), k, " " in k))
+
+    def match(self, transcript: str) -> list[str]:
+        t = _normalize(transcript)
+        tokens = set(t.split())
+
+        # unique, original form-да сақтаймыз
+        uniq = []
+        seen = set()
+        for original, key, k, is_phrase in self.entries:
+            found = (k in t) if is_phrase else (k in tokens)
+            if found and key and key not in seen:
+                seen.add(key)
+                uniq.append(original)
+        return uniq
+
+    def match_many(self, transcripts) -> list[list[str]]:
+        return [self.match(t) for t in transcripts]
+
+
+@lru_cache(maxsize=1024)
+def _compiled_matcher(keywords: tuple) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_keyword_matcher(keywords) -> KeywordMatcher:
+    return _compiled_matcher(tuple(kw for kw in (keywords or []) if isinstance(kw, str)))
+
+
 def match_keywords(transcript: str, keywords: list[str]) -> list[str]:
-    t = _normalize(transcript)
-    matched = []
-
-    for kw in (keywords or []):
-        if not isinstance(kw, str):
-            continue
-        k = _normalize(kw)
-        if not k:
-            continue
-
-        if " " in k:
-            if k in t:
-                matched.append(kw)
-        else:
-            if re.search(rf"\b{re.escape(k)}\b", t, flags=re.UNICODE):
-                matched.append(kw)
-
-    # unique, original form-да сақтаймыз
-    uniq = []
-    seen = set()
-    for m in matched:
-        key = m.strip().lower()
-        if key and key not in seen:
-            seen.add(key)
-            uniq.append(m.strip())
-    return uniq
+    return get_keyword_matcher(keywords).match(transcript)
 
 def score_speaking(matched_keywords: list[str], point_per_keyword: int, max_points: int) -> int:
     raw = len(matched_keywords) * int(point_per_keyword or 0)
@@ -0,0 +1,218 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from core.models import AttemptStatus, ExamAttempt, ExamScoreHistogram, SectionAttempt, UserProgressStats
+
+STATS_META_KEY = "stats"
+SCORE_HISTOGRAM_BUCKETS = 20
+
+
+# ======================================================================================================================
+# User progress stats
+# ======================================================================================================================
+# attempt_contribution
+# Бір attempt-тің UserProgressStats-қа қосатын үлесі. max_score=0 болса пайыз есептелмейді (бұрынғы NullIf сияқты).
+def attempt_contribution(total_score, max_total_score, section_rows) -> dict:
+    sections = {}
+    for section_type, score, max_score in section_rows:
+        if not max_score:
+            continue
+        entry = sections.setdefault(section_type, [0.0, 0])
+        entry[0] += float(score) * 100.0 / float(max_score)
+        entry[1] += 1
+
+    return {
+        "percent": float(total_score) * 100.0 / float(max_total_score) if max_total_score else None,
+        "score": str(total_score or 0),
+        "max_score": str(max_total_score or 0),
+        "sections": sections,
+    }
+
+
+def _apply_contribution(stats: UserProgressStats, contribution: dict, sign: int) -> None:
+    stats.attempt_count += sign
+    if contribution["percent"] is not None:
+        stats.scored_count += sign
+        stats.percent_sum += sign * contribution["percent"]
+    stats.score_sum += sign * Decimal(contribution["score"])
+    stats.max_score_sum += sign * Decimal(contribution["max_score"])
+
+    for section_type, (percent_sum, count) in contribution["sections"].items():
+        entry = stats.section_stats.setdefault(section_type, {"percent_sum": 0.0, "count": 0})
+        entry["percent_sum"] += sign * percent_sum
+        entry["count"] += sign * count
+
+
+def _section_rows(attempt_ids) -> dict:
+    rows = {}
+    qs = (
+        SectionAttempt.objects
+        .filter(attempt_id__in=attempt_ids)
+        .values_list("attempt_id", "section__section_type", "score", "max_score")
+    )
+    for attempt_id, section_type, score, max_score in qs:
+        rows.setdefault(attempt_id, []).append((section_type, score, max_score))
+    return rows
+
+
+# record_attempt_stats
+# Attempt аяқталғанда және кейін қайта бағаланғанда шақырылады: бұрынғы үлесі алынып, жаңасы қосылады.
+@transaction.atomic
+def record_attempt_stats(attempt: ExamAttempt) -> None:
+    locked = (
+        ExamAttempt.objects
+        .select_for_update()
+        .only("id", "user_id", "exam_id", "status", "total_score", "max_total_score", "meta")
+        .get(pk=attempt.pk)
+    )
+    if locked.status != AttemptStatus.FINISHED:
+        return
+
+    new = attempt_contribution(
+        locked.total_score, locked.max_total_score, _section_rows([locked.pk]).get(locked.pk, []),
+    )
+    meta = locked.meta or {}
+    old = meta.get(STATS_META_KEY)
+    if old == new:
+        return
+
+    UserProgressStats.objects.get_or_create(user_id=locked.user_id)
+    stats = UserProgressStats.objects.select_for_update().get(user_id=locked.user_id)
+    if old is not None:
+        _apply_contribution(stats, old, -1)
+    _apply_contribution(stats, new, +1)
+    stats.save()
+
+    update_score_histogram(locked.exam_id, old["percent"] if old else None, new["percent"])
+
+    meta[STATS_META_KEY] = new
+    ExamAttempt.objects.filter(pk=locked.pk).update(meta=meta)
+    attempt.meta = meta
+
+
+# rebuild_user_stats
+# Берілген қолданушылардың статистикасын нөлден есептейді (backfill және түзету үшін).
+@transaction.atomic
+def rebuild_user_stats(user_ids) -> int:
+    user_ids = list(user_ids)
+    attempts = list(
+        ExamAttempt.objects
+        .select_for_update()
+        .filter(user_id__in=user_ids, status=AttemptStatus.FINISHED)
+        .only("id", "user_id", "total_score", "max_total_score", "meta")
+    )
+    sections = _section_rows([a.pk for a in attempts])
+
+    stats_by_user = {uid: UserProgressStats(user_id=uid) for uid in user_ids}
+    for attempt in attempts:
+        contribution = attempt_contribution(attempt.total_score, attempt.max_total_score, sections.get(attempt.pk, []))
+        _apply_contribution(stats_by_user[attempt.user_id], contribution, +1)
+        attempt.meta = {**(attempt.meta or {}), STATS_META_KEY: contribution}
+
+    ExamAttempt.objects.bulk_update(attempts, ["meta"], batch_size=500)
+    UserProgressStats.objects.bulk_create(
+        stats_by_user.values(),
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["attempt_count", "scored_count", "percent_sum", "score_sum", "max_score_sum", "section_stats", "updated_at"],
+    )
+    return len(attempts)
+
+
+# ======================================================================================================================
+# Score histogram
+# ======================================================================================================================
+def score_bucket(percent: float, buckets: int = SCORE_HISTOGRAM_BUCKETS) -> int:
+    return min(max(int(percent * buckets / 100.0), 0), buckets - 1)
+
+
+# update_score_histogram
+# Attempt-тің бұрынғы пайызы бар bucket-тен бір алынып, жаңасына бір қосылады (None — есепке кірмейді).
+def update_score_histogram(exam_id: int, old_percent, new_percent) -> None:
+    if old_percent is None and new_percent is None:
+        return
+
+    ExamScoreHistogram.objects.get_or_create(
+        exam_id=exam_id,
+        defaults={"bucket_count": SCORE_HISTOGRAM_BUCKETS, "counts": [0] * SCORE_HISTOGRAM_BUCKETS},
+    )
+    hist = ExamScoreHistogram.objects.select_for_update().get(exam_id=exam_id)
+    counts = list(hist.counts) or [0] * hist.bucket_count
+
+    if old_percent is not None:
+        i = score_bucket(old_percent, hist.bucket_count)
+        if counts[i] > 0:
+            counts[i] -= 1
+            hist.total -= 1
+    if new_percent is not None:
+        counts[score_bucket(new_percent, hist.bucket_count)] += 1
+        hist.total += 1
+
+    hist.counts = counts
+    hist.save(update_fields=["counts", "total", "updated_at"])
+
+
+# percentile_rank
+# Нәтижесі төмен attempt-тер үлесі (өз bucket-інің жартысы қоса): (below + same / 2) / total * 100.
+def percentile_rank(hist: ExamScoreHistogram, percent: float) -> float | None:
+    if not hist or not hist.total:
+        return None
+    i = score_bucket(percent, hist.bucket_count)
+    below = sum(hist.counts[:i])
+    return (below + hist.counts[i] / 2) * 100.0 / hist.total
+
+
+def score_distribution(hist: ExamScoreHistogram, percent: float | None = None) -> list[dict]:
+    if not hist or not hist.total:
+        return []
+    width = 100 / hist.bucket_count
+    current = score_bucket(percent, hist.bucket_count) if percent is not None else None
+    peak = max(hist.counts) or 1
+    return [
+        {
+            "lo": round(i * width),
+            "hi": round((i + 1) * width),
+            "count": count,
+            "height": round(count * 100 / peak),
+            "is_current": i == current,
+        }
+        for i, count in enumerate(hist.counts)
+    ]
+
+
+# rebuild_score_histograms
+# Аяқталған attempt-терді exam_id бойынша реттеп бір рет оқиды: әр емтиханның гистограммасы жинақталып бітісімен жазылады.
+def rebuild_score_histograms(exam_ids=None, buckets: int = SCORE_HISTOGRAM_BUCKETS) -> int:
+    qs = ExamAttempt.objects.filter(status=AttemptStatus.FINISHED)
+    if exam_ids:
+        qs = qs.filter(exam_id__in=exam_ids)
+    rows = qs.order_by("exam_id").values_list("exam_id", "total_score", "max_total_score").iterator(chunk_size=5000)
+
+    def flush(exam_id, counts):
+        ExamScoreHistogram.objects.update_or_create(
+            exam_id=exam_id,
+            defaults={"bucket_count": buckets, "counts": counts, "total": sum(counts)},
+        )
+
+    seen = set()
+    current_exam, counts = None, None
+    for exam_id, total_score, max_total_score in rows:
+        if exam_id != current_exam:
+            if current_exam is not None:
+                flush(current_exam, counts)
+                seen.add(current_exam)
+            current_exam, counts = exam_id, [0] * buckets
+        if max_total_score:
+            counts[score_bucket(float(total_score) * 100.0 / float(max_total_score), buckets)] += 1
+
+    if current_exam is not None:
+        flush(current_exam, counts)
+        seen.add(current_exam)
+
+    # Аяқталған attempt-і қалмаған емтихандардың гистограммасы тазаланады
+    stale = ExamScoreHistogram.objects.exclude(exam_id__in=seen)
+    if exam_ids:
+        stale = stale.filter(exam_id__in=exam_ids)
+    stale.delete()
+    return len(seen)
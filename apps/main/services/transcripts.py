@@ -0,0 +1,170 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db.models import Count, F, FloatField, Q, Sum
+from django.utils import timezone
+
+from apps.main.services.speaking import TRANSCRIBE_MODEL, transcribe_audio
+from core.models import TranscriptCacheEntry
+
+EVICT_BATCH_SIZE = 1000
+
+
+# ======================================================================================================================
+# Transcript cache
+# ======================================================================================================================
+# Кілт: аудио байттарының SHA-256 хэші + модель аты. Қайта бағалау, қайталанған submit және бірдей
+# жүктемелер API-ге қайта бармайды.
+
+
+# TranscriptCacheCounter
+# Бір бағалау сессиясының (attempt бағалауы, run_grader батчы) hit/miss санағыштары: шақырушы жасап,
+# transcribe_with_cache-ке береді.
+@dataclass
+class TranscriptCacheCounter:
+    hits: int = 0
+    misses: int = 0
+    failures: int = 0
+    saved_seconds: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        total = self.hits + self.misses
+        return round(self.hits / total, 3) if total else None
+
+
+def audio_sha256(file_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _timed(transcribe, path: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    text = transcribe(path)
+    return text, time.perf_counter() - started
+
+
+# transcribe_many
+# Кэш тек негізгі thread-те оқылып/жазылады; thread pool тек кэште жоқ файлдарды транскрипциялайды. Әр файлдың
+# нәтижесі бөлек жиналады: бір клиптің қатесі басқа (ақысы төленген) транскрипттерді кэшке жазуға кедергі
+# жасамайды. Қайтарады: (транскрипттер, қателер) — сәтсіз файлдың транскрипті None, қатесі path бойынша.
+def transcribe_many(
+    paths: list[str],
+    transcribe=transcribe_audio,
+    model: str = TRANSCRIBE_MODEL,
+    counter: TranscriptCacheCounter | None = None,
+) -> tuple[list[str | None], dict[str, Exception]]:
+    if not paths:
+        return [], {}
+    counter = counter if counter is not None else TranscriptCacheCounter()
+
+    hashes = [audio_sha256(path) for path in paths]
+    entries = {
+        e.audio_sha256: e
+        for e in TranscriptCacheEntry.objects.filter(model=model, audio_sha256__in=set(hashes))
+    }
+    if entries:
+        TranscriptCacheEntry.objects.filter(pk__in=[e.pk for e in entries.values()]).update(
+            hits=F("hits") + 1, last_used_at=timezone.now()
+        )
+        counter.hits += len(entries)
+        counter.saved_seconds += sum(e.transcribe_seconds for e in entries.values())
+
+    missing = {}
+    for h, path in zip(hashes, paths):
+        if h not in entries:
+            missing.setdefault(h, path)
+
+    results = {h: e.transcript for h, e in entries.items()}
+    failed = {}
+    if missing:
+        outputs = {}
+        workers = max(1, min(settings.GRADER_TRANSCRIBE_CONCURRENCY, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_timed, transcribe, path): h for h, path in missing.items()}
+            for future in as_completed(futures):
+                h = futures[future]
+                try:
+                    outputs[h] = future.result()
+                except Exception as exc:
+                    failed[h] = exc
+
+        if outputs:
+            TranscriptCacheEntry.objects.bulk_create(
+                [
+                    TranscriptCacheEntry(audio_sha256=h, model=model, transcript=text, transcribe_seconds=seconds)
+                    for h, (text, seconds) in outputs.items()
+                ],
+                ignore_conflicts=True,
+            )
+        counter.misses += len(missing)
+        counter.failures += len(failed)
+        results.update({h: text for h, (text, _seconds) in outputs.items()})
+
+    errors = {path: failed[h] for h, path in zip(hashes, paths) if h in failed}
+    return [results.get(h) for h in hashes], errors
+
+
+# transcribe_with_cache
+# Барлық файл транскрипцияланса ғана қайтарады; сәтті транскрипттер кэшке жазылған соң бірінші қате көтеріледі.
+def transcribe_with_cache(
+    paths: list[str],
+    transcribe=transcribe_audio,
+    model: str = TRANSCRIBE_MODEL,
+    counter: TranscriptCacheCounter | None = None,
+) -> list[str]:
+    transcripts, errors = transcribe_many(paths, transcribe=transcribe, model=model, counter=counter)
+    if errors:
+        raise next(iter(errors.values()))
+    return transcripts
+
+
+# evict_transcript_cache
+# Кэш TRANSCRIPT_CACHE_MAX_ENTRIES-тен асса, ең ұзақ қолданылмаған жазбалар өшіріледі. Бағалау жолында
+# шақырылмайды: run_grader TRANSCRIPT_CACHE_EVICT_SECONDS сайын және transcript_cache_stats --evict орындайды.
+# Шек last_used_at индексі бойынша бір рет табылады, өшіру сол индекс бойынша батчтармен жүреді.
+def evict_transcript_cache(max_entries: int | None = None) -> int:
+    max_entries = settings.TRANSCRIPT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    boundary = (
+        TranscriptCacheEntry.objects
+        .order_by("-last_used_at", "-id")
+        .values_list("last_used_at", "id")[max_entries:max_entries + 1]
+    )
+    if not boundary:
+        return 0
+    cutoff, cutoff_id = boundary[0]
+    stale = Q(last_used_at__lt=cutoff) | Q(last_used_at=cutoff, id__lte=cutoff_id)
+
+    deleted = 0
+    while True:
+        stale_ids = list(
+            TranscriptCacheEntry.objects
+            .filter(stale)
+            .order_by("last_used_at", "id")
+            .values_list("id", flat=True)[:EVICT_BATCH_SIZE]
+        )
+        if not stale_ids:
+            return deleted
+        count, _ = TranscriptCacheEntry.objects.filter(pk__in=stale_ids).delete()
+        deleted += count
+
+
+# transcript_cache_stats
+# Кэш кестесі бойынша жинақталған үнем (барлық worker-лер).
+def transcript_cache_stats() -> dict:
+    total = TranscriptCacheEntry.objects.aggregate(
+        entries=Count("id"),
+        hits=Sum("hits"),
+        saved_seconds=Sum(F("hits") * F("transcribe_seconds"), output_field=FloatField()),
+    )
+    return {
+        "entries": total["entries"] or 0,
+        "hits": total["hits"] or 0,
+        "saved_seconds": total["saved_seconds"] or 0.0,
+    }
@@ -1,26 +1,68 @@
-import re
+from django.conf import settings
 from django.utils import timezone
+from apps.main.services.sandbox import RunResult, SandboxIsolationError, is_language_available, run_many
 from core.models import Writing, WritingSubmission
+from core.utils.output import normalize_output_text, outputs_match
 
 
-def normalize_output(s: str) -> str:
-    s = (s or "").replace("\r\n", "\n").replace("\r", "\n").strip()
-    lines = [re.sub(r"\s+", " ", line).strip() for line in s.split("\n")]
-    while lines and lines[0] == "":
-        lines.pop(0)
-    while lines and lines[-1] == "":
-        lines.pop()
-    return "\n".join(lines)
+def normalize_output(s: str, ignore_whitespace: bool = True) -> str:
+    return normalize_output_text(s, ignore_whitespace)
+
+
+# output_matches
+# Шығыс көлемі WRITING_MAX_OUTPUT_CHARS-тан асса, салыстырмай-ақ қате деп есептеледі.
+def output_matches(writing: Writing | None, actual: str | None) -> bool:
+    if actual is None or len(actual) > settings.WRITING_MAX_OUTPUT_CHARS:
+        return False
+    if writing is None:
+        return outputs_match("", actual)
+
+    expected = writing.expected_normalized
+    if not expected and (writing.expected_output or "").strip():
+        # save() арқылы өтпеген қатар: бір рет есептеп сақтаймыз (UPDATE, content_version өзгермейді)
+        expected = normalize_output_text(writing.expected_output, writing.ignore_whitespace)
+        Writing.objects.filter(pk=writing.pk).update(expected_normalized=expected)
+        writing.expected_normalized = expected
+    return outputs_match(expected, actual, writing.ignore_whitespace)
 
 
 def grade_writing_submission(submission: WritingSubmission) -> bool:
-    writing: Writing = submission.question_attempt.question.writing
-    expected = getattr(writing, "expected_output", "") or ""
-    user_out = submission.output_text or ""
-    is_correct = normalize_output(user_out) == normalize_output(expected)
+    return grade_writing_submissions([submission])[0]
+
+
+# grade_writing_submissions
+# SANDBOX_ENABLED болса және тілдің toolchain-ы бар болса, код sandbox pool-да орындалып, оның stdout-ы
+# expected_output-пен салыстырылады. Әйтпесе тапсырушы енгізген output_text тексеріледі.
+def grade_writing_submissions(submissions: list[WritingSubmission]) -> list[bool]:
+    runnable = []
+    if settings.SANDBOX_ENABLED:
+        runnable = [
+            sub for sub in submissions
+            if (sub.code or "").strip() and is_language_available(sub.language)
+        ]
+    runs = dict(zip(
+        (sub.pk for sub in runnable),
+        run_many((sub.language, sub.code, "") for sub in runnable),
+    ))
+    # Оқшауланбаған ортада тексерілмейді: қате кезектегі тапсырманы қайталауға жібереді
+    if any(run.status == RunResult.UNAVAILABLE for run in runs.values()):
+        raise SandboxIsolationError("sandbox isolation is not available in a pool worker")
+
+    results = []
+    now = timezone.now()
+    for sub in submissions:
+        writing: Writing | None = getattr(sub.question_attempt.question, "writing", None)
+
+        run = runs.get(sub.pk)
+        if run is not None:
+            user_out = run.stdout if run.status == RunResult.OK else None
+        else:
+            user_out = sub.output_text or ""
+        is_correct = output_matches(writing, user_out)
 
-    submission.is_correct = is_correct
-    submission.checked_at = timezone.now()
-    submission.save(update_fields=["is_correct", "checked_at"])
+        sub.is_correct = is_correct
+        sub.checked_at = now
+        sub.save(update_fields=["is_correct", "checked_at"])
+        results.append(is_correct)
 
-    return is_correct
+    return results
@@ -22,6 +22,8 @@ urlpatterns = [
     # attempt urls...
     path("attempts/<int:attempt_id>/", attempt.attempt_detail_view, name="attempt_detail"),
     path("attempts/<int:attempt_id>/question/", attempt.attempt_question_view, name="attempt_question"),
+    path("attempts/<int:attempt_id>/timer/", attempt.attempt_timer_view, name="attempt_timer"),
+    path("attempts/<int:attempt_id>/heartbeat/", attempt.attempt_heartbeat_view, name="attempt_heartbeat"),
 
     # HTMX save (question_id URL-да!)
     path("attempts/<int:attempt_id>/q/<int:question_id>/answer/", attempt.attempt_answer_view, name="attempt_answer"),
@@ -1,18 +1,26 @@
 from collections import defaultdict
 
+from django.conf import settings
+from django.contrib import messages
 from django.db import transaction
-from django.db.models import Prefetch
-from django.http import HttpResponse, HttpResponseBadRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
 
 from core.utils.decorators import role_required
+from django.views.decorators.cache import never_cache
 from django.views.decorators.http import require_GET, require_POST
 from apps.main.services.attempt import ensure_attempt_initialized, save_mcq_answer_only, load_attempt_for_user, \
-    is_hx, finish_attempt_auto, build_attempt_question_context, grade_pending_open_questions
-from core.models import AttemptStatus, Question, QuestionAttempt, MCQSelection, SpeakingAnswer, WritingSubmission
+    is_hx, build_attempt_question_context, bump_answered_count, start_section_attempt, section_is_open, \
+    remaining_seconds
+from apps.main.services.blueprint import get_exam_blueprint
+from apps.main.services.expiry import expire_attempt_if_due, submit_attempt
+from apps.main.services.heartbeat import record_heartbeat
+from apps.main.services.stats import percentile_rank, score_distribution
+from core.models import AttemptStatus, QuestionAttempt, MCQSelection, SpeakingAnswer, WritingSubmission, ExamScoreHistogram, \
+    ExamAttempt, SectionAttempt
 
 
 # attempt detail redirect
@@ -22,25 +30,12 @@ from core.models import AttemptStatus, Question, QuestionAttempt, MCQSelection,
 def attempt_detail_view(request, attempt_id: int):
     attempt = load_attempt_for_user(request, attempt_id)
     ensure_attempt_initialized(attempt)
+    expire_attempt_if_due(attempt)
 
     if attempt.status in (AttemptStatus.FINISHED, AttemptStatus.ABORTED):
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    sections = (
-        attempt.exam.sections
-        .all()
-        .order_by("order")
-        .prefetch_related(
-            Prefetch(
-                "questions",
-                queryset=Question.objects.order_by("order"),
-            )
-        )
-    )
-    ordered_q_ids = []
-    for sec in sections:
-        ordered_q_ids.extend([q.id for q in sec.questions.all()])
-
+    ordered_q_ids = get_exam_blueprint(attempt.exam).question_ids
     if not ordered_q_ids:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
@@ -64,60 +59,43 @@ def attempt_detail_view(request, attempt_id: int):
 def attempt_question_view(request, attempt_id: int):
     attempt = load_attempt_for_user(request, attempt_id)
     ensure_attempt_initialized(attempt)
+    expire_attempt_if_due(attempt)
 
     if attempt.status in (AttemptStatus.FINISHED, AttemptStatus.ABORTED):
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    sections = (
-        attempt.exam.sections
-        .all()
-        .order_by("order")
-        .select_related("material")
-        .prefetch_related(
-            Prefetch(
-                "questions",
-                queryset=Question.objects.order_by("order").prefetch_related("options"),
-            )
-        )
-    )
-    flat_questions = [q for sec in sections for q in sec.questions.all()]
-    if not flat_questions:
+    bp = get_exam_blueprint(attempt.exam)
+    q_ids = bp.question_ids
+    if not q_ids:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    q_ids = [q.id for q in flat_questions]
     q_param = request.GET.get("q")
-    current_qid = int(q_param) if (q_param and q_param.isdigit() and int(q_param) in q_ids) else q_ids[0]
+    current_qid = int(q_param) if (q_param and q_param.isdigit() and int(q_param) in bp.question_by_id) else q_ids[0]
     qa_qs = (
         QuestionAttempt.objects
         .filter(section_attempt__attempt=attempt)
-        .select_related("question", "section_attempt")
+        .select_related("section_attempt")
     )
     qa_by_q_id = {qa.question_id: qa for qa in qa_qs}
     current_qa = qa_by_q_id.get(current_qid)
     if not current_qa:
         ensure_attempt_initialized(attempt)
-        current_qa = QuestionAttempt.objects.get(section_attempt__attempt=attempt, question_id=current_qid)
+        current_qa = QuestionAttempt.objects.select_related("section_attempt").get(
+            section_attempt__attempt=attempt, question_id=current_qid
+        )
         qa_by_q_id[current_qid] = current_qa
 
-    current_q = current_qa.question
+    current_q = bp.question_by_id[current_qid]
     sa = current_qa.section_attempt
-    if sa.status == AttemptStatus.NO_STARTED:
-        sa.status = AttemptStatus.IN_PROGRESS
-        if not sa.started_at:
-            sa.started_at = timezone.now()
-        sa.save(update_fields=["status", "started_at"])
-
-    current_section = None
-    for sec in sections:
-        if sec.id == current_q.section_id:
-            current_section = sec
-            break
-
-    selected_set = set(
-        MCQSelection.objects
-        .filter(question_attempt=current_qa)
-        .values_list("option_id", flat=True)
-    )
+    start_section_attempt(attempt, sa, bp.section_of(current_q))
+
+    selected_set = set()
+    if current_q.is_mcq:
+        selected_set = set(
+            MCQSelection.objects
+            .filter(question_attempt=current_qa)
+            .values_list("option_id", flat=True)
+        )
     answered_q_ids = {qa.question_id for qa in qa_by_q_id.values() if qa.is_answered}
 
     idx = q_ids.index(current_qid)
@@ -127,9 +105,9 @@ def attempt_question_view(request, attempt_id: int):
 
     context = {
         "attempt": attempt,
-        "flat_questions": flat_questions,
+        "flat_questions": bp.questions,
         "answered_q_ids": answered_q_ids,
-        "current_section": current_section,
+        "current_section": bp.section_of(current_q),
         "q": current_q,
         "qa": current_qa,
         "selected_set": selected_set,
@@ -138,6 +116,8 @@ def attempt_question_view(request, attempt_id: int):
         "q_index": idx + 1,
         "q_total": len(q_ids),
         "is_last": is_last,
+        "writing_languages": WritingSubmission.Language.choices,
+        "heartbeat_seconds": settings.ATTEMPT_HEARTBEAT_SECONDS,
     }
     if is_hx(request):
         return render(request, "app/main/attempt/partials/_question_wrapper.html", context)
@@ -151,6 +131,7 @@ def attempt_question_view(request, attempt_id: int):
 @role_required("customer")
 def attempt_answer_view(request, attempt_id: int, question_id: int):
     attempt = load_attempt_for_user(request, attempt_id)
+    expire_attempt_if_due(attempt)
 
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
@@ -158,19 +139,21 @@ def attempt_answer_view(request, attempt_id: int, question_id: int):
     if not is_hx(request):
         return redirect("customer:attempt_detail", attempt_id=attempt.pk)
 
-    q = get_object_or_404(Question.objects.only("id", "question_type", "section_id"), pk=question_id)
+    q = get_exam_blueprint(attempt.exam).question_by_id.get(question_id)
+    if q is None:
+        raise Http404()
     if q.question_type == "mcq_single":
         oid = request.POST.get("option")
         option_ids = [int(oid)] if (oid and oid.isdigit()) else []
-        save_mcq_answer_only(attempt, question_id=q.pk, option_ids=option_ids)
+        save_mcq_answer_only(attempt, question_id=q.id, option_ids=option_ids)
 
     elif q.question_type == "mcq_multi":
         raw = request.POST.getlist("options")
         option_ids = [int(x) for x in raw if x.isdigit()]
-        save_mcq_answer_only(attempt, question_id=q.pk, option_ids=option_ids)
+        save_mcq_answer_only(attempt, question_id=q.id, option_ids=option_ids)
 
     next_q_id = request.POST.get("next_qid")
-    next_q_id = int(next_q_id) if (next_q_id and next_q_id.isdigit()) else q.pk
+    next_q_id = int(next_q_id) if (next_q_id and next_q_id.isdigit()) else q.id
 
     ctx = build_attempt_question_context(attempt, next_q_id)
     if not ctx:
@@ -198,14 +181,17 @@ def attempt_answer_view(request, attempt_id: int, question_id: int):
 @role_required("customer")
 def attempt_speaking_upload_view(request, attempt_id: int, question_id: int):
     attempt = load_attempt_for_user(request, attempt_id)
+    expire_attempt_if_due(attempt)
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
     qa = get_object_or_404(
-        QuestionAttempt,
+        QuestionAttempt.objects.select_related("section_attempt"),
         section_attempt__attempt=attempt,
         question_id=question_id
     )
+    if not section_is_open(qa.section_attempt, attempt):
+        return HttpResponseForbidden("Section time is over")
     q = qa.question
 
     if q.question_type != "speaking_keywords":
@@ -240,6 +226,7 @@ def attempt_speaking_upload_view(request, attempt_id: int, question_id: int):
     qa.score = 0
     qa.answer_json = {"type": "speaking_keywords", "submitted": True}
     qa.save(update_fields=["is_answered", "is_graded", "score", "answer_json"])
+    bump_answered_count(attempt, 1)
 
     if is_hx(request):
         ctx = build_attempt_question_context(attempt, q.id)
@@ -261,15 +248,18 @@ def attempt_speaking_upload_view(request, attempt_id: int, question_id: int):
 @role_required("customer")
 def attempt_writing_submit_view(request, attempt_id: int, question_id: int):
     attempt = load_attempt_for_user(request, attempt_id)
+    expire_attempt_if_due(attempt)
 
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
     qa = get_object_or_404(
-        QuestionAttempt,
+        QuestionAttempt.objects.select_related("section_attempt"),
         section_attempt__attempt=attempt,
         question_id=question_id
     )
+    if not section_is_open(qa.section_attempt, attempt):
+        return HttpResponseForbidden("Section time is over")
     if qa.is_answered:
         if is_hx(request):
             ctx = build_attempt_question_context(attempt, qa.question_id)
@@ -282,22 +272,30 @@ def attempt_writing_submit_view(request, attempt_id: int, question_id: int):
 
         return redirect("customer:attempt_question", attempt_id=attempt.pk)
 
-    output_text = (request.POST.get("output_text") or "").strip()
+    # Output өзгертілмей сақталады: бос орындарды ignore_whitespace бойынша салыстырғыш өзі шешеді
+    output_text = request.POST.get("output_text") or ""
     code_text = request.POST.get("code") or ""
+    language = request.POST.get("language") or WritingSubmission.Language.PYTHON
 
-    if not output_text and not code_text:
+    if not output_text.strip() and not code_text.strip():
         return HttpResponseBadRequest("Empty submission")
+    if len(output_text) > settings.WRITING_MAX_OUTPUT_CHARS:
+        return HttpResponseBadRequest("Output too large")
+    if language not in WritingSubmission.Language.values:
+        return HttpResponseBadRequest("Unknown language")
 
     sub, _ = WritingSubmission.objects.get_or_create(question_attempt=qa)
     sub.code = code_text
     sub.output_text = output_text
-    sub.save(update_fields=["code", "output_text"])
+    sub.language = language
+    sub.save(update_fields=["code", "output_text", "language"])
 
     qa.is_answered = True
     qa.is_graded = False
     qa.score = 0
     qa.answer_json = {"type": "writing", "submitted": True}
     qa.save(update_fields=["is_answered", "is_graded", "score", "answer_json"])
+    bump_answered_count(attempt, 1)
 
     if is_hx(request):
         ctx = build_attempt_question_context(attempt, qa.question_id)
@@ -322,11 +320,44 @@ def attempt_submit_view(request, attempt_id: int):
     if attempt.status != AttemptStatus.IN_PROGRESS:
         return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
-    grade_pending_open_questions(attempt)
-    finish_attempt_auto(attempt)
+    if submit_attempt(attempt):
+        messages.info(request, "Айтылым және жазбаша жауаптар бағалануда. Нәтиже біраздан соң шығады.")
     return redirect("customer:attempt_review", attempt_id=attempt.pk)
 
 
+# ATTEMPT TIMER
+# ======================================================================================================================
+# Қалған уақытты сервердегі deadline_at бойынша қайтарады. Тек оқиды: attempt (PK) + секция (unique индекс).
+@never_cache
+@require_GET
+@role_required("customer")
+def attempt_timer_view(request, attempt_id: int):
+    attempt = get_object_or_404(
+        ExamAttempt.objects.only("id", "status", "deadline_at"),
+        pk=attempt_id,
+        user=request.user,
+    )
+    now = timezone.now()
+
+    section_deadline = None
+    section_id = request.GET.get("section")
+    if section_id and section_id.isdigit():
+        section_deadline = (
+            SectionAttempt.objects
+            .filter(attempt=attempt, section_id=int(section_id))
+            .values_list("deadline_at", flat=True)
+            .first()
+        )
+
+    exam_remaining = remaining_seconds(attempt.deadline_at, now)
+    return JsonResponse({
+        "status": attempt.status,
+        "expired": attempt.status != AttemptStatus.IN_PROGRESS or exam_remaining == 0,
+        "exam_remaining": exam_remaining,
+        "section_remaining": remaining_seconds(section_deadline, now),
+    })
+
+
 # ======================================================================================================================
 # attempt review page
 # ======================================================================================================================
@@ -338,45 +369,26 @@ def attempt_review_view(request, attempt_id: int):
         return redirect("customer:attempt_detail", attempt_id=attempt.pk)
 
     ensure_attempt_initialized(attempt)
-    sections = (
-        attempt.exam.sections
-        .all()
-        .order_by("order")
-        .select_related("material")
-        .prefetch_related(
-            Prefetch(
-                "questions",
-                queryset=(
-                    Question.objects
-                    .order_by("order")
-                    .select_related("speaking_rubric")
-                    .prefetch_related("options")
-                )
-            )
-        )
-    )
+    bp = get_exam_blueprint(attempt.exam)
+    sections = bp.sections
+
     section_id = request.GET.get("section")
     section_id = int(section_id) if (section_id and section_id.isdigit()) else None
-    section_map = {s.id: s for s in sections}
-    current_section = section_map.get(section_id) if section_id else (sections[0] if sections else None)
+    current_section = bp.section_by_id.get(section_id) if section_id else (sections[0] if sections else None)
 
-    qa_qs = (
-        QuestionAttempt.objects
-        .filter(section_attempt__attempt=attempt)
-        .select_related("question", "section_attempt", "section_attempt__section")
-    )
+    qa_qs = QuestionAttempt.objects.filter(section_attempt__attempt=attempt).select_related("section_attempt")
     qa_by_q_id = {qa.question_id: qa for qa in qa_qs}
     section_scores = defaultdict(lambda: {"score": 0.0, "max": 0.0})
 
-    for qa in qa_qs:
+    for qa in qa_by_q_id.values():
         sid = qa.section_attempt.section_id
         section_scores[sid]["score"] += float(qa.score or 0)
         section_scores[sid]["max"] += float(qa.max_score or 0)
 
-    for sec in sections:
-        data = section_scores.get(sec.id, {"score": 0.0, "max": 0.0})
-        sec.review_score = data["score"]
-        sec.review_max = data["max"]
+    section_totals = [
+        (sec, section_scores.get(sec.id, {"score": 0.0, "max": 0.0}))
+        for sec in sections
+    ]
 
     selections = (
         MCQSelection.objects
@@ -387,54 +399,59 @@ def attempt_review_view(request, attempt_id: int):
     for qa_id, opt_id in selections:
         selected_map.setdefault(qa_id, set()).add(opt_id)
 
-    correct_map = {}
-    for sec in sections:
-        for q in sec.questions.all():
-            if q.question_type in ("mcq_single", "mcq_multi"):
-                correct_map[q.id] = set(
-                    q.options.filter(is_correct=True).values_list("id", flat=True)
-                )
+    correct_map = {
+        q_id: entry.correct_option_ids
+        for q_id, entry in bp.answer_key.items()
+        if entry.is_mcq
+    }
 
+    qa_id_to_q_id = {qa.pk: q_id for q_id, qa in qa_by_q_id.items()}
     writing_map = {
-        ws.question_attempt_id: ws
-        for ws in (
-            WritingSubmission.objects
-            .filter(question_attempt__section_attempt__attempt=attempt)
-            .select_related("question_attempt")
-        )
+        qa_id_to_q_id.get(ws.question_attempt_id): ws
+        for ws in WritingSubmission.objects.filter(question_attempt__section_attempt__attempt=attempt)
     }
-
-    for sec in sections:
-        for q in sec.questions.all():
-            qa = getattr(q, "qa", None)
-            if qa:
-                q.writing_submission = writing_map.get(qa.id)
-            else:
-                q.writing_submission = None
-
     speaking_map = {
-        sa.question_attempt_id: sa
-        for sa in (
-            SpeakingAnswer.objects
-            .filter(question_attempt__section_attempt__attempt=attempt)
-            .select_related("question_attempt")
-        )
+        qa_id_to_q_id.get(sa.question_attempt_id): sa
+        for sa in SpeakingAnswer.objects.filter(question_attempt__section_attempt__attempt=attempt)
     }
-    for sec in sections:
-        for q in sec.questions.all():
-            qa = qa_by_q_id.get(q.id)
-            q.qa = qa
-            q.speaking_answer = speaking_map.get(qa.pk) if qa else None
-            q.writing_submission = writing_map.get(qa.pk) if qa else None
+
+    score_percent = None
+    if attempt.status == AttemptStatus.FINISHED and attempt.max_total_score:
+        score_percent = float(attempt.total_score) * 100.0 / float(attempt.max_total_score)
+    histogram = ExamScoreHistogram.objects.filter(exam_id=attempt.exam_id).first() if score_percent is not None else None
 
     context = {
         "mode": "review",
         "attempt": attempt,
         "sections": sections,
+        "section_totals": section_totals,
         "current_section": current_section,
         "qa_by_qid": qa_by_q_id,
         "selected_map": selected_map,
         "correct_map": correct_map,
+        "writing_map": writing_map,
+        "speaking_map": speaking_map,
         "AttemptStatus": AttemptStatus,
+        "grading_pending": any(
+            qa.is_answered and not qa.is_graded and not (qa.answer_json or {}).get("grading_failed")
+            for qa in qa_by_q_id.values()
+        ),
+        "grading_failed": any((qa.answer_json or {}).get("grading_failed") for qa in qa_by_q_id.values()),
+        "percentile": percentile_rank(histogram, score_percent) if histogram else None,
+        "score_distribution": score_distribution(histogram, score_percent) if histogram else [],
     }
-    return render(request, "app/main/attempt/review.html", context)
\ No newline at end of file
+    return render(request, "app/main/attempt/review.html", context)
+
+
+# ATTEMPT HEARTBEAT
+# ======================================================================================================================
+# Секцияда жұмсалған уақыт. Жазу worker буферінде жинақталып, топтап жазылады (services.heartbeat).
+@require_POST
+@role_required("customer")
+def attempt_heartbeat_view(request, attempt_id: int):
+    section_id = request.POST.get("section", "")
+    if not section_id.isdigit():
+        return HttpResponseBadRequest("section is required")
+    if not record_heartbeat(request.user.pk, attempt_id, int(section_id)):
+        return HttpResponse(status=409)
+    return HttpResponse(status=204)
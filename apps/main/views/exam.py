@@ -1,11 +1,11 @@
 from django.contrib import messages
-from django.db.models import OuterRef, Exists, Prefetch, Subquery, IntegerField, Value, F, ExpressionWrapper, FloatField
-from django.db.models.aggregates import Avg, Count, Sum
-from django.db.models.functions import Coalesce, Cast, NullIf
+from django.db.models import OuterRef, Exists, Prefetch
 from django.shortcuts import render, get_object_or_404, redirect
-from django.utils import timezone
+from apps.main.services.attempt import is_hx, start_attempt
+from apps.main.services.blueprint import get_exam_blueprint
+from apps.main.services.catalog import keyset_page, search_exams
 from core.utils.decorators import role_required
-from core.models import ExamAttempt, SectionAttempt, Exam, Section, Question, AttemptStatus
+from core.models import ExamAttempt, Exam, Section, Question, AttemptStatus, UserProgressStats
 
 
 # customer dashboard page
@@ -16,37 +16,12 @@ def customer_dashboard_view(request):
     recent_attempts = (
         ExamAttempt.objects
         .filter(user=user)
+        .select_related("exam")
         .order_by("-finished_at", "-id")[:10]
     )
-    overall_avg = (
-        ExamAttempt.objects
-        .filter(user=user)
-        .exclude(total_score__isnull=True)
-        .exclude(max_total_score__isnull=True)
-        .annotate(
-            percent=ExpressionWrapper(
-                Cast(F("total_score"), FloatField()) * Value(100.0) / NullIf(Cast(F("max_total_score"), FloatField()), 0.0),
-                output_field=FloatField(),
-            )
-        )
-        .aggregate(avg=Avg("percent"))
-        .get("avg")
-    )
-    section_avg_qs = (
-        SectionAttempt.objects
-        .filter(attempt__user=user)
-        .exclude(score__isnull=True)
-        .exclude(max_score__isnull=True)
-        .annotate(
-            percent=ExpressionWrapper(
-                Cast(F("score"), FloatField()) * Value(100.0) / NullIf(Cast(F("max_score"), FloatField()), 0.0),
-                output_field=FloatField(),
-            )
-        )
-        .values("section__section_type")
-        .annotate(avg=Avg("percent"))
-    )
-    section_avg_s = {row["section__section_type"]: row["avg"] for row in section_avg_qs}
+    # Орташа көрсеткіштер attempt аяқталғанда жаңаратын UserProgressStats қатарынан алынады
+    stats = UserProgressStats.objects.filter(user=user).first()
+    overall_avg = stats.overall_avg if stats else None
 
     SECTION_KEYS = [
         ("listening", "Тыңдалым (Listening)"),
@@ -59,7 +34,7 @@ def customer_dashboard_view(request):
         section_progress.append({
             "key": key,
             "label": label,
-            "avg": section_avg_s.get(key),
+            "avg": stats.section_avg(key) if stats else None,
         })
 
     context = {
@@ -76,21 +51,33 @@ def customer_dashboard_view(request):
 @role_required("customer")
 def customer_exams_view(request):
     user = request.user
+    query = (request.GET.get("q") or "").strip()
+    after = request.GET.get("after")
+    after = int(after) if (after and after.isdigit()) else None
+
     user_has_attempt = ExamAttempt.objects.filter(
         user=user,
         exam_id=OuterRef("pk"),
     )
-    exams = (
+    exams_qs = (
         Exam.objects
         .filter(is_published=True)
-        .order_by("-id")
         .annotate(
             is_registered=Exists(user_has_attempt),
-            section_count=Count("sections", distinct=True),
-            question_count=Count("sections__questions", distinct=True),
         )
     )
-    return render(request, "app/main/exams/page.html", {"exams": exams})
+    exams, next_cursor = keyset_page(search_exams(exams_qs, query), after)
+
+    context = {
+        "exams": exams,
+        "next_cursor": next_cursor,
+        "q": query,
+        "is_first_page": after is None,
+    }
+    # HTMX: іздеу нәтижесі немесе "Тағы жүктеу" үшін тек келесі бет фрагменті қайтарылады
+    if is_hx(request) and not request.headers.get("HX-History-Restore-Request"):
+        return render(request, "app/main/exams/partials/_exam_page.html", context)
+    return render(request, "app/main/exams/page.html", context)
 
 
 # customer exam detail page
@@ -98,37 +85,12 @@ def customer_exams_view(request):
 @role_required("customer")
 def customer_exam_detail_view(request, exam_id: int):
     user = request.user
-    section_sum_time_sq = (
-        Section.objects
-        .filter(exam_id=OuterRef("pk"))
-        .values("exam_id")
-        .annotate(total=Sum("time_limit"))
-        .values("total")[:1]
-    )
-    section_sum_score_sq = (
-        Section.objects
-        .filter(exam_id=OuterRef("pk"))
-        .values("exam_id")
-        .annotate(total=Sum("max_score"))
-        .values("total")[:1]
-    )
-    question_count_sq = (
-        Question.objects
-        .filter(section__exam_id=OuterRef("pk"))
-        .values("section__exam_id")
-        .annotate(total=Count("id"))
-        .values("total")[:1]
-    )
     exam_qs = (
         Exam.objects
         .annotate(
             is_registered=Exists(
                 ExamAttempt.objects.filter(user=user, exam_id=OuterRef("pk"))
             ),
-            section_count=Count("sections", distinct=True),
-            question_count=Coalesce(Subquery(question_count_sq, output_field=IntegerField()), Value(0)),
-            time_limit=Coalesce(Subquery(section_sum_time_sq, output_field=IntegerField()), Value(0)),
-            max_total_score=Coalesce(Subquery(section_sum_score_sq, output_field=IntegerField()), Value(0)),
         )
         .prefetch_related(
             Prefetch(
@@ -160,7 +122,7 @@ def customer_exam_start_view(request, exam_id: int):
     user = request.user
     exam = get_object_or_404(Exam, pk=exam_id)
 
-    has_questions = Question.objects.filter(section__exam=exam).exists()
+    has_questions = bool(get_exam_blueprint(exam).question_ids)
     if not has_questions:
         messages.warning(
             request,
@@ -183,14 +145,5 @@ def customer_exam_start_view(request, exam_id: int):
         )
         return redirect("customer:attempt_detail", locked_attempt.pk)
 
-    attempt = ExamAttempt.objects.filter(user=user, exam=exam).first()
-    if attempt:
-        return redirect("customer:attempt_detail", attempt.pk)
-
-    attempt = ExamAttempt.objects.create(
-        user=user,
-        exam=exam,
-        status=AttemptStatus.IN_PROGRESS,
-        started_at=timezone.now(),
-    )
+    attempt = start_attempt(user, exam)
     return redirect("customer:attempt_detail", attempt.pk)
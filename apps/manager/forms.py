@@ -0,0 +1,72 @@
+from django import forms
+from django.conf import settings
+
+from core.models import AttemptStatus, Exam
+
+INPUT_CLASS = (
+    "block w-full py-2.5 px-4 bg-background border border-border-300 text-sm rounded-xl "
+    "focus:ring-primary-600 focus:border-primary-600"
+)
+
+
+class ResultsExportForm(forms.Form):
+    class Kind:
+        ATTEMPTS = "attempts"
+        QUESTIONS = "questions"
+
+    KIND_CHOICES = (
+        (Kind.ATTEMPTS, "Attempt бойынша (секция баллдарымен)"),
+        (Kind.QUESTIONS, "Сұрақ бойынша (жауаптарымен)"),
+    )
+    FORMAT_CHOICES = (
+        ("csv", "CSV"),
+        ("jsonl", "JSON Lines"),
+    )
+
+    kind = forms.ChoiceField(label="Деректер", choices=KIND_CHOICES, initial=Kind.ATTEMPTS)
+    format = forms.ChoiceField(label="Формат", choices=FORMAT_CHOICES, initial="csv")
+    exam = forms.ModelChoiceField(label="Емтихан", queryset=Exam.objects.order_by("-id"), required=False)
+    status = forms.ChoiceField(
+        label="Статус", choices=(("", "Барлығы"), *AttemptStatus.choices), required=False,
+    )
+    date_from = forms.DateField(label="Басталған күні (бастап)", required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    date_to = forms.DateField(label="Басталған күні (дейін)", required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            field.widget.attrs.setdefault("class", INPUT_CLASS)
+
+    def clean(self):
+        cleaned = super().clean()
+        date_from, date_to = cleaned.get("date_from"), cleaned.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("Басталу күні аяқталу күнінен кейін болмауы керек.")
+        return cleaned
+
+    def export_filters(self) -> dict:
+        return {
+            "exam": self.cleaned_data.get("exam"),
+            "status": self.cleaned_data.get("status") or None,
+            "date_from": self.cleaned_data.get("date_from"),
+            "date_to": self.cleaned_data.get("date_to"),
+        }
+
+
+class ExamImportForm(forms.Form):
+    package = forms.FileField(
+        label="Емтихан пакеті",
+        help_text="exam.yaml / exam.json файлы немесе оны медиа файлдарымен бірге қамтитын .zip архив.",
+        widget=forms.ClearableFileInput(attrs={"accept": ".yaml,.yml,.json,.zip"}),
+    )
+    is_published = forms.BooleanField(label="Бірден жариялау", required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["package"].widget.attrs.setdefault("class", INPUT_CLASS)
+
+    def clean_package(self):
+        package = self.cleaned_data["package"]
+        if package.size > settings.EXAM_IMPORT_MAX_UPLOAD_MB * 1024 * 1024:
+            raise forms.ValidationError(f"Файл көлемі {settings.EXAM_IMPORT_MAX_UPLOAD_MB} МБ-тан аспауы керек.")
+        return package
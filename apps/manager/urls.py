@@ -1,7 +1,22 @@
 from django.urls import path
+from .views import analytics, exams, export, imports, monitor
 
-app_name = "main"
+app_name = "manager"
 
 urlpatterns = [
+    # analytics urls...
+    path("exams/<int:exam_id>/analysis/", analytics.exam_item_analysis_view, name="exam_item_analysis"),
 
-]
\ No newline at end of file
+    # monitor urls...
+    path("exams/<int:exam_id>/monitor/", monitor.exam_monitor_view, name="exam_monitor"),
+    path("exams/<int:exam_id>/monitor/live/", monitor.exam_monitor_live_view, name="exam_monitor_live"),
+
+    # import urls...
+    path("exams/import/", imports.exam_import_view, name="exam_import"),
+    path("exams/<int:exam_id>/export/", exams.exam_export_view, name="exam_export"),
+    path("exams/<int:exam_id>/clone/", exams.exam_clone_view, name="exam_clone"),
+
+    # export urls...
+    path("exports/", export.results_export_view, name="results_export"),
+    path("exports/download/", export.results_export_download_view, name="results_export_download"),
+]
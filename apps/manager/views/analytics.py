@@ -0,0 +1,38 @@
+from django.contrib import messages
+from django.shortcuts import get_object_or_404, redirect, render
+from django.views.decorators.http import require_http_methods
+
+from apps.main.services.item_analysis import get_item_analysis, refresh_item_analysis
+from core.models import Exam
+from core.utils.decorators import role_required
+
+
+# exam item analysis page
+# ======================================================================================================================
+@require_http_methods(["GET", "POST"])
+@role_required("manager")
+def exam_item_analysis_view(request, exam_id: int):
+    exam = get_object_or_404(Exam, pk=exam_id)
+
+    if request.method == "POST":
+        analysis = refresh_item_analysis(exam)
+        messages.success(request, f"Талдау қайта есептелді ({analysis.compute_seconds:.1f} сек).")
+        return redirect("manager:exam_item_analysis", exam_id=exam.pk)
+
+    analysis = get_item_analysis(exam)
+    data = analysis.data or {}
+    questions_by_section = {}
+    for q in data.get("questions", []):
+        questions_by_section.setdefault(q["section_id"], []).append(q)
+
+    sections = [
+        {**sec, "questions": questions_by_section.get(sec["id"], [])}
+        for sec in data.get("sections", [])
+    ]
+    context = {
+        "exam": exam,
+        "analysis": analysis,
+        "sections": sections,
+        "is_stale": analysis.content_version != exam.content_version,
+    }
+    return render(request, "app/manager/exams/analysis/page.html", context)
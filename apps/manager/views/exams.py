@@ -0,0 +1,49 @@
+import tempfile
+
+from django.contrib import messages
+from django.http import FileResponse, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.utils.text import slugify
+from django.views.decorators.http import require_GET, require_POST
+
+from apps.main.services.exam_export import clone_exam, dump_package, exam_to_package, write_exam_zip
+from core.models import Exam
+from core.utils.decorators import role_required
+
+PACKAGE_CONTENT_TYPES = {
+    "yaml": "application/yaml; charset=utf-8",
+    "json": "application/json; charset=utf-8",
+}
+
+
+# exam export
+# ======================================================================================================================
+# ?format=zip (әдепкі, аудиомен бірге) | yaml | json. Нәтиже import_exam арқылы қайта импортталады.
+@require_GET
+@role_required("manager")
+def exam_export_view(request, exam_id: int):
+    exam = get_object_or_404(Exam, pk=exam_id)
+    fmt = request.GET.get("format", "zip")
+    filename = f"exam-{exam.pk}-{slugify(exam.title, allow_unicode=True) or 'package'}"
+
+    if fmt in PACKAGE_CONTENT_TYPES:
+        response = HttpResponse(dump_package(exam_to_package(exam), fmt), content_type=PACKAGE_CONTENT_TYPES[fmt])
+        response["Content-Disposition"] = f'attachment; filename="{filename}.{fmt}"'
+        return response
+
+    # Аудио көп болуы мүмкін: zip жадта емес, уақытша файлда жиналады
+    archive = tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024)
+    write_exam_zip(exam, archive)
+    archive.seek(0)
+    return FileResponse(archive, as_attachment=True, filename=f"{filename}.zip", content_type="application/zip")
+
+
+# exam clone
+# ======================================================================================================================
+@require_POST
+@role_required("manager")
+def exam_clone_view(request, exam_id: int):
+    exam = get_object_or_404(Exam, pk=exam_id)
+    copy = clone_exam(exam, title=(request.POST.get("title") or "").strip() or None)
+    messages.success(request, f"«{exam.title}» көшірілді: {copy.question_count} сұрақ. Көшірме жарияланбаған.")
+    return redirect("admin:core_exam_change", copy.pk)
@@ -0,0 +1,48 @@
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from apps.main.services.export import (
+    ATTEMPT_COLUMNS, QUESTION_COLUMNS, iter_attempt_rows, iter_question_rows, stream_csv, stream_jsonl,
+)
+from apps.manager.forms import ResultsExportForm
+from core.utils.decorators import role_required
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+
+# results export page
+# ======================================================================================================================
+@require_GET
+@role_required("manager")
+def results_export_view(request):
+    return render(request, "app/manager/exports/page.html", {"form": ResultsExportForm()})
+
+
+# results export download
+# ======================================================================================================================
+@require_GET
+@role_required("manager")
+def results_export_download_view(request):
+    form = ResultsExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+
+    kind = form.cleaned_data["kind"]
+    fmt = form.cleaned_data["format"]
+    filters = form.export_filters()
+
+    if kind == ResultsExportForm.Kind.QUESTIONS:
+        columns, rows = QUESTION_COLUMNS, iter_question_rows(**filters)
+    else:
+        columns, rows = ATTEMPT_COLUMNS, iter_attempt_rows(**filters)
+
+    stream = stream_csv(columns, rows) if fmt == "csv" else stream_jsonl(columns, rows)
+    response = StreamingHttpResponse(stream, content_type=CONTENT_TYPES[fmt])
+    filename = f"{kind}-{timezone.localtime():%Y%m%d-%H%M}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
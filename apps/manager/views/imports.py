@@ -0,0 +1,35 @@
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_http_methods
+
+from apps.main.services.exam_import import import_exam_package, read_uploaded_package
+from apps.manager.forms import ExamImportForm
+from core.utils.decorators import role_required
+
+
+# exam import page
+# ======================================================================================================================
+# Пакет толық тексеріледі; қате болса ештеңе жазылмайды және барлық қателер тізіммен көрсетіледі.
+@require_http_methods(["GET", "POST"])
+@role_required("manager")
+def exam_import_view(request):
+    form = ExamImportForm(request.POST or None, request.FILES or None)
+    import_errors = []
+
+    if request.method == "POST" and form.is_valid():
+        try:
+            data, read_media = read_uploaded_package(form.cleaned_data["package"])
+            exam = import_exam_package(data, read_media, is_published=form.cleaned_data["is_published"] or None)
+        except ValidationError as exc:
+            import_errors = exc.messages
+        else:
+            messages.success(request, f"«{exam.title}» емтиханы импортталды: {exam.question_count} сұрақ.")
+            return redirect("admin:core_exam_change", exam.pk)
+
+    status = 400 if request.method == "POST" else 200
+    return render(
+        request, "app/manager/exams/import/page.html",
+        {"form": form, "import_errors": import_errors},
+        status=status,
+    )
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from apps.main.services.monitor import monitor_etag, monitor_rows
+from core.models import AttemptStatus, Exam
+from core.utils.decorators import role_required
+
+
+def _monitor_context(exam: Exam) -> dict:
+    rows = monitor_rows(exam.pk)
+    for row in rows:
+        row["percent"] = round(row["answered_count"] * 100 / exam.question_count) if exam.question_count else 0
+    return {
+        "exam": exam,
+        "rows": rows,
+        "in_progress_count": sum(1 for r in rows if r["status"] == AttemptStatus.IN_PROGRESS),
+        "finished_count": sum(1 for r in rows if r["status"] == AttemptStatus.FINISHED),
+        "poll_seconds": settings.MONITOR_POLL_SECONDS,
+        "AttemptStatus": AttemptStatus,
+    }
+
+
+# exam monitor page
+# ======================================================================================================================
+@require_GET
+@role_required("manager")
+def exam_monitor_view(request, exam_id: int):
+    exam = get_object_or_404(Exam, pk=exam_id)
+    return render(request, "app/manager/exams/monitor/page.html", _monitor_context(exam))
+
+
+# exam monitor live partial (HTMX poll)
+# ======================================================================================================================
+# ETag арзан агрегаттан есептеледі; If-None-Match сәйкес келсе, condition() 304 қайтарады және кесте рендерленбейді.
+def _monitor_etag(request, exam_id: int):
+    return monitor_etag(exam_id)
+
+
+@require_GET
+@role_required("manager")
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_monitor_etag)
+def exam_monitor_live_view(request, exam_id: int):
+    exam = get_object_or_404(Exam, pk=exam_id)
+    return render(request, "app/manager/exams/monitor/partials/_live.html", _monitor_context(exam))
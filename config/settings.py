@@ -220,3 +220,57 @@ CKEDITOR_CONFIGS = {
 
 
 OPENAI_API_KEY = config("OPENAI_API_KEY")
+
+
+# Grading queue settings
+# ----------------------------------------------------------------------------------------------------------------------
+GRADER_ASYNC = config("GRADER_ASYNC", default=True, cast=bool)
+GRADER_MAX_TRIES = 5
+GRADER_RETRY_BASE_SECONDS = 10
+GRADER_LOCK_TIMEOUT_SECONDS = 600
+GRADER_TRANSCRIBE_CONCURRENCY = config("GRADER_TRANSCRIBE_CONCURRENCY", default=4, cast=int)
+TRANSCRIPT_CACHE_MAX_ENTRIES = 50_000
+TRANSCRIPT_CACHE_EVICT_SECONDS = 3600
+
+
+# Writing sandbox settings
+# ----------------------------------------------------------------------------------------------------------------------
+SANDBOX_ENABLED = config("SANDBOX_ENABLED", default=False, cast=bool)
+SANDBOX_WORKERS = config("SANDBOX_WORKERS", default=0, cast=int)  # 0 -> os.cpu_count()
+SANDBOX_CPU_SECONDS = 2
+SANDBOX_WALL_SECONDS = 5
+SANDBOX_MEMORY_MB = 256
+SANDBOX_OUTPUT_BYTES = 1024 * 1024
+SANDBOX_MAX_PROCESSES = 128
+SANDBOX_ISOLATE = True  # bubblewrap (bwrap) талап етіледі; өшіру тек әзірлеу ортасы үшін
+WRITING_MAX_OUTPUT_CHARS = config("WRITING_MAX_OUTPUT_CHARS", default=1024 * 1024, cast=int)
+
+
+# Exam catalog settings
+# ----------------------------------------------------------------------------------------------------------------------
+CATALOG_PAGE_SIZE = 12
+
+
+# Live monitor settings
+# ----------------------------------------------------------------------------------------------------------------------
+MONITOR_WINDOW_HOURS = 24
+MONITOR_POLL_SECONDS = 5
+
+
+# Exam import settings
+# ----------------------------------------------------------------------------------------------------------------------
+EXAM_IMPORT_MAX_UPLOAD_MB = 200
+
+
+# Attempt timer settings
+# ----------------------------------------------------------------------------------------------------------------------
+ATTEMPT_DEADLINE_GRACE_SECONDS = 5
+ATTEMPT_SWEEP_BATCH_SIZE = 100
+ATTEMPT_SWEEP_INTERVAL_SECONDS = 15
+
+
+# Section heartbeat settings
+# ----------------------------------------------------------------------------------------------------------------------
+ATTEMPT_HEARTBEAT_SECONDS = 15
+ATTEMPT_HEARTBEAT_FLUSH_SECONDS = 30
+ATTEMPT_HEARTBEAT_MAX_PENDING = 5000
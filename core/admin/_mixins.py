@@ -1,6 +1,12 @@
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.forms.models import BaseInlineFormSet
+from django.http import QueryDict
 from django.utils.html import format_html
 from django.urls import reverse
 
+from core.utils.db.counts import estimate_count
+
 
 # LinkedAdminMixin
 # ----------------------------------------------------------------------------------------------------------------------
@@ -40,3 +46,130 @@ class LinkedAdminMixin:
         label = getattr(parent, label_field) if label_field != '__str__' else str(parent)
         target = ' target="_blank"' if new_tab else ""
         return format_html('<a href="{}"{}>{}</a>', url, target, label)
+
+
+# ======================================================================================================================
+# Large table admin
+# ======================================================================================================================
+# Attempt кестелері әр attempt сайын ~100 жолға өседі. OFFSET пагинация мен толық COUNT(*) миллиондаған жолда
+# баяулайды, сондықтан changelist pk бойынша keyset пагинациямен және бағаланған санмен жұмыс істейді.
+CURSOR_VAR = "before"
+
+
+class KeysetChangeList(ChangeList):
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        cursor = request.GET.get(CURSOR_VAR)
+        queryset = self.queryset.order_by("-pk")
+        if cursor:
+            try:
+                queryset = queryset.filter(pk__lt=int(cursor))
+            except ValueError:
+                raise IncorrectLookupParameters
+        rows = list(queryset[:self.list_per_page + 1])
+        has_next = len(rows) > self.list_per_page
+
+        # list_editable қолданылмайды, сондықтан result_list queryset емес, тізім болуы жеткілікті
+        self.result_list = rows[:self.list_per_page]
+        self.result_count = estimate_count(self.queryset)
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = has_next or bool(cursor)
+        self.paginator = None
+        self.next_url = self.get_query_string({CURSOR_VAR: self.result_list[-1].pk}) if has_next else None
+        self.first_url = self.get_query_string(remove=[CURSOR_VAR]) if cursor else None
+
+
+# KeysetAdminMixin
+# ----------------------------------------------------------------------------------------------------------------------
+# Баған бойынша сұрыптау әдейі өшірілген (sortable_by = ()): курсор тек pk бойынша жұмыс істейді, ал басқа
+# баған бойынша ORDER BY + OFFSET миллиондаған жолда дәл осы шешілген баяулықты қайтарады. Реттілік әрқашан
+# жаңадан ескіге (-pk); тар іріктеу үшін list_filter және search_fields (дәл id) қолданылады.
+class KeysetAdminMixin:
+    change_list_template = "admin/keyset_change_list.html"
+    show_full_result_count = False
+    ordering = ("-pk", )
+    sortable_by = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+# PaginatedInlineMixin
+# ----------------------------------------------------------------------------------------------------------------------
+# Тек оқуға арналған inline: жолдар беттерге бөлініп (?<page_param>=N), бір бетте per_page жол ғана жүктеледі.
+# Бет сілтемелері ағымдағы GET параметрлерінен құрылады: басқа inline беті мен _changelist_filters сақталады.
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    page = 1
+    per_page = 50
+    page_param = "page"
+    query_params = None
+
+    def page_url(self, page: int) -> str:
+        params = self.query_params.copy() if self.query_params is not None else QueryDict(mutable=True)
+        params[self.page_param] = page
+        return "?" + params.urlencode()
+
+    @property
+    def previous_url(self) -> str:
+        return self.page_url(self.page - 1)
+
+    @property
+    def next_url(self) -> str:
+        return self.page_url(self.page + 1)
+
+    def get_queryset(self):
+        if not hasattr(self, "_page_queryset"):
+            queryset = super().get_queryset()
+            self.total = queryset.count()
+            start = (self.page - 1) * self.per_page
+            self._page_queryset = queryset[start:start + self.per_page]
+        return self._page_queryset
+
+    @property
+    def page_count(self) -> int:
+        self.get_queryset()
+        return max((self.total + self.per_page - 1) // self.per_page, 1)
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.page_count
+
+
+class PaginatedInlineMixin:
+    formset = PaginatedInlineFormSet
+    template = "admin/edit_inline/paginated_tabular.html"
+    per_page = 50
+    page_param = "page"
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        try:
+            page = max(int(request.GET.get(self.page_param, 1)), 1)
+        except ValueError:
+            page = 1
+        # inlineformset_factory әр шақыруда жаңа класс құрады: атрибуттар тек осы сұранысқа қатысты
+        formset.page, formset.per_page, formset.page_param = page, self.per_page, self.page_param
+        formset.query_params = request.GET
+        return formset
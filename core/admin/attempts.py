@@ -1,7 +1,9 @@
 from django.contrib import admin
 from django.utils.translation import gettext_lazy as _
 from core.admin import LinkedAdminMixin
-from core.models import MCQSelection, SpeakingAnswer, QuestionAttempt, SectionAttempt, ExamAttempt, WritingSubmission
+from core.admin._mixins import KeysetAdminMixin, PaginatedInlineMixin
+from core.models import MCQSelection, SpeakingAnswer, QuestionAttempt, SectionAttempt, ExamAttempt, WritingSubmission, \
+    GradingJob, TranscriptCacheEntry, UserProgressStats
 
 
 # ======================================================================================================================
@@ -11,6 +13,7 @@ from core.models import MCQSelection, SpeakingAnswer, QuestionAttempt, SectionAt
 class MCQSelectionInline(admin.TabularInline):
     model = MCQSelection
     extra = 0
+    raw_id_fields = ("option", )
 
 
 # SpeakingAnswerInline
@@ -27,10 +30,13 @@ class WritingSubmissionInline(admin.StackedInline):
 
 # QuestionAttemptAdmin
 @admin.register(QuestionAttempt)
-class QuestionAttemptAdmin(LinkedAdminMixin, admin.ModelAdmin):
+class QuestionAttemptAdmin(KeysetAdminMixin, LinkedAdminMixin, admin.ModelAdmin):
     list_display = ("question", "section_attempt", "is_answered", "is_graded", "score", "max_score", )
+    list_select_related = ("question", "section_attempt", )
     list_filter = ("is_answered", "is_graded", "question__question_type")
-    search_fields = ("question__prompt", )
+    # prompt бойынша icontains миллиондаған жолда толық сканерлеу: тек id бойынша дәл іздеу
+    search_fields = ("=id", "=section_attempt__attempt__id", )
+    raw_id_fields = ("section_attempt", "question", )
     readonly_fields = ("attempt_section_link", )
 
     def attempt_section_link(self, obj):
@@ -44,10 +50,14 @@ class QuestionAttemptAdmin(LinkedAdminMixin, admin.ModelAdmin):
 # SectionAttempt
 # ======================================================================================================================
 # QuestionAttemptInline
-class QuestionAttemptInline(LinkedAdminMixin, admin.TabularInline):
+class QuestionAttemptInline(PaginatedInlineMixin, LinkedAdminMixin, admin.TabularInline):
     model = QuestionAttempt
-    extra = 0
-    readonly_fields = ("detail_link", )
+    fields = ("question", "is_answered", "is_graded", "score", "max_score", "detail_link", )
+    readonly_fields = fields
+    page_param = "questions_page"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("question").order_by("question__order", "id")
 
     def detail_link(self, obj):
         return self.admin_link(obj, label=_("Толығырақ"))
@@ -56,9 +66,12 @@ class QuestionAttemptInline(LinkedAdminMixin, admin.TabularInline):
 
 # SectionAttemptAdmin
 @admin.register(SectionAttempt)
-class SectionAttemptAdmin(LinkedAdminMixin, admin.ModelAdmin):
+class SectionAttemptAdmin(KeysetAdminMixin, LinkedAdminMixin, admin.ModelAdmin):
     list_display = ("attempt", "section", "status", "score", "max_score", "time_spent_seconds", )
+    list_select_related = ("attempt", "section", )
     list_filter = ("status", "section__section_type")
+    search_fields = ("=id", "=attempt__id", )
+    raw_id_fields = ("attempt", "section", )
     inlines = (QuestionAttemptInline, )
     readonly_fields = ("attempt_link",)
 
@@ -74,8 +87,12 @@ class SectionAttemptAdmin(LinkedAdminMixin, admin.ModelAdmin):
 class SectionAttemptInline(LinkedAdminMixin, admin.TabularInline):
     model = SectionAttempt
     extra = 0
+    raw_id_fields = ("section", )
     readonly_fields = ("detail_link", )
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("section")
+
     def detail_link(self, obj):
         return self.admin_link(obj, label=_("Толығырақ"))
     detail_link.short_description = _("Сілтеме")
@@ -83,9 +100,51 @@ class SectionAttemptInline(LinkedAdminMixin, admin.TabularInline):
 
 # ExamAttemptAdmin
 @admin.register(ExamAttempt)
-class ExamAttemptAdmin(admin.ModelAdmin):
+class ExamAttemptAdmin(KeysetAdminMixin, admin.ModelAdmin):
     list_display = ("user", "exam", "status", "started_at", "finished_at", "total_score", "max_total_score", )
+    list_select_related = ("user", "exam", )
     list_filter = ("status", "exam")
     search_fields = ("user__username", "user__first_name", "user__last_name")
     autocomplete_fields = ("user", "exam")
     inlines = (SectionAttemptInline, )
+
+
+# ======================================================================================================================
+# GradingJob
+# ======================================================================================================================
+# GradingJobAdmin
+@admin.register(GradingJob)
+class GradingJobAdmin(LinkedAdminMixin, admin.ModelAdmin):
+    list_display = ("question_attempt", "status", "tries", "run_after", "updated_at", )
+    list_select_related = ("question_attempt", )
+    list_filter = ("status", )
+    show_full_result_count = False
+    raw_id_fields = ("question_attempt", )
+    readonly_fields = ("question_attempt_link", "last_error", "locked_at", )
+
+    def question_attempt_link(self, obj):
+        return self.parent_link(obj, 'question_attempt')
+    question_attempt_link.short_description = _("Сұрақ нәтижесі")
+
+
+# TranscriptCacheEntryAdmin
+@admin.register(TranscriptCacheEntry)
+class TranscriptCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ("audio_sha256", "model", "hits", "transcribe_seconds", "last_used_at", )
+    list_filter = ("model", )
+    search_fields = ("audio_sha256", )
+    readonly_fields = ("audio_sha256", "model", "hits", "transcribe_seconds", "created_at", "last_used_at", )
+
+
+# ======================================================================================================================
+# Statistics
+# ======================================================================================================================
+# UserProgressStatsAdmin
+@admin.register(UserProgressStats)
+class UserProgressStatsAdmin(admin.ModelAdmin):
+    list_display = ("user", "attempt_count", "scored_count", "percent_sum", "score_sum", "updated_at", )
+    search_fields = ("user__username", "user__first_name", "user__last_name")
+    raw_id_fields = ("user", )
+    readonly_fields = (
+        "attempt_count", "scored_count", "percent_sum", "score_sum", "max_score_sum", "section_stats", "updated_at",
+    )
@@ -1,10 +1,18 @@
 from django.contrib import admin
 from django.contrib.admin import register
-from django.utils.safestring import mark_safe
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path
+from django.utils.decorators import method_decorator
+from django.utils.html import format_html
+from django.views.decorators.http import require_POST
 from core.admin._mixins import LinkedAdminMixin
 from core.forms.exams import ExamAdminForm, SectionMaterialAdminForm, QuestionAdminForm, OptionAdminForm, \
-    SpeakingRubricAdminForm
+    SpeakingRubricAdminForm, QuestionInlineForm
 from core.models import Exam, Section, SectionMaterial, Question, Option, SpeakingRubric, Writing
+from core.signals import bump_exam_version
 from django.utils.translation import gettext_lazy as _
 
 
@@ -26,7 +34,7 @@ class SectionInline(LinkedAdminMixin, admin.TabularInline):
 # ExamAdmin
 @register(Exam)
 class ExamAdmin(admin.ModelAdmin):
-    list_display = ("title", "is_published", "created_at", )
+    list_display = ("title", "is_published", "section_count", "question_count", "created_at", )
     list_filter = ("is_published", )
     search_fields = ("title", )
     form = ExamAdminForm
@@ -45,11 +53,21 @@ class SectionMaterialInline(LinkedAdminMixin, admin.StackedInline):
 
 
 # QuestionInline
+# Берілгені CKEditor-сыз қысқа мәтінмен көрсетіледі (LazyCKEditorWidget). Реттілік inline формалары арқылы
+# емес, сүйреп тастау + бір reorder-questions сұранысымен сақталады.
 class QuestionInline(LinkedAdminMixin, admin.TabularInline):
     model = Question
-    fields = ("order", "question_type", "points", "detail_link", )
+    form = QuestionInlineForm
+    fields = ("drag_handle", "order", "question_type", "points", "prompt", "detail_link", )
     extra = 0
-    readonly_fields = ("detail_link", )
+    readonly_fields = ("drag_handle", "order", "detail_link", )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).order_by("order", "id")
+
+    def drag_handle(self, obj):
+        return "☰"
+    drag_handle.short_description = ""
 
     def detail_link(self, obj):
         return self.admin_link(obj, label=_("Толығырақ"))
@@ -69,6 +87,69 @@ class SectionAdmin(LinkedAdminMixin, admin.ModelAdmin):
 
     inlines = (SectionMaterialInline, QuestionInline, )
 
+    class Media:
+        js = ("js/admin/question_reorder.js", )
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<path:object_id>/reorder-questions/",
+                self.admin_site.admin_view(self.reorder_questions_view),
+                name="core_section_reorder_questions",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    # reorder_questions_view
+    # POST question_ids=<id>&question_ids=<id>...: секцияның барлық сұрақтары жаңа ретпен. Бір bulk_update,
+    # content_version бір рет өседі (bulk_update сигналдарды шақырмайды).
+    @method_decorator(require_POST)
+    def reorder_questions_view(self, request, object_id):
+        section = get_object_or_404(Section, pk=object_id)
+        if not self.has_change_permission(request, section):
+            raise PermissionDenied
+
+        try:
+            ids = [int(i) for i in request.POST.getlist("question_ids")]
+        except ValueError:
+            return HttpResponseBadRequest("question_ids")
+
+        with transaction.atomic():
+            questions = {
+                q.pk: q
+                for q in Question.objects.select_for_update().filter(section=section).only("id", "order")
+            }
+            if len(ids) != len(set(ids)) or set(ids) != set(questions):
+                return HttpResponseBadRequest(_("Тізім секцияның сұрақтарымен сәйкес емес."))
+
+            changed = []
+            for position, pk in enumerate(ids, start=1):
+                question = questions[pk]
+                if question.order != position:
+                    question.order = position
+                    changed.append(question)
+            if changed:
+                Question.objects.bulk_update(changed, ["order"])
+                bump_exam_version(pk=section.exam_id)
+
+        return JsonResponse({"updated": len(changed)})
+
+    # Inline-да order өзгертілмейді: жаңа сұрақтар секцияның соңына қосылады
+    def save_formset(self, request, form, formset, change):
+        if formset.model is not Question:
+            return super().save_formset(request, form, formset, change)
+
+        instances = formset.save(commit=False)
+        next_order = max(Question.objects.filter(section=form.instance).values_list("order", flat=True), default=0) + 1
+        for obj in formset.deleted_objects:
+            obj.delete()
+        for obj in instances:
+            if obj.pk is None:
+                obj.order = next_order
+                next_order += 1
+            obj.save()
+        formset.save_m2m()
+
     def get_inline_instances(self, request, obj=None):
         inline_instances = super().get_inline_instances(request, obj)
         if obj is None:
@@ -110,14 +191,14 @@ class WritingInline(admin.StackedInline):
 @admin.register(Question)
 class QuestionAdmin(LinkedAdminMixin, admin.ModelAdmin):
     list_display = ("preview", "section", "question_type", "points")
+    list_select_related = ("section", )
     list_filter = ("question_type", "section__section_type", "section__exam")
     search_fields = ("prompt", "section__exam__title")
     readonly_fields = ("section_link",)
     form = QuestionAdminForm
 
     def preview(self, obj):
-        html = obj.prompt or ''
-        return mark_safe(f"<div class='preview'>{html}</div>")
+        return format_html("<div class='preview'>{}</div>", obj.prompt_preview or "—")
 
     def section_link(self, obj):
         return self.parent_link(obj, "section")
@@ -1,6 +1,7 @@
 from ckeditor.widgets import CKEditorWidget
 from django import forms
 from django.core.exceptions import ValidationError
+from core.forms.widgets import LazyCKEditorWidget
 from core.models import Exam, Question, Option, SectionMaterial, SpeakingRubric
 
 
@@ -37,6 +38,17 @@ class QuestionAdminForm(forms.ModelForm):
         }
 
 
+# QuestionInline
+# ======================================================================================================================
+class QuestionInlineForm(forms.ModelForm):
+    class Meta:
+        model = Question
+        fields = ("question_type", "points", "prompt")
+        widgets = {
+            "prompt": LazyCKEditorWidget(config_name="default"),
+        }
+
+
 # OptionAdmin
 # ======================================================================================================================
 class OptionAdminForm(forms.ModelForm):
@@ -44,7 +56,7 @@ class OptionAdminForm(forms.ModelForm):
         model = Option
         fields = "__all__"
         widgets = {
-            "text": CKEditorWidget(config_name="default"),
+            "text": LazyCKEditorWidget(config_name="default"),
         }
 
 
@@ -0,0 +1,31 @@
+import html
+
+from ckeditor.widgets import CKEditorWidget
+from django.utils.html import format_html, strip_tags
+from django.utils.safestring import mark_safe
+
+PREVIEW_CHARS = 300
+
+
+# LazyCKEditorWidget
+# ======================================================================================================================
+# Көп жолды inline-да әр жолға CKEditor құру браузерді баяулатады. Бұл виджет алдымен HTML-сіз қысқа мәтінді
+# көрсетеді; textarea жасырын тұрады (форма мәні жіберіледі), ал CKEditor тек басқан кезде іске қосылады.
+# ckeditor-init.js тек data-processed="0" textarea-ларды өңдейді, сондықтан "lazy" белгісі оны өткізіп жібереді.
+class LazyCKEditorWidget(CKEditorWidget):
+    class Media:
+        js = ("js/admin/lazy_ckeditor.js", )
+
+    def render(self, name, value, attrs=None, renderer=None):
+        editor = super().render(name, value, attrs, renderer).replace('data-processed="0"', 'data-processed="lazy"', 1)
+        text = " ".join(html.unescape(strip_tags(value or "")).split())
+        if len(text) > PREVIEW_CHARS:
+            text = text[:PREVIEW_CHARS - 1] + "…"
+        return format_html(
+            '<div class="lazy-ckeditor">'
+            '<div class="lazy-ckeditor-preview" title="Өңдеу үшін басыңыз">{}</div>'
+            '<div class="lazy-ckeditor-editor" hidden>{}</div>'
+            '</div>',
+            text or "—",
+            mark_safe(editor),
+        )
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_exam_content_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='initialized_version',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Құрылған мазмұн нұсқасы'),
+        ),
+    ]
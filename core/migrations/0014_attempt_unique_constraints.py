@@ -0,0 +1,105 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:05
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def merge_duplicate_attempt_rows(apps, schema_editor):
+    SectionAttempt = apps.get_model("core", "SectionAttempt")
+    QuestionAttempt = apps.get_model("core", "QuestionAttempt")
+
+    # Қайталанған SectionAttempt-тердің сұрақтарын ең кіші id-ге көшіріп, қалғанын өшіреміз
+    keep_sa = {}
+    for sa_id, attempt_id, section_id in (
+        SectionAttempt.objects.order_by("id").values_list("id", "attempt_id", "section_id").iterator()
+    ):
+        key = (attempt_id, section_id)
+        if key not in keep_sa:
+            keep_sa[key] = sa_id
+            continue
+        QuestionAttempt.objects.filter(section_attempt_id=sa_id).update(section_attempt_id=keep_sa[key])
+        SectionAttempt.objects.filter(pk=sa_id).delete()
+
+    # Қайталанған QuestionAttempt-тердің ішінен жауабы/баллы барын қалдырамыз (тең болса ең кіші id), ал
+    # қалғандарының жауаптарын өшірмес бұрын сақталатын қатарға көшіреміз
+    groups = defaultdict(list)
+    for qa_id, sa_id, question_id in (
+        QuestionAttempt.objects.order_by("id").values_list("id", "section_attempt_id", "question_id").iterator()
+    ):
+        groups[(sa_id, question_id)].append(qa_id)
+    for qa_ids in groups.values():
+        if len(qa_ids) > 1:
+            merge_question_attempts(apps, qa_ids)
+
+    # Жойылған қатарлардың deferred FK тексерулері осында орындалады: әйтпесе кейінгі AddConstraint
+    # PostgreSQL-де "pending trigger events" қатесімен құлайды
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+
+def merge_question_attempts(apps, qa_ids: list[int]) -> None:
+    QuestionAttempt = apps.get_model("core", "QuestionAttempt")
+    MCQSelection = apps.get_model("core", "MCQSelection")
+    SpeakingAnswer = apps.get_model("core", "SpeakingAnswer")
+    WritingSubmission = apps.get_model("core", "WritingSubmission")
+
+    selections = list(
+        MCQSelection.objects.filter(question_attempt_id__in=qa_ids).order_by("id").values_list(
+            "id", "question_attempt_id", "option_id"
+        )
+    )
+    speaking = dict(
+        SpeakingAnswer.objects.filter(question_attempt_id__in=qa_ids).order_by("-id").values_list(
+            "question_attempt_id", "id"
+        )
+    )
+    writing = dict(
+        WritingSubmission.objects.filter(question_attempt_id__in=qa_ids).order_by("-id").values_list(
+            "question_attempt_id", "id"
+        )
+    )
+    with_answers = {qa_id for _sel_id, qa_id, _option_id in selections} | set(speaking) | set(writing)
+
+    rows = QuestionAttempt.objects.filter(pk__in=qa_ids).values("id", "is_graded", "is_answered", "score")
+    keep = max(
+        rows,
+        key=lambda r: (r["is_graded"], r["is_answered"], r["id"] in with_answers, bool(r["score"]), -r["id"]),
+    )["id"]
+    others = [qa_id for qa_id in qa_ids if qa_id != keep]
+
+    kept_options = {option_id for _sel_id, qa_id, option_id in selections if qa_id == keep}
+    moved = []
+    for sel_id, qa_id, option_id in selections:
+        if qa_id != keep and option_id not in kept_options:
+            kept_options.add(option_id)
+            moved.append(sel_id)
+    if moved:
+        MCQSelection.objects.filter(pk__in=moved).update(question_attempt_id=keep)
+
+    for model, by_qa in ((SpeakingAnswer, speaking), (WritingSubmission, writing)):
+        if keep in by_qa:
+            continue
+        answer_id = next((by_qa[qa_id] for qa_id in others if qa_id in by_qa), None)
+        if answer_id is not None:
+            model.objects.filter(pk=answer_id).update(question_attempt_id=keep)
+
+    QuestionAttempt.objects.filter(pk__in=others).delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_examattempt_initialized_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_attempt_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='sectionattempt',
+            constraint=models.UniqueConstraint(fields=('attempt', 'section'), name='uniq_section_attempt'),
+        ),
+        migrations.AddConstraint(
+            model_name='questionattempt',
+            constraint=models.UniqueConstraint(fields=('section_attempt', 'question'), name='uniq_question_attempt'),
+        ),
+    ]
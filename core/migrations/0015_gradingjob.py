@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-18 11:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_attempt_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GradingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Кезекте'), ('running', 'Бағалануда'), ('done', 'Бағаланды'), ('failed', 'Қате')], default='pending', max_length=16, verbose_name='Статус')),
+                ('tries', models.PositiveSmallIntegerField(default=0, verbose_name='Әрекет саны')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Орындау уақыты')),
+                ('locked_at', models.DateTimeField(blank=True, null=True, verbose_name='Алынған уақыты')),
+                ('last_error', models.TextField(blank=True, null=True, verbose_name='Соңғы қате')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Құрылған уақыты')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('question_attempt', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='grading_job', to='core.questionattempt', verbose_name='Сұрақ нәтижесі')),
+            ],
+            options={
+                'verbose_name': 'Бағалау тапсырмасы',
+                'verbose_name_plural': 'Бағалау тапсырмалары',
+                'indexes': [models.Index(fields=['status', 'run_after'], name='grading_job_claim_idx')],
+            },
+        ),
+    ]
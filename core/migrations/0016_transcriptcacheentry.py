@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-18 12:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_gradingjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranscriptCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audio_sha256', models.CharField(max_length=64, verbose_name='Аудио хэші (SHA-256)')),
+                ('model', models.CharField(max_length=64, verbose_name='Модель')),
+                ('transcript', models.TextField(blank=True, default='', verbose_name='Транскрипт')),
+                ('transcribe_seconds', models.FloatField(default=0, verbose_name='Транскрипция уақыты (сек)')),
+                ('hits', models.PositiveIntegerField(default=0, verbose_name='Кэштен алынды')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Құрылған уақыты')),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Соңғы қолданылған уақыты')),
+            ],
+            options={
+                'verbose_name': 'Транскрипт кэші',
+                'verbose_name_plural': 'Транскрипт кэші',
+                'constraints': [models.UniqueConstraint(fields=('audio_sha256', 'model'), name='uniq_transcript_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:10
+
+from django.db import migrations, models
+
+from core.utils.output import normalize_output_text
+
+
+def fill_expected_normalized(apps, schema_editor):
+    Writing = apps.get_model("core", "Writing")
+    rows = list(Writing.objects.only("id", "expected_output", "ignore_whitespace"))
+    for w in rows:
+        w.expected_normalized = normalize_output_text(w.expected_output, w.ignore_whitespace)
+    Writing.objects.bulk_update(rows, ["expected_normalized"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_transcriptcacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='writing',
+            name='expected_normalized',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Қалыпқа келтірілген output'),
+        ),
+        migrations.RunPython(fill_expected_normalized, migrations.RunPython.noop),
+    ]
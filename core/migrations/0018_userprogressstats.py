@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-18 13:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_writing_expected_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserProgressStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attempt_count', models.PositiveIntegerField(default=0, verbose_name='Аяқталған attempt саны')),
+                ('scored_count', models.PositiveIntegerField(default=0, verbose_name='Пайызы есептелген attempt саны')),
+                ('percent_sum', models.FloatField(default=0, verbose_name='Пайыздар қосындысы')),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Балл қосындысы')),
+                ('max_score_sum', models.DecimalField(decimal_places=2, default=0, max_digits=12, verbose_name='Макс балл қосындысы')),
+                ('section_stats', models.JSONField(blank=True, default=dict, verbose_name='Секция бойынша')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='progress_stats', to=settings.AUTH_USER_MODEL, verbose_name='Пайдаланушы')),
+            ],
+            options={
+                'verbose_name': 'Қолданушы статистикасы',
+                'verbose_name_plural': 'Қолданушы статистикасы',
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_userprogressstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamItemAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_version', models.PositiveIntegerField(default=0, verbose_name='Мазмұн нұсқасы')),
+                ('attempt_count', models.PositiveIntegerField(default=0, verbose_name='Attempt саны')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Нәтиже')),
+                ('compute_seconds', models.FloatField(default=0, verbose_name='Есептеу уақыты (сек)')),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Есептелген уақыты')),
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='item_analysis', to='core.exam', verbose_name='Емтихан')),
+            ],
+            options={
+                'verbose_name': 'Сұрақ талдауы',
+                'verbose_name_plural': 'Сұрақ талдаулары',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_examitemanalysis'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamScoreHistogram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket_count', models.PositiveSmallIntegerField(default=20, verbose_name='Bucket саны')),
+                ('counts', models.JSONField(blank=True, default=list, verbose_name='Bucket мәндері')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='Attempt саны')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Жаңартылған уақыты')),
+                ('exam', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='score_histogram', to='core.exam', verbose_name='Емтихан')),
+            ],
+            options={
+                'verbose_name': 'Балл гистограммасы',
+                'verbose_name_plural': 'Балл гистограммалары',
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 6.0.1 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_exam_counters(apps, schema_editor):
+    Exam = apps.get_model("core", "Exam")
+    Section = apps.get_model("core", "Section")
+    Question = apps.get_model("core", "Question")
+
+    sections = Section.objects.filter(exam_id=OuterRef("pk")).order_by().values("exam_id")
+    questions = Question.objects.filter(section__exam_id=OuterRef("pk")).order_by().values("section__exam_id")
+    Exam.objects.update(
+        section_count=Coalesce(Subquery(sections.annotate(n=Count("id")).values("n")), Value(0)),
+        question_count=Coalesce(Subquery(questions.annotate(n=Count("id")).values("n")), Value(0)),
+        time_limit=Coalesce(Subquery(sections.annotate(n=Sum("time_limit")).values("n")), Value(0)),
+        max_total_score=Coalesce(Subquery(sections.annotate(n=Sum("max_score")).values("n")), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_examscorehistogram'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exam',
+            name='section_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Секция саны'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сұрақтар саны'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='time_limit',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Жалпы уақыты (мин)'),
+        ),
+        migrations.AddField(
+            model_name='exam',
+            name='max_total_score',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Макс жалпы балл'),
+        ),
+        migrations.RunPython(fill_exam_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:20
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+# Django postgres backend icontains-ті UPPER("col"::text) LIKE UPPER(...) түрінде жазады,
+# сондықтан индекс дәл сол өрнекке құрылады
+TRGM_INDEXES = {
+    "exam_title_trgm_idx": "title",
+    "exam_description_trgm_idx": "description",
+}
+
+
+def create_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, column in TRGM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{name}" ON "core_exam" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trgm_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRGM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_exam_counters'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['-id'], name='exam_published_id_idx'),
+        ),
+        migrations.RunPython(create_trgm_indexes, drop_trgm_indexes),
+    ]
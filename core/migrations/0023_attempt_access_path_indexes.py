@@ -0,0 +1,60 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:45
+
+from django.db import migrations, models
+
+
+def delete_duplicate_mcq_selections(apps, schema_editor):
+    MCQSelection = apps.get_model("core", "MCQSelection")
+
+    # Бір нұсқаның қайталанған таңдаулары бағалауға әсер етпейді: ең кіші id қалады
+    seen = set()
+    duplicate_ids = []
+    for sel_id, qa_id, option_id in (
+        MCQSelection.objects.order_by("id").values_list("id", "question_attempt_id", "option_id").iterator()
+    ):
+        key = (qa_id, option_id)
+        if key in seen:
+            duplicate_ids.append(sel_id)
+        else:
+            seen.add(key)
+    for start in range(0, len(duplicate_ids), 1000):
+        MCQSelection.objects.filter(pk__in=duplicate_ids[start:start + 1000]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_exam_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['exam', 'order'], name='section_exam_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['section', 'order'], name='question_section_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['user', 'status'], name='exam_attempt_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['user', 'exam'], name='exam_attempt_user_exam_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['user', '-finished_at', '-id'], name='exam_attempt_user_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(fields=['exam', 'status'], name='exam_attempt_exam_status_idx'),
+        ),
+        migrations.RunPython(delete_duplicate_mcq_selections, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='mcqselection',
+            constraint=models.UniqueConstraint(fields=('question_attempt', 'option'), name='uniq_mcq_selection'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:10
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_attempt_progress(apps, schema_editor):
+    ExamAttempt = apps.get_model("core", "ExamAttempt")
+    QuestionAttempt = apps.get_model("core", "QuestionAttempt")
+
+    answered = (
+        QuestionAttempt.objects
+        .filter(section_attempt__attempt_id=OuterRef("pk"), is_answered=True)
+        .order_by()
+        .values("section_attempt__attempt_id")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    ExamAttempt.objects.update(
+        answered_count=Coalesce(Subquery(answered), Value(0)),
+        progress_at=Coalesce("finished_at", "started_at"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_attempt_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='answered_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Жауап берілген сұрақтар'),
+        ),
+        migrations.AddField(
+            model_name='examattempt',
+            name='progress_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Прогресс уақыты'),
+        ),
+        migrations.RunPython(fill_attempt_progress, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:40
+
+import html
+
+from django.db import migrations, models
+from django.utils.html import strip_tags
+
+PREVIEW_LENGTH = 255
+
+
+def fill_prompt_preview(apps, schema_editor):
+    Question = apps.get_model("core", "Question")
+
+    batch = []
+    for pk, prompt in Question.objects.order_by("id").values_list("id", "prompt").iterator(chunk_size=2000):
+        text = " ".join(html.unescape(strip_tags(prompt or "")).split())
+        if len(text) > PREVIEW_LENGTH:
+            text = text[:PREVIEW_LENGTH - 1] + "…"
+        batch.append(Question(pk=pk, prompt_preview=text))
+        if len(batch) >= 2000:
+            Question.objects.bulk_update(batch, ["prompt_preview"])
+            batch = []
+    if batch:
+        Question.objects.bulk_update(batch, ["prompt_preview"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_examattempt_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='prompt_preview',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='Қысқаша мәтіні'),
+        ),
+        migrations.RunPython(fill_prompt_preview, migrations.RunPython.noop),
+    ]
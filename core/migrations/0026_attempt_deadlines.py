@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_question_prompt_preview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='deadline_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Аяқталу мерзімі'),
+        ),
+        migrations.AddField(
+            model_name='sectionattempt',
+            name='deadline_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Аяқталу мерзімі'),
+        ),
+        migrations.AddIndex(
+            model_name='examattempt',
+            index=models.Index(
+                condition=models.Q(('deadline_at__isnull', False), ('status', 'in_progress')),
+                fields=['deadline_at'],
+                name='exam_attempt_deadline_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='sectionattempt',
+            index=models.Index(
+                condition=models.Q(('deadline_at__isnull', False), ('status', 'in_progress')),
+                fields=['deadline_at'],
+                name='section_attempt_deadline_idx',
+            ),
+        ),
+    ]
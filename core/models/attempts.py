@@ -31,10 +31,28 @@ class ExamAttempt(models.Model):
     total_score = models.DecimalField(_("Жалпы балл"), max_digits=7, decimal_places=2, default=0)
     max_total_score = models.DecimalField(_("Макс жалпы балл"), max_digits=7, decimal_places=2, default=0)
     meta = models.JSONField(_("Қосымша дерек"), default=dict, blank=True)
+    initialized_version = models.PositiveIntegerField(_("Құрылған мазмұн нұсқасы"), blank=True, null=True, editable=False)
+    # Мониторинг үшін прогресс есептегіші: QuestionAttempt қатарларын санамай-ақ оқылады
+    answered_count = models.PositiveIntegerField(_("Жауап берілген сұрақтар"), default=0, editable=False)
+    progress_at = models.DateTimeField(_("Прогресс уақыты"), blank=True, null=True, editable=False)
+    # Сервер есептейтін мерзім: клиент таймеріне сенбейміз (None — уақыт шектеусіз)
+    deadline_at = models.DateTimeField(_("Аяқталу мерзімі"), blank=True, null=True, editable=False)
 
     class Meta:
         verbose_name = _("Емтихан нәтижесі")
         verbose_name_plural = _("Емтихан нәтижелері")
+        indexes = [
+            models.Index(fields=["user", "status"], name="exam_attempt_user_status_idx"),
+            models.Index(fields=["user", "exam"], name="exam_attempt_user_exam_idx"),
+            models.Index(fields=["user", "-finished_at", "-id"], name="exam_attempt_user_recent_idx"),
+            models.Index(fields=["exam", "status"], name="exam_attempt_exam_status_idx"),
+            # sweep_expired_attempts: тек жүріп жатқан, мерзімі бар attempt-тер
+            models.Index(
+                fields=["deadline_at"],
+                condition=models.Q(status="in_progress", deadline_at__isnull=False),
+                name="exam_attempt_deadline_idx",
+            ),
+        ]
 
     def __str__(self):
         return _('#{}-емтихан нәтижесі').format(self.pk)
@@ -61,10 +79,21 @@ class SectionAttempt(models.Model):
     score = models.DecimalField(_("Секция баллы"), max_digits=7, decimal_places=2, default=0)
     max_score = models.DecimalField(_("Макс секция баллы"), max_digits=7, decimal_places=2, default=0)
     time_spent_seconds = models.PositiveIntegerField(_("Жұмсаған уақыт (сек)"), default=0)
+    deadline_at = models.DateTimeField(_("Аяқталу мерзімі"), blank=True, null=True, editable=False)
 
     class Meta:
         verbose_name = _("Секция нәтижесі")
         verbose_name_plural = _("Секция нәтижелері")
+        constraints = [
+            models.UniqueConstraint(fields=["attempt", "section"], name="uniq_section_attempt"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["deadline_at"],
+                condition=models.Q(status="in_progress", deadline_at__isnull=False),
+                name="section_attempt_deadline_idx",
+            ),
+        ]
 
     def __str__(self):
         return _('#{}-секция нәтижесі').format(self.pk)
@@ -91,6 +120,9 @@ class QuestionAttempt(models.Model):
     class Meta:
         verbose_name = _("Сұрақ нәтижесі")
         verbose_name_plural = _("Сұрақ нәтижелері")
+        constraints = [
+            models.UniqueConstraint(fields=["section_attempt", "question"], name="uniq_question_attempt"),
+        ]
 
     def __str__(self):
         return _('#{}-сұрақ нәтижесі').format(self.pk)
@@ -132,6 +164,9 @@ class MCQSelection(models.Model):
     class Meta:
         verbose_name = _("Тест жауабы")
         verbose_name_plural = _("Тест жауаптары")
+        constraints = [
+            models.UniqueConstraint(fields=["question_attempt", "option"], name="uniq_mcq_selection"),
+        ]
 
     def __str__(self):
         return _('#{}-тест жауабы').format(self.pk)
@@ -161,3 +196,141 @@ class WritingSubmission(models.Model):
 
     def __str__(self):
         return _('#{}-жазбаша жауабы').format(self.pk)
+
+
+# ======================================================================================================================
+# Grading
+# ======================================================================================================================
+# GradingJob
+class GradingJob(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "pending", _("Кезекте")
+        RUNNING = "running", _("Бағалануда")
+        DONE = "done", _("Бағаланды")
+        FAILED = "failed", _("Қате")
+
+    question_attempt = models.OneToOneField(
+        QuestionAttempt, on_delete=models.CASCADE,
+        related_name="grading_job", verbose_name=_("Сұрақ нәтижесі"),
+    )
+    status = models.CharField(_("Статус"), max_length=16, choices=Status.choices, default=Status.PENDING)
+    tries = models.PositiveSmallIntegerField(_("Әрекет саны"), default=0)
+    run_after = models.DateTimeField(_("Орындау уақыты"), default=timezone.now)
+    locked_at = models.DateTimeField(_("Алынған уақыты"), blank=True, null=True)
+    last_error = models.TextField(_("Соңғы қате"), blank=True, null=True)
+    created_at = models.DateTimeField(_("Құрылған уақыты"), auto_now_add=True)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Бағалау тапсырмасы")
+        verbose_name_plural = _("Бағалау тапсырмалары")
+        indexes = [
+            models.Index(fields=["status", "run_after"], name="grading_job_claim_idx"),
+        ]
+
+    def __str__(self):
+        return _('#{}-бағалау тапсырмасы').format(self.pk)
+
+
+# TranscriptCacheEntry
+class TranscriptCacheEntry(models.Model):
+    audio_sha256 = models.CharField(_("Аудио хэші (SHA-256)"), max_length=64)
+    model = models.CharField(_("Модель"), max_length=64)
+    transcript = models.TextField(_("Транскрипт"), blank=True, default="")
+    transcribe_seconds = models.FloatField(_("Транскрипция уақыты (сек)"), default=0)
+    hits = models.PositiveIntegerField(_("Кэштен алынды"), default=0)
+    created_at = models.DateTimeField(_("Құрылған уақыты"), auto_now_add=True)
+    last_used_at = models.DateTimeField(_("Соңғы қолданылған уақыты"), default=timezone.now, db_index=True)
+
+    class Meta:
+        verbose_name = _("Транскрипт кэші")
+        verbose_name_plural = _("Транскрипт кэші")
+        constraints = [
+            models.UniqueConstraint(fields=["audio_sha256", "model"], name="uniq_transcript_cache_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.audio_sha256[:12]}… ({self.model})"
+
+
+# ======================================================================================================================
+# Statistics
+# ======================================================================================================================
+# UserProgressStats
+# Dashboard үшін жинақталған көрсеткіштер. Attempt аяқталғанда немесе қайта бағаланғанда өсімді түрде жаңарады
+# (apps/main/services/stats.py), әр attempt-тің үлесі ExamAttempt.meta["stats"]-та сақталады.
+class UserProgressStats(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name="progress_stats", verbose_name=_("Пайдаланушы"),
+    )
+    attempt_count = models.PositiveIntegerField(_("Аяқталған attempt саны"), default=0)
+    scored_count = models.PositiveIntegerField(_("Пайызы есептелген attempt саны"), default=0)
+    percent_sum = models.FloatField(_("Пайыздар қосындысы"), default=0)
+    score_sum = models.DecimalField(_("Балл қосындысы"), max_digits=12, decimal_places=2, default=0)
+    max_score_sum = models.DecimalField(_("Макс балл қосындысы"), max_digits=12, decimal_places=2, default=0)
+    # {section_type: {"percent_sum": float, "count": int}}
+    section_stats = models.JSONField(_("Секция бойынша"), default=dict, blank=True)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Қолданушы статистикасы")
+        verbose_name_plural = _("Қолданушы статистикасы")
+
+    def __str__(self):
+        return _('#{}-қолданушы статистикасы').format(self.user_id)
+
+    @property
+    def overall_avg(self):
+        if not self.scored_count:
+            return None
+        return self.percent_sum / self.scored_count
+
+    def section_avg(self, section_type: str):
+        entry = self.section_stats.get(section_type) or {}
+        if not entry.get("count"):
+            return None
+        return entry["percent_sum"] / entry["count"]
+
+
+# ExamItemAnalysis
+# Сұрақ сапасының талдауы (difficulty, discrimination, нұсқалар таралуы, Cronbach alpha). Ауыр есептеу,
+# сондықтан нәтиже емтихан бойынша сақталып, менеджер сұраған кезде ғана қайта есептеледі.
+class ExamItemAnalysis(models.Model):
+    exam = models.OneToOneField(
+        "Exam", on_delete=models.CASCADE,
+        related_name="item_analysis", verbose_name=_("Емтихан"),
+    )
+    content_version = models.PositiveIntegerField(_("Мазмұн нұсқасы"), default=0)
+    attempt_count = models.PositiveIntegerField(_("Attempt саны"), default=0)
+    data = models.JSONField(_("Нәтиже"), default=dict, blank=True)
+    compute_seconds = models.FloatField(_("Есептеу уақыты (сек)"), default=0)
+    computed_at = models.DateTimeField(_("Есептелген уақыты"), default=timezone.now)
+
+    class Meta:
+        verbose_name = _("Сұрақ талдауы")
+        verbose_name_plural = _("Сұрақ талдаулары")
+
+    def __str__(self):
+        return _('#{}-сұрақ талдауы').format(self.exam_id)
+
+
+# ExamScoreHistogram
+# Емтихан бойынша total_score / max_total_score үлесінің тең енді бөліктерге (bucket) таралуы.
+# Attempt аяқталғанда өсімді түрде жаңарады; review бетіндегі percentile осыдан O(buckets) уақытта есептеледі.
+class ExamScoreHistogram(models.Model):
+    exam = models.OneToOneField(
+        "Exam", on_delete=models.CASCADE,
+        related_name="score_histogram", verbose_name=_("Емтихан"),
+    )
+    bucket_count = models.PositiveSmallIntegerField(_("Bucket саны"), default=20)
+    counts = models.JSONField(_("Bucket мәндері"), default=list, blank=True)
+    total = models.PositiveIntegerField(_("Attempt саны"), default=0)
+    updated_at = models.DateTimeField(_("Жаңартылған уақыты"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Балл гистограммасы")
+        verbose_name_plural = _("Балл гистограммалары")
+
+    def __str__(self):
+        return _('#{}-балл гистограммасы').format(self.exam_id)
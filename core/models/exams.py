@@ -1,7 +1,12 @@
+import html
+
 from django.db import models
+from django.utils.html import strip_tags
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 
+from core.utils.output import normalize_output_text
+
 
 # ======================================================================================================================
 # Exam models
@@ -12,10 +17,22 @@ class Exam(models.Model):
     description = models.TextField(_("Анықтама"), blank=True, null=True)
     is_published = models.BooleanField(_("Ашық емтихан"), default=True)
     created_at = models.DateTimeField(_("Жасалған уақыты"), auto_now_add=True)
+    content_version = models.PositiveIntegerField(_("Мазмұн нұсқасы"), default=0, editable=False)
+    # Каталог есептегіштері: Section/Question сигналдары арқылы жаңарады (core/signals.py)
+    section_count = models.PositiveIntegerField(_("Секция саны"), default=0, editable=False)
+    question_count = models.PositiveIntegerField(_("Сұрақтар саны"), default=0, editable=False)
+    time_limit = models.PositiveIntegerField(_("Жалпы уақыты (мин)"), default=0, editable=False)
+    max_total_score = models.PositiveIntegerField(_("Макс жалпы балл"), default=0, editable=False)
 
     class Meta:
         verbose_name = _("Емтихан")
         verbose_name_plural = _("Емтихандар")
+        indexes = [
+            # Каталог: is_published=True, id бойынша keyset пагинация
+            models.Index(fields=["-id"], condition=models.Q(is_published=True), name="exam_published_id_idx"),
+        ]
+        # title/description icontains іздеуіне арналған pg_trgm GIN индекстері тек Postgres-те,
+        # 0022 миграциясында құрылады (SQLite-та жоқ)
 
     def __str__(self):
         return self.title
@@ -45,6 +62,9 @@ class Section(models.Model):
     class Meta:
         verbose_name = _("Секция")
         verbose_name_plural = _("Секциялар")
+        indexes = [
+            models.Index(fields=["exam", "order"], name="section_exam_order_idx"),
+        ]
 
     def __str__(self):
         return self.get_section_type_display()
@@ -84,23 +104,44 @@ class Question(models.Model):
     )
     question_type = models.CharField(_("Сұрақ типі"), max_length=32, choices=QuestionType.choices)
     prompt = models.TextField(_("Берілгені"))
+    # prompt-тың HTML-сіз қысқа мәтіні: admin тізімдері мен inline-дар толық HTML рендерлемейді
+    prompt_preview = models.CharField(_("Қысқаша мәтіні"), max_length=255, blank=True, default="", editable=False)
     points = models.PositiveSmallIntegerField(_("Ұпай"), default=1)
     order = models.PositiveSmallIntegerField(_("Реттілік"), default=1)
 
     def __str__(self):
         return _('#{}-сұрақ').format(self.pk)
 
+    # make_preview
+    # bulk_create save()-ті шақырмайды: импорт/көшіру осы функцияны тікелей қолданады
+    @staticmethod
+    def make_preview(prompt) -> str:
+        text = " ".join(html.unescape(strip_tags(prompt or "")).split())
+        limit = Question._meta.get_field("prompt_preview").max_length
+        return text if len(text) <= limit else text[:limit - 1] + "…"
+
+    def save(self, *args, **kwargs):
+        self.prompt_preview = self.make_preview(self.prompt)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "prompt" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "prompt_preview"}
+        super().save(*args, **kwargs)
+
+    # allowed_types
+    # Секция түріне рұқсат етілген сұрақ типтері (clean және емтихан импорты ортақ қолданады)
+    @classmethod
+    def allowed_types(cls, section_type) -> set:
+        return {
+            Section.SectionType.LISTENING: {cls.QuestionType.MCQ_SINGLE, cls.QuestionType.MCQ_MULTI},
+            Section.SectionType.READING:   {cls.QuestionType.MCQ_SINGLE, cls.QuestionType.MCQ_MULTI},
+            Section.SectionType.SPEAKING:  {cls.QuestionType.SPEAKING_KEYWORDS},
+            Section.SectionType.WRITING: {cls.QuestionType.WRITING},
+        }.get(section_type, set())
+
     def clean(self):
         super().clean()
-        allowed = {
-            self.section.SectionType.LISTENING: {self.QuestionType.MCQ_SINGLE, self.QuestionType.MCQ_MULTI},
-            self.section.SectionType.READING:   {self.QuestionType.MCQ_SINGLE, self.QuestionType.MCQ_MULTI},
-            self.section.SectionType.SPEAKING:  {self.QuestionType.SPEAKING_KEYWORDS},
-            self.section.SectionType.WRITING: {self.QuestionType.WRITING},
-        }
-
         st = self.section.section_type if self.section.pk else None
-        if st and self.question_type and self.question_type not in allowed.get(st, set()):
+        if st and self.question_type and self.question_type not in self.allowed_types(st):
             raise ValidationError({
                 "question_type": _("Бұл секцияға бұл сұрақ типін қоюға болмайды.")
             })
@@ -108,6 +149,9 @@ class Question(models.Model):
     class Meta:
         verbose_name = _("Сұрақ")
         verbose_name_plural = _("Сұрақтар")
+        indexes = [
+            models.Index(fields=["section", "order"], name="question_section_order_idx"),
+        ]
 
 
 # ======================================================================================================================
@@ -190,10 +234,19 @@ class Writing(models.Model):
     )
     expected_output = models.TextField(_("Дұрыс шығару (output)"))
     ignore_whitespace = models.BooleanField(_("Whitespace елемеу"), default=True)
+    # expected_output-тың ignore_whitespace ережесімен қалыпқа келтірілген түрі: әр submission сайын қайта есептелмейді
+    expected_normalized = models.TextField(_("Қалыпқа келтірілген output"), blank=True, default="", editable=False)
 
     class Meta:
         verbose_name = _("Жазбаша есеп")
         verbose_name_plural = _("Жазбаша есептер")
 
     def __str__(self):
-        return _('#{}-жазбаша есеп').format(self.pk)
\ No newline at end of file
+        return _('#{}-жазбаша есеп').format(self.pk)
+
+    def save(self, *args, **kwargs):
+        self.expected_normalized = normalize_output_text(self.expected_output, self.ignore_whitespace)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "expected_normalized"}
+        super().save(*args, **kwargs)
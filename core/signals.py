@@ -0,0 +1,94 @@
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from core.models import Exam, Section, SectionMaterial, Question, Option, SpeakingRubric, Writing
+
+
+# ======================================================================================================================
+# Exam content version
+# ======================================================================================================================
+def bump_exam_version(**lookup) -> None:
+    # Exam қатарын тек UPDATE арқылы өзгертеміз: post_save қайта шақырылмайды
+    Exam.objects.filter(**lookup).update(content_version=F("content_version") + 1)
+
+
+@receiver(post_save, sender=Exam)
+def exam_changed(sender, instance, **kwargs):
+    bump_exam_version(pk=instance.pk)
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+def section_changed(sender, instance, **kwargs):
+    # Секция басқа емтиханға ауысса, ескі емтиханның blueprint-і де ескіреді
+    exam_ids = {instance.exam_id, getattr(instance, "_previous_exam_id", None)} - {None}
+    bump_exam_version(pk__in=exam_ids)
+    refresh_exam_counters(*exam_ids)
+
+
+@receiver(post_save, sender=SectionMaterial)
+@receiver(post_delete, sender=SectionMaterial)
+def section_material_changed(sender, instance, **kwargs):
+    bump_exam_version(sections=instance.section_id)
+
+
+@receiver(post_save, sender=Question)
+@receiver(post_delete, sender=Question)
+def question_changed(sender, instance, **kwargs):
+    section_ids = {instance.section_id, getattr(instance, "_previous_section_id", None)} - {None}
+    exam_ids = set(Section.objects.filter(pk__in=section_ids).values_list("exam_id", flat=True))
+    bump_exam_version(pk__in=exam_ids)
+    refresh_exam_counters(*exam_ids)
+
+
+@receiver(post_save, sender=Option)
+@receiver(post_delete, sender=Option)
+@receiver(post_save, sender=SpeakingRubric)
+@receiver(post_delete, sender=SpeakingRubric)
+@receiver(post_save, sender=Writing)
+@receiver(post_delete, sender=Writing)
+def question_content_changed(sender, instance, **kwargs):
+    bump_exam_version(sections__questions=instance.question_id)
+
+
+# ======================================================================================================================
+# Exam catalog counters
+# ======================================================================================================================
+# refresh_exam_counters
+# Берілген емтихандардың есептегіштерін бір UPDATE-пен (корреляцияланған subquery) қайта есептейді.
+# Өсім (+1/-1) емес, толық мән жазылады: секция басқа емтиханға ауысса немесе уақыты өзгерсе де дұрыс қалады.
+def refresh_exam_counters(*exam_ids) -> None:
+    exam_ids = {exam_id for exam_id in exam_ids if exam_id}
+    if not exam_ids:
+        return
+    Exam.objects.filter(pk__in=exam_ids).update(**exam_counter_expressions())
+
+
+def exam_counter_expressions() -> dict:
+    sections = Section.objects.filter(exam_id=OuterRef("pk")).order_by().values("exam_id")
+    questions = Question.objects.filter(section__exam_id=OuterRef("pk")).order_by().values("section__exam_id")
+    return {
+        "section_count": Coalesce(Subquery(sections.annotate(n=Count("id")).values("n")), Value(0)),
+        "question_count": Coalesce(Subquery(questions.annotate(n=Count("id")).values("n")), Value(0)),
+        "time_limit": Coalesce(Subquery(sections.annotate(n=Sum("time_limit")).values("n")), Value(0)),
+        "max_total_score": Coalesce(Subquery(sections.annotate(n=Sum("max_score")).values("n")), Value(0)),
+    }
+
+
+# Секция/сұрақ басқа емтиханға ауыстырылса, ескі емтиханның нұсқасы мен есептегіштері де жаңаруы керек
+@receiver(pre_save, sender=Section)
+def section_remember_exam(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_exam_id = (
+            Section.objects.filter(pk=instance.pk).values_list("exam_id", flat=True).first()
+        )
+
+
+@receiver(pre_save, sender=Question)
+def question_remember_section(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_section_id = (
+            Question.objects.filter(pk=instance.pk).values_list("section_id", flat=True).first()
+        )
@@ -0,0 +1,28 @@
+import json
+
+from django.db import connections
+
+# Бағалау осы шектен аз болса, нақты COUNT(*) арзан: сол жасалады
+EXACT_COUNT_BELOW = 10_000
+
+
+# estimate_count
+# Postgres-те COUNT(*) бүкіл кестені (немесе индексті) оқиды. Оның орнына жоспарлаушының статистикадан
+# шығарған бағасы (EXPLAIN, pg_class.reltuples / pg_statistic) алынады: фильтрлі queryset-ке де жарайды.
+def estimate_count(queryset, exact_below: int = EXACT_COUNT_BELOW) -> int:
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    estimate = int(plan[0]["Plan"]["Plan Rows"])
+    if estimate < exact_below:
+        return queryset.count()
+    return estimate
@@ -0,0 +1,54 @@
+import re
+from itertools import zip_longest
+
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+
+# ======================================================================================================================
+# Output normalization
+# ======================================================================================================================
+# Жолдар бүкіл мәтіннің көшірмесін жасамай, бір-бірлеп шығарылады.
+# ignore_whitespace=True: әр жолдағы бос орындар бір пробелге қысқарады, жол шеттері кесіледі,
+# басындағы және соңындағы бос жолдар ескерілмейді.
+# ignore_whitespace=False: тек жол соңы (\r\n, \r) біркелкіленеді және соңындағы бос жолдар ескерілмейді.
+def _split_lines(text: str):
+    pos = 0
+    for m in _LINE_BREAK.finditer(text):
+        yield text[pos:m.start()]
+        pos = m.end()
+    yield text[pos:]
+
+
+def iter_output_lines(text: str | None, ignore_whitespace: bool = True):
+    pending_blank = 0
+    started = not ignore_whitespace
+    for line in _split_lines(text or ""):
+        if ignore_whitespace:
+            line = " ".join(line.split())
+        if not line:
+            if started:
+                pending_blank += 1
+            continue
+
+        started = True
+        for _ in range(pending_blank):
+            yield ""
+        pending_blank = 0
+        yield line
+
+
+def normalize_output_text(text: str | None, ignore_whitespace: bool = True) -> str:
+    return "\n".join(iter_output_lines(text, ignore_whitespace))
+
+
+# outputs_match
+# expected_normalized — normalize_output_text нәтижесі (Writing.expected_normalized).
+# Алғашқы сәйкессіздікте тоқтайды.
+def outputs_match(expected_normalized: str, actual: str | None, ignore_whitespace: bool = True) -> bool:
+    if actual is None:
+        return False
+    pairs = zip_longest(
+        iter_output_lines(expected_normalized, ignore_whitespace=False),
+        iter_output_lines(actual, ignore_whitespace),
+    )
+    return all(expected == got for expected, got in pairs)
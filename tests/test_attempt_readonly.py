@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.main.services.attempt import start_attempt
+from apps.main.services.blueprint import clear_exam_blueprints, get_exam_blueprint
+from apps.main.services.exam_import import import_exam_plan, validate_exam_package
+from core.models import User
+
+WRITE_PREFIXES = ("INSERT", "UPDATE", "DELETE")
+
+
+def build_package(questions: int) -> dict:
+    items = [
+        {
+            "question_type": "mcq_single",
+            "prompt": f"<p>#{i + 1}</p>",
+            "options": [{"text": f"Нұсқа {k}", "is_correct": k == 0} for k in range(3)],
+        }
+        for i in range(questions)
+    ]
+    return {
+        "title": "Read-only GET",
+        "sections": [{"section_type": "reading", "order": 1, "max_score": 10, "questions": items}],
+    }
+
+
+# ======================================================================================================================
+# Steady-state attempt GETs
+# ======================================================================================================================
+# Attempt құрылып, секция басталған соң detail/question GET-тері тек оқиды: INSERT/UPDATE/DELETE жоқ, ал
+# сұраныс саны сұрақ санына тәуелсіз.
+class AttemptReadOnlyGetTests(TestCase):
+    def setUp(self):
+        clear_exam_blueprints()
+        self.user = User.objects.create(username="customer", iin="000000000001", role=User.UserRoles.CUSTOMER)
+        self.exam = import_exam_plan(validate_exam_package(build_package(5)))
+        self.attempt = start_attempt(self.user, self.exam)
+        self.question_ids = get_exam_blueprint(self.exam).question_ids
+        self.client.force_login(self.user)
+
+        # Бірінші GET секцияны бастайды (жазу бар), одан кейінгілері тұрақты күйде
+        self.client.get(self.question_url(self.question_ids[0]))
+
+    def question_url(self, question_id: int) -> str:
+        return reverse("customer:attempt_question", args=[self.attempt.pk]) + f"?q={question_id}"
+
+    def assert_no_writes(self, queries):
+        writes = [q["sql"] for q in queries if q["sql"].lstrip().upper().startswith(WRITE_PREFIXES)]
+        self.assertEqual(writes, [])
+
+    def test_question_get_does_not_write(self):
+        for question_id in self.question_ids:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.question_url(question_id))
+            self.assertEqual(response.status_code, 200)
+            self.assert_no_writes(queries)
+
+    def test_detail_get_does_not_write(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("customer:attempt_detail", args=[self.attempt.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assert_no_writes(queries)
+
+    def test_question_get_query_count(self):
+        # session, user, attempt+exam, QuestionAttempt+SectionAttempt, MCQSelection
+        with self.assertNumQueries(5):
+            self.client.get(self.question_url(self.question_ids[-1]))
+
+    def test_detail_get_query_count(self):
+        # session, user, attempt+exam, QuestionAttempt
+        with self.assertNumQueries(4):
+            self.client.get(reverse("customer:attempt_detail", args=[self.attempt.pk]))
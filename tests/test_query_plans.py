@@ -0,0 +1,88 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.main.management.commands.explain_hot_queries import ATTEMPT_TABLES, SEQ_SCAN_RE, hot_queries
+from apps.main.services.attempt import start_attempt
+from apps.main.services.exam_import import import_exam_plan, validate_exam_package
+from core.models import AttemptStatus, ExamAttempt, MCQSelection, QuestionAttempt, User
+
+# Өз сүзгісіне толық сәйкес келетін composite индексі бар сұраныстар
+EXPECTED_INDEXES = {
+    "exam_attempt_by_user_status": "exam_attempt_user_status_idx",
+    "exam_attempt_by_user_exam": "exam_attempt_user_exam_idx",
+    "exam_attempt_recent": "exam_attempt_user_recent_idx",
+    "exam_attempt_by_exam_status": "exam_attempt_exam_status_idx",
+    "section_by_exam_order": "section_exam_order_idx",
+    "question_by_section_order": "question_section_order_idx",
+}
+
+
+def build_package(title: str) -> dict:
+    sections = []
+    for order, section_type in enumerate(("listening", "reading"), start=1):
+        items = [
+            {
+                "question_type": "mcq_single",
+                "prompt": f"<p>{section_type} #{i + 1}</p>",
+                "options": [{"text": f"Нұсқа {k}", "is_correct": k == 0} for k in range(3)],
+            }
+            for i in range(4)
+        ]
+        sections.append({"section_type": section_type, "order": order, "max_score": 10, "questions": items})
+    return {"title": title, "sections": sections}
+
+
+# ======================================================================================================================
+# Hot query plans
+# ======================================================================================================================
+# explain_hot_queries командасының сұраныстары seed базада EXPLAIN-мен тексеріледі. enable_seqscan=off кезінде
+# attempt кестелерінде Seq Scan қалса, сәйкес индекс жоқ.
+@skipUnless(connection.vendor == "postgresql", "EXPLAIN жоспарлары тек PostgreSQL-де тексеріледі")
+class HotQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        exams = [import_exam_plan(validate_exam_package(build_package(f"Plan #{i}"))) for i in range(3)]
+        users = [
+            User.objects.create(username=f"plan-{i}", iin=f"plan-{i:08d}", role=User.UserRoles.CUSTOMER)
+            for i in range(20)
+        ]
+        for user in users:
+            for exam in exams:
+                start_attempt(user, exam)
+
+        # Статустар мен аяқталу уақыттары әртүрлі болсын
+        finished = ExamAttempt.objects.filter(exam__in=exams[:2])
+        finished.update(status=AttemptStatus.FINISHED, finished_at=timezone.now())
+
+        qas = QuestionAttempt.objects.select_related("question").order_by("id")
+        MCQSelection.objects.bulk_create(
+            [MCQSelection(question_attempt=qa, option=qa.question.options.order_by("id").first()) for qa in qas[:200]]
+        )
+
+        qa = QuestionAttempt.objects.select_related("section_attempt__attempt").order_by("-id").first()
+        attempt = qa.section_attempt.attempt
+        cls.ids = {
+            "attempt": attempt.pk,
+            "user": attempt.user_id,
+            "exam": attempt.exam_id,
+            "section": qa.section_attempt.section_id,
+            "question": qa.question_id,
+            "question_attempt": qa.pk,
+        }
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            for table in sorted(ATTEMPT_TABLES):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+            cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def test_hot_queries_use_indexes(self):
+        for name, qs in hot_queries(self.ids).items():
+            with self.subTest(query=name):
+                plan = qs.explain()
+                self.assertEqual(sorted(set(SEQ_SCAN_RE.findall(plan)) & ATTEMPT_TABLES), [], plan)
+                if name in EXPECTED_INDEXES:
+                    self.assertIn(EXPECTED_INDEXES[name], plan)
@@ -0,0 +1,90 @@
+import re
+
+from django.test import SimpleTestCase
+from hypothesis import given, settings, strategies as st
+
+from apps.main.services.speaking import KeywordMatcher, match_keywords
+
+
+# ======================================================================================================================
+# Reference scorer
+# ======================================================================================================================
+# KeywordMatcher-ге дейінгі match_keywords: әр кілт сөз үшін транскрипт қайта нормализацияланып, regex-пен ізделеді.
+def _old_normalize(s: str) -> str:
+    s = s.lower().strip()
+    s = re.sub(r"[^\w\s]+", " ", s, flags=re.UNICODE)
+    s = re.sub(r"\s+", " ", s, flags=re.UNICODE)
+    return s
+
+
+def old_match_keywords(transcript: str, keywords: list[str]) -> list[str]:
+    t = _old_normalize(transcript)
+    matched = []
+    for kw in (keywords or []):
+        if not isinstance(kw, str):
+            continue
+        k = _old_normalize(kw)
+        if not k:
+            continue
+        if " " in k:
+            if k in t:
+                matched.append(kw)
+        else:
+            if re.search(rf"\b{re.escape(k)}\b", t, flags=re.UNICODE):
+                matched.append(kw)
+    uniq = []
+    seen = set()
+    for m in matched:
+        key = m.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            uniq.append(m.strip())
+    return uniq
+
+
+# ======================================================================================================================
+# Strategies
+# ======================================================================================================================
+# Кездейсоқ мәтінде кілт сөздер сирек кездеседі, сондықтан транскрипт пен кілт сөздер бір шағын сөздіктен
+# құралады: сәйкестік, фраза, регистр, тыныс белгілері мен Unicode жиі тексеріледі.
+_WORDS = ["cat", "Cat", "cats", "the", "дом", "Дом", "үй", "éte", "a1", "_", "x_y", "42", "sun-rise", "don't"]
+_SEPARATORS = [" ", "  ", ", ", ".", "!", "\n", "\t", "-", "'", "?! ", "…"]
+
+word = st.one_of(st.sampled_from(_WORDS), st.text(min_size=1, max_size=6))
+separator = st.one_of(st.sampled_from(_SEPARATORS), st.text(alphabet=" ,.;:!?-'\"()\t\n", min_size=1, max_size=3))
+
+
+@st.composite
+def phrases(draw, max_words: int) -> str:
+    parts = draw(st.lists(st.tuples(word, separator), max_size=max_words))
+    prefix = draw(st.sampled_from(["", " ", "(", "'"]))
+    return prefix + "".join(w + sep for w, sep in parts)
+
+
+transcripts = st.one_of(phrases(max_words=20), st.text(max_size=80))
+keyword_lists = st.one_of(
+    st.none(),
+    st.lists(
+        st.one_of(phrases(max_words=3), st.text(max_size=10), st.integers(), st.none()),
+        max_size=8,
+    ),
+)
+
+
+class KeywordMatcherEquivalenceTests(SimpleTestCase):
+    @settings(max_examples=500, deadline=None)
+    @given(transcripts, keyword_lists)
+    def test_match_keywords_matches_old_scorer(self, transcript, keywords):
+        self.assertEqual(match_keywords(transcript, keywords), old_match_keywords(transcript, keywords))
+
+    @settings(max_examples=200, deadline=None)
+    @given(st.lists(transcripts, max_size=5), keyword_lists)
+    def test_match_many_matches_old_scorer(self, batch, keywords):
+        expected = [old_match_keywords(t, keywords) for t in batch]
+        self.assertEqual(KeywordMatcher(keywords).match_many(batch), expected)
+
+    def test_examples(self):
+        keywords = ["Cat", "sun rise", "cat", 7, "  ", "дом"]
+        self.assertEqual(match_keywords("The CAT saw a sun-rise.", keywords), ["Cat", "sun rise"])
+        self.assertEqual(match_keywords("cats, Домик", keywords), [])
+        self.assertEqual(match_keywords("", None), [])
@@ -0,0 +1,28 @@
+// LazyCKEditorWidget: CKEditor тек алдын ала қарау блогын басқанда құрылады
+(function () {
+    function activate(preview) {
+        var container = preview.closest(".lazy-ckeditor");
+        var editor = container.querySelector(".lazy-ckeditor-editor");
+        var textarea = editor.querySelector("textarea[data-type=ckeditortype]");
+        if (!textarea || textarea.getAttribute("data-processed") !== "lazy" || typeof CKEDITOR === "undefined") {
+            return;
+        }
+
+        textarea.setAttribute("data-processed", "1");
+        var plugins = JSON.parse(textarea.getAttribute("data-external-plugin-resources") || "[]");
+        plugins.forEach(function (p) {
+            CKEDITOR.plugins.addExternal(p[0], p[1], p[2]);
+        });
+
+        preview.hidden = true;
+        editor.hidden = false;
+        CKEDITOR.replace(textarea.id, JSON.parse(textarea.getAttribute("data-config")));
+    }
+
+    document.addEventListener("click", function (event) {
+        var preview = event.target.closest(".lazy-ckeditor-preview");
+        if (preview) {
+            activate(preview);
+        }
+    });
+})();
@@ -0,0 +1,92 @@
+// SectionAdmin: сұрақтарды сүйреп ретін өзгерту және бір POST-пен сақтау (reorder-questions)
+(function () {
+    function init() {
+        var group = document.getElementById("questions-group");
+        if (!group) {
+            return;
+        }
+        var tbody = group.querySelector("tbody");
+        var rows = function () {
+            return Array.prototype.slice.call(tbody.querySelectorAll("tr.form-row.has_original"));
+        };
+        if (rows().length < 2) {
+            return;
+        }
+
+        var button = document.createElement("button");
+        button.type = "button";
+        button.className = "button";
+        button.textContent = "Сұрақтар ретін сақтау";
+        button.hidden = true;
+        group.appendChild(button);
+
+        var dragged = null;
+        rows().forEach(function (row) {
+            // Жол тек ☰ ұстағышы арқылы сүйретіледі: input/CKEditor ішіндегі мәтінді белгілеуге кедергі жоқ
+            var handle = row.querySelector("td.field-drag_handle");
+            if (handle) {
+                handle.classList.add("question-drag-handle");
+                handle.addEventListener("mousedown", function () {
+                    row.draggable = true;
+                });
+            }
+            row.addEventListener("dragstart", function (event) {
+                dragged = row;
+                row.classList.add("question-row-dragging");
+                event.dataTransfer.effectAllowed = "move";
+            });
+            row.addEventListener("dragend", function () {
+                row.classList.remove("question-row-dragging");
+                row.draggable = false;
+                dragged = null;
+            });
+            row.addEventListener("dragover", function (event) {
+                if (!dragged || dragged === row) {
+                    return;
+                }
+                event.preventDefault();
+                var rect = row.getBoundingClientRect();
+                var after = event.clientY > rect.top + rect.height / 2;
+                tbody.insertBefore(dragged, after ? row.nextSibling : row);
+                button.hidden = false;
+            });
+        });
+
+        button.addEventListener("click", function () {
+            var body = new URLSearchParams();
+            rows().forEach(function (row) {
+                var id = row.querySelector("input[name$='-id']");
+                if (id && id.value) {
+                    body.append("question_ids", id.value);
+                }
+            });
+            var csrf = document.querySelector("input[name=csrfmiddlewaretoken]");
+            var url = window.location.pathname.replace(/change\/?$/, "reorder-questions/");
+
+            button.disabled = true;
+            fetch(url, {
+                method: "POST",
+                headers: {"X-CSRFToken": csrf ? csrf.value : ""},
+                body: body,
+                credentials: "same-origin",
+            }).then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.status);
+                }
+                rows().forEach(function (row, index) {
+                    var cell = row.querySelector("td.field-order p");
+                    if (cell) {
+                        cell.textContent = index + 1;
+                    }
+                });
+                button.hidden = true;
+            }).catch(function () {
+                alert("Ретті сақтау мүмкін болмады. Бетті жаңартып, қайталаңыз.");
+            }).finally(function () {
+                button.disabled = false;
+            });
+        });
+    }
+
+    document.addEventListener("DOMContentLoaded", init);
+})();